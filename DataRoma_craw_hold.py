@@ -1,124 +1,285 @@
 import pandas as pd
-from playwright.sync_api import sync_playwright
-from io import StringIO
+from datetime import date
+from dataroma_http import DataromaFetcher
+from fetch_policy import RetryQueue, EMPTY
+from response_cache import ttl_for_period, quarter_is_closed, FILING_GRACE_DAYS
+from checkpoint import CheckpointManifest
+from parquet_store import write_holdings, DATA_ROOT
+from sqlite_store import get_store
+from table_clean import normalize_table, format_report
+from table_extract import extract_table, href_param
+from run_metrics import start_run
+from config import DEFAULT_CONFIG
 import time
 import random
+import os
 
-# 1. 9대 거인 리스트
-TARGET_GURUS = [
-    {"code": "BRK", "name": "Berkshire Hathaway", "style": "Value"},
-    {"code": "BAUPOST", "name": "Baupost Group",       "style": "Value"},
-    {"code": "SAM", "name": "Scion Asset Mgmt",    "style": "Value"},
-    {"code": "TGM", "name": "Tiger Global",        "style": "Growth"},
-    {"code": "COAT", "name": "Coatue Management",  "style": "Growth"}, 
-    {"code": "DA",  "name": "Duquesne Family",     "style": "Growth"},
-    {"code": "PSC", "name": "Pershing Square",     "style": "Activist"},
-    {"code": "IC",  "name": "Icahn Enterprises",   "style": "Activist"},
-    {"code": "TP",  "name": "Third Point",         "style": "Activist"},
-]
-
-# 2. 수집할 기간 (2024년 1분기 ~ 2025년 4분기)
-# 현재 시점(2026년 1월) 기준, 과거 데이터를 모두 봅니다.
-QUARTERS = [
-    "2024-03-31", "2024-06-30", "2024-09-30", "2024-12-31",
-    "2025-03-31", "2025-06-30", "2025-09-30", "2025-12-31"
-]
-
-def clean_number(value):
-    """문자열($, %, ,)을 숫자(float)로 변환하는 헬퍼 함수"""
-    if isinstance(value, str):
-        value = value.replace('$', '').replace('%', '').replace(',', '').strip()
-        try:
-            return float(value)
-        except:
-            return 0.0
-    return value
-
-def scrape_history_portfolios():
+# 1. 9대 거인 리스트 (config.py, whalebuzz CLI에서는 whalebuzz.toml로 변경 가능)
+TARGET_GURUS = DEFAULT_CONFIG["holdings"]["gurus"]
+
+# 2. 수집 시작 분기 (이후 분기 목록은 오늘 날짜 기준으로 자동 계산)
+START_QUARTER = DEFAULT_CONFIG["holdings"]["start_quarter"]
+
+# 결과 파일 (이름은 기존 파일과 호환되도록 유지, 내용은 START_QUARTER ~ 최신 분기)
+FILENAME = "Guru_Portfolios_TimeSeries_2024-2025.csv"
+PARQUET_ROOT = os.path.join(DATA_ROOT, "holdings")
+
+# 페이지 사이 랜덤 딜레이 범위 (초)
+PAGE_DELAY = (1.5, 3.0)
+
+# 마감된 분기인데 데이터가 없던 (구루, 분기) 표시 (결과 파일 옆 JSON Lines, 응답 캐시를 지워도 남음)
+EMPTY_FILE = "Guru_Portfolios_TimeSeries_2024-2025.empty.jsonl"
+
+def quarter_ends(start=START_QUARTER, today=None):
+    """start부터 오늘 이전에 끝난 분기까지의 분기말 날짜 목록 ('YYYY-MM-DD')"""
+    today = today or date.today()
+    periods = pd.period_range(start=start, end=today, freq="Q")
+    ends = [p.end_time.date() for p in periods]
+    return [d.isoformat() for d in ends if d < today]
+
+def load_existing(filename=FILENAME):
+    """기존 결과 파일 (없으면 None)"""
+    if not os.path.exists(filename):
+        return None
+    return pd.read_csv(filename, encoding="utf-8-sig")
+
+def holdings_url(guru, period):
+    # [핵심] 날짜 파라미터(p)를 URL에 추가하여 과거 데이터 접근
+    return f"https://www.dataroma.com/m/holdings.php?m={guru['code']}&p={period}"
+
+def empty_marks():
+    return CheckpointManifest(EMPTY_FILE)
+
+def mark_empty(guru, period):
+    """마감된 분기의 '데이터 없음' 결과를 기록 (다음 업데이트에서 다시 요청하지 않음)"""
+    empty_marks().mark_done(guru["code"], period)
+
+def is_marked_empty(guru, period, marks=None):
+    return (marks or empty_marks()).is_done(guru["code"], period)
+
+def plan_fetches(existing, gurus, quarters, now=None, skip_empty=True):
+    """
+    가져올 (guru, period) 목록
+    - 기존 데이터에 없는 (Manager, Report_Date) 조합 (마감된 분기에 데이터가 없던 조합은 제외)
+    - 13F 마감 전 분기 (늦게/정정 제출될 수 있으므로 다시 확인)
+    skip_empty=False: 데이터 없음 표시도 무시하고 다시 확인 (전체 재수집)
+    """
+    have = set()
+    if existing is not None and not existing.empty:
+        have = set(zip(existing["Manager"].astype(str), existing["Report_Date"].astype(str)))
+
+    marks = empty_marks() if skip_empty else None
+    plan = []
+    for guru in gurus:
+        for period in quarters:
+            if quarter_is_closed(period, FILING_GRACE_DAYS, now):
+                if (guru["name"], period) in have:
+                    continue
+                if marks is not None and is_marked_empty(guru, period, marks):
+                    continue
+            plan.append((guru, period))
+    return plan
+
+# #grid 헤더 → 결과 컬럼 (History | Stock | % of portfolio | Recent activity | Shares | Reported Price | Value | ...)
+HOLDINGS_COLUMNS = ['Stock_Name', 'Ticker', 'Weight_Pct', 'Shares', 'Price', 'Value']
+
+def holdings_table(raw_df):
+    """
+    holdings.php #grid (links=True, 숫자 변환 전) → HOLDINGS_COLUMNS (구조가 다르면 None)
+    컬럼은 순서가 아니라 헤더 이름으로 찾고 (뒤쪽 Current Price 등은 무시),
+    티커는 Stock 셀의 stock.php?sym= 링크에서 ('META - Meta Platforms Inc.' → META / Meta Platforms Inc.)
+    """
+    renamed = {}
+    for column in raw_df.columns:
+        name = str(column).lower()
+        if name.endswith("_href"):
+            continue
+        if name.startswith("stock"):
+            target = "Stock"
+        elif "portfolio" in name and "%" in name:
+            target = "Weight_Pct"
+        elif name.startswith("shares"):
+            target = "Shares"
+        elif "price" in name:
+            target = "Price"
+        elif name.startswith("value"):
+            target = "Value"
+        else:
+            continue
+        if target not in renamed.values():
+            renamed[column] = target
+    if len(renamed) < 5:
+        return None
+
+    stock_column = next(c for c, target in renamed.items() if target == "Stock")
+    stock = raw_df[stock_column].astype("string")
+    parts = stock.str.split(r"\s+-\s+", n=1, regex=True)
+    ticker = parts.str[0].str.strip()
+    if f"{stock_column}_href" in raw_df.columns:
+        ticker = href_param(raw_df[f"{stock_column}_href"], "sym").fillna(ticker)
+
+    df = raw_df.rename(columns=renamed)
+    df["Stock_Name"] = parts.str[1].fillna(stock)
+    df["Ticker"] = ticker.str.upper()
+    return df[HOLDINGS_COLUMNS].copy()
+
+def fetch_snapshot(fetcher, guru, period, metrics, retry_queue):
+    """
+    (구루, 분기) holdings 페이지 한 개 → 메타데이터를 붙인 DataFrame (없으면 None)
+    데이터가 없는 분기는 건너뛰고 (마감된 분기면 표시를 남김), 타임아웃/차단으로 재시도를 다 쓰면 retry_queue에 넣음
+    """
+    url = holdings_url(guru, period)
+    df_subset = None
+
+    try:
+        # 13F 마감이 지난 분기는 바뀌지 않으므로 무기한 캐시
+        html = fetcher.get(url, ttl=ttl_for_period("dataroma", period, FILING_GRACE_DAYS))
+
+        # 데이터가 없는 경우(설립 전이거나 보고 누락 등) 대비
+        if html is None:
+            if fetcher.last_outcome == EMPTY:
+                print(f"   [Skip] {period}: 데이터 없음")
+                metrics.count("skip")
+                if quarter_is_closed(period, FILING_GRACE_DAYS):
+                    mark_empty(guru, period)
+            else:
+                print(f"   [Retry] {period}: 로딩 실패 ({fetcher.last_outcome}) → 재시도 대기열")
+                retry_queue.add((guru, period), fetcher.last_outcome)
+            return None
+
+        # #grid만 파싱 (숫자 변환은 병합 후 한 번에), 티커는 링크에서
+        with metrics.stage("parse"):
+            raw_df, _ = extract_table(html, "grid", links=True, typed=False)
+        if raw_df is None:
+            print(f"   [Skip] {period}: 데이터 없음")
+            metrics.count("skip")
+            if quarter_is_closed(period, FILING_GRACE_DAYS):
+                mark_empty(guru, period)
+
+        # 헤더 이름으로 컬럼 추출 (안전장치)
+        elif (df_subset := holdings_table(raw_df)) is not None:
+            # 메타데이터 추가
+            df_subset.insert(0, "Manager", guru["name"])
+            df_subset.insert(1, "Style", guru["style"])
+            df_subset.insert(2, "Report_Date", period) # 기준일자 중요!
+
+            # 숫자 변환은 마지막에 전체 컬럼 단위로 한 번에 (벡터화)
+            print(f"   ✅ {period}: {len(df_subset)}개 종목 수집")
+
+        else:
+            print(f"   ⚠️ {period}: 테이블 구조 이상")
+            metrics.count("bad_table")
+
+    except Exception as e:
+        print(f"   ❌ {period}: 에러 ({e})")
+        metrics.count("error")
+
+    # 서버 부하 방지를 위한 랜덤 딜레이 (필수! 캐시 적중 시에는 생략)
+    if not fetcher.last_cached:
+        metrics.sleep(random.uniform(*PAGE_DELAY), "page_delay")
+    return df_subset
+
+def scrape_history_portfolios(update=True, gurus=TARGET_GURUS, start=START_QUARTER):
+    """
+    update=True: 기존 파일에 없는 분기 + 마감 전 분기만 가져와서 병합
+    update=False: 모든 (구루, 분기)를 다시 가져와 파일을 새로 씀
+    """
     all_dfs = []
+    quarters = quarter_ends(start)
+    existing = load_existing() if update else None
+    plan = plan_fetches(existing, gurus, quarters, skip_empty=update)
+
+    if not plan:
+        print(f"✅ 새로 가져올 분기가 없습니다. (최신 분기: {quarters[-1] if quarters else '-'})")
+        return existing
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        page = context.new_page()
-
-        print(f"⏳ Time Machine 가동: 총 {len(TARGET_GURUS)}명 * {len(QUARTERS)}분기 데이터 수집 시작...\n")
-
-        for guru in TARGET_GURUS:
-            code = guru["code"]
-            name = guru["name"]
-            
-            print(f"--- [{name}] History Scanning ---")
-
-            for period in QUARTERS:
-                # [핵심] 날짜 파라미터(p)를 URL에 추가하여 과거 데이터 접근
-                url = f"https://www.dataroma.com/m/holdings.php?m={code}&p={period}"
-                
-                try:
-                    page.goto(url, timeout=20000)
-                    
-                    # 데이터가 없는 경우(설립 전이거나 보고 누락 등) 대비
-                    try:
-                        page.wait_for_selector("#grid", timeout=3000)
-                    except:
-                        print(f"   [Skip] {period}: 데이터 없음 (or 로딩 실패)")
-                        continue
-
-                    html = page.content()
-                    dfs = pd.read_html(StringIO(html))
-                    raw_df = dfs[0]
-
-                    # 컬럼 인덱스로 데이터 추출 (안전장치)
-                    if len(raw_df.columns) >= 6:
-                        df_subset = raw_df.iloc[:, :6].copy()
-                        df_subset.columns = ['Stock_Name', 'Ticker', 'Weight_Pct', 'Shares', 'Price', 'Value']
-                        
-                        # 메타데이터 추가
-                        df_subset.insert(0, "Manager", name)
-                        df_subset.insert(1, "Style", guru["style"])
-                        df_subset.insert(2, "Report_Date", period) # 기준일자 중요!
-                        
-                        # 데이터 정제 (숫자 변환)
-                        df_subset['Weight_Pct'] = df_subset['Weight_Pct'].apply(clean_number)
-                        df_subset['Value'] = df_subset['Value'].apply(clean_number)
-                        # Shares는 가끔 문자가 섞일 수 있어 처리
-                        df_subset['Shares'] = df_subset['Shares'].apply(clean_number)
-
-                        all_dfs.append(df_subset)
-                        print(f"   ✅ {period}: {len(df_subset)}개 종목 수집")
-                    
-                    else:
-                        print(f"   ⚠️ {period}: 테이블 구조 이상")
-
-                except Exception as e:
-                    print(f"   ❌ {period}: 에러 ({e})")
-                
-                # 서버 부하 방지를 위한 랜덤 딜레이 (필수!)
-                time.sleep(random.uniform(1.5, 3.0))
-
-        browser.close()
+    # 요청/파싱/대기 시간을 실행 리포트로 기록
+    metrics = start_run("dataroma_holdings")
+
+    # HTTP 우선 수집 (#grid가 없을 때만 Playwright 폴백)
+    with DataromaFetcher(metrics=metrics) as fetcher:
+        mode = "업데이트" if existing is not None else "전체 수집"
+        print(f"⏳ Time Machine 가동 ({mode}): {len(gurus)}명 * {len(quarters)}분기 중 "
+              f"{len(plan)}개 페이지 수집 시작...\n")
+
+        # 재시도를 다 써도 실패한 (구루, 분기)는 모든 페이지를 돈 뒤 한 번 더
+        retry_queue = RetryQueue()
+        current = None
+        for guru, period in plan:
+            if guru["name"] != current:
+                print(f"--- [{guru['name']}] History Scanning ---")
+                current = guru["name"]
+            df_subset = fetch_snapshot(fetcher, guru, period, metrics, retry_queue)
+            if df_subset is not None:
+                all_dfs.append(df_subset)
+
+        if retry_queue:
+            print(f"\n🔁 재시도 대기열 {len(retry_queue)}개 ({retry_queue.summary()}) 다시 수집")
+            for guru, period in retry_queue.drain():
+                df_subset = fetch_snapshot(fetcher, guru, period, metrics, retry_queue)
+                if df_subset is not None:
+                    all_dfs.append(df_subset)
+            if retry_queue:
+                metrics.count("retry_exhausted", len(retry_queue))
+                print(f"   ⚠️ {len(retry_queue)}개는 여전히 실패 ({retry_queue.summary()}) → 다음 실행에서 다시 수집")
+
+        print(f"\n📡 수집 백엔드: 캐시 {fetcher.stats['cache']}회 / HTTP {fetcher.stats['http']}회 / 브라우저 {fetcher.stats['browser']}회")
+        if fetcher.lean.summary():
+            print(f"🪶 브라우저 전송량: {fetcher.lean.summary()}")
 
     # 결과 저장
     if all_dfs:
         print("\n📊 데이터 병합 및 CSV 저장 중...")
-        master_df = pd.concat(all_dfs, ignore_index=True)
+        new_df = pd.concat(all_dfs, ignore_index=True)
+        
+        # 데이터 정제 (숫자 변환: $, %, 천 단위 콤마, 괄호 음수, 빈칸 → <NA>)
+        with metrics.stage("clean"):
+            new_df, clean_report = normalize_table(
+                new_df,
+                numeric_columns=['Weight_Pct', 'Shares', 'Price', 'Value'],
+                integer_columns=['Shares'],
+            )
+        if format_report(clean_report):
+            print(f"   ⚠️ 숫자 변환 실패: {format_report(clean_report)}")
+        
+        # 기존 데이터에서 다시 받은 (Manager, Report_Date)만 교체
+        master_df = new_df
+        if existing is not None and not existing.empty:
+            fetched = pd.MultiIndex.from_frame(new_df[['Manager', 'Report_Date']].drop_duplicates())
+            keys = pd.MultiIndex.from_frame(existing[['Manager', 'Report_Date']].astype(str))
+            kept = existing[~keys.isin(fetched)]
+            master_df = pd.concat([kept, new_df], ignore_index=True)
+            print(f"   ↪ 기존 {len(kept)}행 유지 + 새로 받은 {len(new_df)}행 병합")
         
         # 날짜순, 매니저순 정렬
         master_df = master_df.sort_values(by=['Manager', 'Report_Date'])
         
-        filename = "Guru_Portfolios_TimeSeries_2024-2025.csv"
-        master_df.to_csv(filename, index=False, encoding="utf-8-sig")
+        with metrics.stage("save"):
+            master_df.to_csv(FILENAME, index=False, encoding="utf-8-sig")
+        
+        print(f"🎉 미션 성공! 총 {len(master_df)}행의 시계열 데이터가 '{FILENAME}'에 저장되었습니다.")
         
-        print(f"🎉 미션 성공! 총 {len(master_df)}행의 시계열 데이터가 '{filename}'에 저장되었습니다.")
+        # 분석용 Parquet (Source/Manager/Report_Date 파티션)
+        # 파티션 단위로 교체되므로 기존 데이터셋이 있으면 새로 받은 분기만 씀
+        to_write = new_df if os.path.exists(PARQUET_ROOT) else master_df
+        with metrics.stage("save"):
+            parquet_root = write_holdings(to_write, PARQUET_ROOT)
+        print(f"📦 Parquet 저장: {parquet_root}/")
+        
+        # SQLite 저장소: (매니저, 분기) 스냅샷 단위 upsert라 전체를 다시 써도 중복 없음
+        with metrics.stage("save"):
+            stored = get_store().upsert_holdings(master_df, source="dataroma")
+        print(f"🗄️ SQLite 저장: {stored}행 → {get_store().path}")
         
         # 미리보기 (상위 5개)
         print(master_df.head())
+        metrics.finish()
         return master_df
     else:
         print("\n수집된 데이터가 없습니다.")
-        return None
+        metrics.finish()
+        return existing
 
 if __name__ == "__main__":
-    scrape_history_portfolios()
\ No newline at end of file
+    # 분기마다 실행: 새로 제출된 분기만 가져와 병합 (전체 재수집은 update=False)
+    scrape_history_portfolios(update=True)
\ No newline at end of file
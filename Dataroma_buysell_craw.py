@@ -1,169 +1,779 @@
 import pandas as pd
-from playwright.sync_api import sync_playwright
-from io import StringIO
+from dataroma_http import DataromaFetcher, extract_stock_symbols, resolve_url
+from fetch_policy import FetchResult, RetryQueue, SUCCESS, EMPTY, TRANSIENT, RETRYABLE, host_of
+from lean_page import LeanProfile, DATAROMA_DOMAINS
+from checkpoint import CheckpointManifest
+from parquet_store import write_history
+from sqlite_store import get_store, latest_report_date, period_to_date
+from table_clean import format_report
+from table_extract import extract_table, href_param
+from run_metrics import get_metrics, start_run, failure_status
+from config import DEFAULT_CONFIG
+from collections import Counter
+import asyncio
 import time
 import random
 import re
 import os  # 파일 존재 여부 확인용
 
-# 1. 대상 리스트
-# 1. 대상 리스트 (총 21개, Dataroma 검증 완료)
-TARGET_GURUS = [
-    # --- Value (가치투자) ---
-    {"code": "BRK",     "name": "Berkshire Hathaway (Buffett)", "style": "Value"},
-    {"code": "BAUPOST", "name": "Baupost Group (Klarman)",     "style": "Value"},
-    {"code": "SAM",     "name": "Scion Asset Mgmt (Burry)",    "style": "Value"},
-    {"code": "HC",      "name": "Himalaya Capital (Li Lu)",    "style": "Value"},
-    {"code": "PI",     "name": "Pabrai Investments(Pabrai)",       "style": "Value"}, ## 다시 돌리기
-    {"code": "FS",      "name": "Fundsmith (Terry Smith)",     "style": "Value"},
-    {"code": "oaklx",     "name": "Oakmark (Bill Nygren)",       "style": "Value"}, ## 다시 돌리기
-
-    # --- Growth (성장주/Tiger Cubs) ---
-    {"code": "TGM",     "name": "Tiger Global (Chase Coleman)","style": "Growth"},
-    {"code": "AM",      "name": "Appaloosa (David Tepper)",    "style": "Growth"},
-    {"code": "vg",     "name": "Viking Global (Halvorsen)",   "style": "Growth"}, ## 다시 돌리기
-    {"code": "LPC",     "name": "Lone Pine (Stephen Mandel)",  "style": "Growth"},
-    {"code": "MC",      "name": "Maverick Capital (Lee Ainslie)","style": "Growth"},
-    {"code": "AC",    "name": "Akre Capital (Chuck Akre)",   "style": "Growth"}, # 다시 돌리기
-    {"code": "tci",     "name": "TCI Fund (Chris Hohn)",       "style": "Growth"},
-
-    # --- Activist / Deep Value (행동주의) ---
-    {"code": "PSC",     "name": "Pershing Square (Ackman)",    "style": "Activist"},
-    {"code": "IC",      "name": "Icahn Capital (Carl Icahn)",  "style": "Activist"},
-    {"code": "TP",      "name": "Third Point (Dan Loeb)",      "style": "Activist"},
-    {"code": "GL",      "name": "Greenlight (David Einhorn)",  "style": "Activist"},
-    {"code": "TRI",     "name": "Trian Partners (Nelson Peltz)","style": "Activist"},
-    {"code": "STAR",    "name": "Starboard Value (Jeff Smith)","style": "Activist"},
-    {"code": "FAIRX",   "name": "Fairholme (Bruce Berkowitz)", "style": "Activist"},
-]
+# 1. 대상 리스트 (총 21개, Dataroma 검증 완료 / config.py, whalebuzz.toml로 변경 가능)
+TARGET_GURUS = DEFAULT_CONFIG["history"]["gurus"]
 FILENAME = "Guru_History_21_Legends.csv"
+# (구루, 티커) 단위 완료 기록 (보고 분기별). 재실행 시 같은 분기에 끝낸 페이지는 건너뜀
+CHECKPOINT_FILE = "Guru_History_21_Legends.checkpoint.jsonl"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
-def scrape_and_save_incremental():
+# 비동기 모드 설정
+CONCURRENCY = DEFAULT_CONFIG["history"]["concurrency"]            # 동시에 열어둘 페이지 수 (페이지 풀 크기)
+GURU_CONCURRENCY = DEFAULT_CONFIG["history"]["guru_concurrency"]  # 동시에 진행할 구루 수
+HOST_RATE_PER_SEC = DEFAULT_CONFIG["history"]["rate_per_sec"]     # dataroma.com 전체 요청 예산 (초당 요청 수)
+PAGE_DELAY = (0.5, 0.8)  # 순차 모드 페이지 사이 랜덤 딜레이 범위 (초)
+
+# 종목 중심 모드 (stock.php 한 페이지로 그 종목을 가진 모든 구루의 최신 분기 행을 얻음)
+STOCK_FILENAME = "Guru_Stock_Holders.csv"
+# (분기, 티커) 단위 완료 기록 + stock.php에 없어서 hist.php로 보충할 (FALLBACK, 분기, 구루, 티커)
+STOCK_CHECKPOINT_FILE = "Guru_Stock_Holders.checkpoint.jsonl"
+FALLBACK = "fallback"
+
+# 실행 중 숫자 변환에 실패한 값 개수 (컬럼별 누적)
+CLEAN_FAILURES = Counter()
+
+
+def parse_history_html(html, guru, ticker):
+    """hist.php HTML에서 히스토리 테이블을 뽑아 메타데이터를 붙여 반환 (없으면 None)"""
+    # #grid만 파싱 + 숫자 컬럼 정리 ($, %, 콤마, 괄호 음수 → nullable 숫자 타입)
+    with get_metrics().stage("parse"):
+        hist_df, report = extract_table(html, "grid")
+    if hist_df is None or len(hist_df) <= 1:
+        return None
+    CLEAN_FAILURES.update(report)
+
+    # 메타데이터 삽입
+    hist_df.insert(0, "Manager", guru["name"])
+    hist_df.insert(1, "Style", guru["style"])
+    hist_df.insert(2, "Ticker", ticker)
+    return hist_df
+
+
+def open_checkpoint(quarter=None):
+    """
+    체크포인트 로드 + 중단된 기록 정리 (체크포인트 도입 전 CSV는 그대로 인계)
+    완료 기록은 보고 분기 (stock_period 형식, 기본은 13F가 공개된 최신 분기) 단위라
+    새 분기가 공개되면 모든 (구루, 티커)와 구루를 다시 수집함
+    """
+    quarter = quarter or stock_period(None)
+    manifest = CheckpointManifest(CHECKPOINT_FILE, FILENAME, scope=quarter)
+
+    if manifest.is_new and os.path.exists(FILENAME):
+        # 이미 이번 분기 행까지 저장된 (구루, 티커)만 완료로 간주
+        name_to_code = {g["name"]: g["code"] for g in TARGET_GURUS}
+        existing = pd.read_csv(FILENAME, usecols=["Manager", "Ticker", "Period"], encoding="utf-8-sig")
+        existing = existing[period_to_date(existing["Period"]) == period_to_date([quarter])[0]]
+        keys = [
+            (name_to_code[manager], ticker)
+            for manager, ticker in existing[["Manager", "Ticker"]].drop_duplicates().itertuples(index=False)
+            if manager in name_to_code
+        ]
+        manifest.mark_many(keys)
+        print(f"ℹ️ 기존 '{FILENAME}'에서 {quarter}까지 완료된 {len(keys)}개 (구루, 티커)를 체크포인트로 가져왔습니다.")
+    else:
+        dropped = manifest.recover()
+        if dropped:
+            print(f"🧹 이전 실행이 중단되며 남긴 미완료 기록 {dropped}바이트를 정리했습니다.")
+        if manifest.done_in_scope():
+            print(f"ℹ️ 체크포인트 ({quarter}): {manifest.done_in_scope()}개 작업 완료 상태에서 이어서 시작합니다.")
+
+    return manifest
+
+
+def append_csv(df, path):
+    """
+    CSV에 이어쓰기 (파일이 없을 때만 헤더 작성)
+    쓰다가 실패하면 쓰기 전 크기로 잘라내고 예외를 다시 올림 (체크포인트 밖의 행이 남지 않게)
+    """
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    try:
+        # mode='a'는 append(이어쓰기) 모드입니다.
+        df.to_csv(path, mode='a', header=size == 0, index=False, encoding="utf-8-sig")
+    except BaseException:
+        if os.path.exists(path):
+            with open(path, "r+b") as f:
+                f.truncate(size)
+        raise
+
+
+def commit_ticker(manifest, guru, ticker, hist_df):
+    """
+    티커 하나의 결과를 SQLite 저장소와 FILENAME에 쓰고 체크포인트에 기록
+    hist_df가 None이면 (히스토리 없음) 빈 결과로 기록만 함
+    저장 중 예외가 나면 CSV는 쓰기 전 상태 그대로, 체크포인트 기록도 없음 (다음 실행에서 다시 받음)
+    """
+    rows = 0
+    if hist_df is not None:
+        with get_metrics().stage("save"):
+            # SQLite 먼저: upsert라 실패 후 다시 받아도 중복되지 않고, 실패하면 CSV에는 아무것도 안 씀
+            get_store().upsert_history(hist_df, source="dataroma")
+            append_csv(hist_df, FILENAME)
+        rows = len(hist_df)
+
+    # CSV를 다 쓴 뒤에 기록해야 중단 시 잘라낼 위치가 정확함
+    manifest.mark_done(guru["code"], ticker, rows=rows)
+    return rows
+
+
+def fetch_history_pair(fetcher, manifest, guru, ticker, retry_queue):
+    """
+    hist.php 한 페이지 수집 + 저장. 저장한 행 수 반환 (재시도 대기열에 넣었으면 None)
+    - 데이터 없음 (404, 테이블 없는 페이지): 빈 결과로 완료 기록 (다시 받아도 같음)
+    - 재시도 소진 (타임아웃, 429 등): retry_queue에 넣고 완료 기록은 하지 않음
+    """
+    history_url = f"https://www.dataroma.com/m/hist/hist.php?f={guru['code']}&s={ticker}"
+    html = fetcher.get(history_url, wait_ms=2000)
+    if html is None:
+        if fetcher.last_outcome == EMPTY:
+            return commit_ticker(manifest, guru, ticker, None)
+        retry_queue.add((guru, ticker), fetcher.last_outcome)
+        return None
+    return commit_ticker(manifest, guru, ticker, parse_history_html(html, guru, ticker))
+
+
+def finish_retried_gurus(manifest, unfinished):
+    """재시도 후 모든 종목이 완료된 구루를 완료로 기록 (unfinished: {구루 코드: 티커 목록})"""
+    for code, tickers in unfinished.items():
+        if all(manifest.is_done(code, t) for t in tickers):
+            manifest.mark_done(code)
+
+
+def report_guru(guru_name, saved_rows, done, total, failed):
+    if failed:
+        print(f"\n   💾 {guru_name}: +{saved_rows}행 저장 ({done}/{total}개 종목 완료, "
+              f"{failed}개 실패 → 재실행 시 이어서 수집)")
+    else:
+        print(f"\n   💾 {guru_name}: +{saved_rows}행 저장 ({done}/{total}개 종목 완료)")
+
+
+def export_history_parquet():
+    """누적된 CSV를 Parquet 데이터셋(Source/Manager 파티션)으로 변환"""
+    if not os.path.exists(FILENAME):
+        return None
+    df = pd.read_csv(FILENAME, encoding="utf-8-sig")
+    # 새 분기마다 종목 이력을 다시 받아 이어쓰므로 같은 (매니저, 티커, 분기)는 마지막 행만
+    df = df.drop_duplicates(["Manager", "Ticker", "Period"], keep="last")
+    root = write_history(df)
+    print(f"📦 Parquet 저장: {root}/ ({len(df)}행)")
+    return root
+
+
+def scrape_and_save_incremental(gurus=None):
     # 시작 전에 기존 파일이 있다면 안내 메시지 (혹은 삭제)
     if os.path.exists(FILENAME):
         print(f"ℹ️ 알림: '{FILENAME}' 파일이 이미 존재합니다. 뒤에 이어서 저장합니다.")
     else:
         print(f"ℹ️ 알림: 새로운 파일 '{FILENAME}'을 생성합니다.")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        # Context를 한 번 만들고 계속 재사용하되, 페이지는 닫아줍니다.
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
+    manifest = open_checkpoint()
+    metrics = start_run("dataroma_buysell")
+
+    # 재시도를 다 써도 실패한 (구루, 티커)는 모든 구루를 돈 뒤 한 번 더
+    retry_queue = RetryQueue()
+    unfinished = {}  # 실패가 남은 구루 코드 → 티커 목록
+
+    # HTTP(keep-alive) 우선, #grid가 없을 때만 Playwright 폴백
+    with DataromaFetcher(user_agent=USER_AGENT, metrics=metrics) as fetcher:
 
-        print(f"\n🔥 [안전 모드] 한 명씩 수집하고 즉시 저장합니다.\n")
+        print(f"\n🔥 [안전 모드] 종목 하나씩 수집하고 즉시 저장합니다.\n")
 
-        for i, guru in enumerate(TARGET_GURUS):
+        gurus = gurus or TARGET_GURUS
+        for i, guru in enumerate(gurus):
             guru_code = guru["code"]
             guru_name = guru["name"]
             guru_style = guru["style"]
             
-            # [중요] 한 명분 데이터를 담을 임시 리스트 (매번 초기화됨)
-            current_guru_data = []
+            # 모든 종목을 끝낸 구루는 Activity 페이지도 다시 열지 않음
+            if manifest.is_done(guru_code):
+                print(f"--- [{i+1}/{len(gurus)}] {guru_name} ✔️ 완료됨 (건너뜀) ---")
+                metrics.count("skip_done")
+                continue
             
-            print(f"--- [{i+1}/{len(TARGET_GURUS)}] {guru_name} ({guru_style}) 시작 ---")
+            print(f"--- [{i+1}/{len(gurus)}] {guru_name} ({guru_style}) 시작 ---")
+
+            saved_rows = 0
+            failed = 0
+            activity_ok = False
 
-            page = context.new_page()
-            
             try:
                 # 1. Activity 페이지 접속 & 티커 수집
                 url_activity = f"https://www.dataroma.com/m/m_activity.php?m={guru_code}&typ=a"
-                unique_tickers = set()
+                unique_tickers = []
                 
                 try:
-                    page.goto(url_activity, timeout=30000)
-                    try:
-                        page.wait_for_selector("#grid", timeout=5000)
-                    except:
+                    html = fetcher.get(url_activity, wait_ms=5000)
+                    if html is None:
                         print("   ⚠️ 테이블 로딩 실패 (데이터 없음)")
+                    else:
+                        activity_ok = True
 
                     # stock.php 링크 찾기
-                    target_links = page.locator('a[href*="stock.php?sym="]').all()
-                    for link in target_links:
-                        href = link.get_attribute("href")
-                        if href:
-                            match = re.search(r'sym=([^&]+)', href)
-                            if match:
-                                unique_tickers.add(match.group(1))
+                    unique_tickers = extract_stock_symbols(html)
                     
                     print(f"   👉 {len(unique_tickers)}개 종목 발견")
 
                 except Exception as e:
                     print(f"   ❌ Activity 에러: {e}")
 
-                # 2. 상세 히스토리 수집
+                # 2. 상세 히스토리 수집 (체크포인트에 없는 종목만)
+                pending = [t for t in unique_tickers if not manifest.is_done(guru_code, t)]
+                if len(pending) < len(unique_tickers):
+                    print(f"   ⏭️ {len(unique_tickers) - len(pending)}개 종목은 이미 완료")
+                    metrics.count("skip_done", len(unique_tickers) - len(pending))
+
                 count = 0
-                for ticker in unique_tickers:
+                for ticker in pending:
                     count += 1
-                    history_url = f"https://www.dataroma.com/m/hist/hist.php?f={guru_code}&s={ticker}"
-                    
-                    print(f"   [{count}/{len(unique_tickers)}] {ticker}...", end="\r")
+                    print(f"   [{count}/{len(pending)}] {ticker}...", end="\r")
 
                     try:
-                        page.goto(history_url, timeout=20000)
-                        try:
-                            page.wait_for_selector("#grid", timeout=2000)
-                        except:
-                            continue 
-
-                        html = page.content()
-                        dfs = pd.read_html(StringIO(html))
-                        
-                        if dfs:
-                            hist_df = max(dfs, key=len)
-                            if len(hist_df) > 1:
-                                # 메타데이터 삽입
-                                hist_df.insert(0, "Manager", guru_name)
-                                hist_df.insert(1, "Style", guru_style) 
-                                hist_df.insert(2, "Ticker", ticker)
-                                
-                                # 임시 리스트에 추가
-                                current_guru_data.append(hist_df)
-                            
+                        # 즉시 저장 + 체크포인트 기록 (재시도 소진은 대기열로)
+                        rows = fetch_history_pair(fetcher, manifest, guru, ticker, retry_queue)
+                        if rows is None:
+                            failed += 1
+                        else:
+                            saved_rows += rows
                     except Exception:
-                        pass
+                        # 파싱 에러는 기록하지 않음 → 다음 실행에서 다시 시도
+                        failed += 1
+                        metrics.count("error")
                     
-                    # 딜레이 (너무 빠르면 차단되므로 적절히 유지)
-                    time.sleep(random.uniform(0.5, 0.8))
+                    # 딜레이 (너무 빠르면 차단되므로 적절히 유지, 캐시 적중 시 생략)
+                    if not fetcher.last_cached:
+                        metrics.sleep(random.uniform(*PAGE_DELAY), "page_delay")
+
+                report_guru(guru_name, saved_rows, len(unique_tickers) - failed, len(unique_tickers), failed)
+
+                # 3. 실패 없이 끝났으면 구루 자체를 완료로 기록 (실패가 있으면 재시도 후 판단)
+                if activity_ok and failed == 0:
+                    manifest.mark_done(guru_code)
+                elif activity_ok:
+                    unfinished[guru_code] = unique_tickers
 
             except Exception as e:
                 print(f"   ❌ 치명적 에러: {e}")
-            
-            finally:
-                page.close() # 페이지 닫아서 메모리 확보
 
-            # 3. [저장 단계] 한 명 끝날 때마다 파일에 쓰기
-            if current_guru_data:
-                print(f"\n   💾 {guru_name} 데이터 저장 중... ", end="")
-                
-                # DataFrame 변환
-                df_to_save = pd.concat(current_guru_data, ignore_index=True)
-                
-                # 파일이 없으면 헤더 포함(True), 있으면 헤더 뺌(False)
-                # mode='a'는 append(이어쓰기) 모드입니다.
-                file_exists = os.path.exists(FILENAME)
-                
-                df_to_save.to_csv(
-                    FILENAME, 
-                    mode='a', 
-                    header=not file_exists, # 파일이 없을 때만 헤더 작성
-                    index=False, 
-                    encoding="utf-8-sig"
-                )
-                
-                print(f"완료! (+{len(df_to_save)}행)")
-                
-                # 메모리에서 삭제 (Explicit Garbage Collection)
-                del df_to_save
-                del current_guru_data
-            else:
-                print(f"\n   ⚠️ 저장할 데이터가 없습니다.")
-            
             print("------------------------------------------------")
 
-        browser.close()
+        # 4. 재시도 대기열 (그동안 일시적인 장애나 차단이 풀렸을 가능성이 높음)
+        if retry_queue:
+            print(f"\n🔁 재시도 대기열 {len(retry_queue)}개 ({retry_queue.summary()}) 다시 수집")
+            for guru, ticker in retry_queue.drain():
+                try:
+                    fetch_history_pair(fetcher, manifest, guru, ticker, retry_queue)
+                except Exception:
+                    metrics.count("error")
+                metrics.sleep(random.uniform(*PAGE_DELAY), "page_delay")
+            finish_retried_gurus(manifest, unfinished)
+            if retry_queue:
+                metrics.count("retry_exhausted", len(retry_queue))
+                print(f"   ⚠️ {len(retry_queue)}개는 여전히 실패 ({retry_queue.summary()}) → 재실행 시 이어서 수집")
+
+        print(f"\n📡 수집 백엔드: 캐시 {fetcher.stats['cache']}회 / HTTP {fetcher.stats['http']}회 / 브라우저 {fetcher.stats['browser']}회")
+        if fetcher.lean.summary():
+            print(f"🪶 브라우저 전송량: {fetcher.lean.summary()}")
+        if format_report(CLEAN_FAILURES):
+            print(f"\n⚠️ 숫자 변환 실패: {format_report(CLEAN_FAILURES)}")
+        print(f"\n🎉 모든 작업 종료. 결과 파일: {FILENAME}")
+        with metrics.stage("save"):
+            export_history_parquet()
+        metrics.finish()
+
+# ============================================================================
+# 종목 중심 모드: (구루, 티커)마다 hist.php 대신 티커마다 stock.php 한 번
+# ============================================================================
+def plan_stock_crawl(guru_tickers):
+    """
+    {구루 코드: [티커]} → ({티커: [구루 코드]}, 쌍 단위로 열었을 hist.php 수)
+    여러 구루가 같이 가진 종목 (AAPL, GOOGL, META 등)은 한 번만 열게 됨
+    """
+    by_ticker = {}
+    for code, tickers in guru_tickers.items():
+        for ticker in tickers:
+            by_ticker.setdefault(ticker, []).append(code)
+    return by_ticker, sum(len(codes) for codes in by_ticker.values())
+
+
+def stock_period(html, today=None):
+    """stock.php의 기준 분기 ('2025 Q3' 형식, hist.php Period와 같음). 페이지에 없으면 직전 분기"""
+    match = re.search(r"\b(Q[1-4])\s+(\d{4})\b", html or "")
+    if match:
+        return f"{match.group(2)} {match.group(1)}"
+    match = re.search(r"\b(\d{4})\s+(Q[1-4])\b", html or "")
+    if match:
+        return f"{match.group(1)} {match.group(2)}"
+    report_date = latest_report_date(today)
+    return f"{report_date[:4]} Q{(int(report_date[5:7]) + 2) // 3}"
+
+
+def pending_fallback(stock_manifest, quarter, gurus_by_code):
+    """체크포인트에 남긴 hist.php 보충 대상 (구루, 티커) (이전 실행에서 중단/실패한 것 포함)"""
+    pairs = []
+    for key in stock_manifest.done:
+        if len(key) == 4 and key[:2] == (FALLBACK, quarter) and key[2] in gurus_by_code:
+            pairs.append((gurus_by_code[key[2]], key[3]))
+    return pairs
+
+
+def parse_stock_html(html, gurus_by_code, ticker):
+    """
+    stock.php 보유자 테이블 → 추적 중인 구루의 행만 hist.php 컬럼 형태로 (없으면 빈 DataFrame)
+    구루는 행의 holdings.php?m= / hist.php?f= 링크로 찾음 (이름은 사이트 표기가 달라서)
+    """
+    with get_metrics().stage("parse"):
+        df, report = extract_table(html, "grid", links=True)
+    if df is None or df.empty:
+        return pd.DataFrame()
+    CLEAN_FAILURES.update(report)
+
+    codes = pd.Series(pd.NA, index=df.index, dtype="string")
+    for column in [c for c in df.columns if str(c).endswith("_href")]:
+        codes = codes.fillna(href_param(df[column], "m")).fillna(href_param(df[column], "f"))
+    guru = codes.str.lower().map({code.lower(): g for code, g in gurus_by_code.items()})
+    df = df[guru.notna()]
+    if df.empty:
+        return df
+    guru = guru[df.index]
+
+    # 헤더 표기 차이를 흡수해서 hist.php 컬럼 이름으로
+    renamed = {}
+    for column in df.columns:
+        name = str(column).lower()
+        if "portfolio" in name and "%" in name:
+            renamed[column] = "% of portfolio"
+        elif "activity" in name:
+            renamed[column] = "Activity"
+        elif name.startswith("shares"):
+            renamed[column] = "Shares"
+        elif "price" in name:
+            renamed[column] = "Reported Price"
+        elif name.startswith("value"):
+            renamed[column] = "Value"
+    out = df.rename(columns=renamed)[list(dict.fromkeys(renamed.values()))]
+    out.insert(0, "Manager", [g["name"] for g in guru])
+    out.insert(1, "Style", [g["style"] for g in guru])
+    out.insert(2, "Ticker", ticker)
+    out.insert(3, "Period", stock_period(html))
+    out.insert(4, "Code", [g["code"] for g in guru])
+    return out.reset_index(drop=True)
+
+
+def scrape_by_stock(gurus=None):
+    """
+    종목 중심 수집
+    1. 구루마다 Activity 페이지에서 티커 수집 (기존과 같음)
+    2. 중복을 뺀 티커마다 stock.php를 한 번 열어 구루별 최신 분기 행을 나눠 담음 → STOCK_FILENAME
+    3. stock.php에 없는 (구루, 티커) (전량 매도 등)만 hist.php로 보충 → FILENAME
+       보충할 쌍은 2단계에서 티커 완료와 함께 체크포인트에 남기므로 중단/실패해도 다음 실행에서 보충
+    과거 분기 이력이 필요하면 쌍 단위 모드나 position_delta (보유 스냅샷 로컬 계산) 사용
+    """
+    gurus = gurus or TARGET_GURUS
+    gurus_by_code = {g["code"]: g for g in gurus}
+    stock_manifest = CheckpointManifest(STOCK_CHECKPOINT_FILE, STOCK_FILENAME)
+    stock_manifest.recover()
+    quarter = stock_period(None)
+    manifest = open_checkpoint(quarter)
+    metrics = start_run("dataroma_buysell_stock")
+
+    with DataromaFetcher(user_agent=USER_AGENT, metrics=metrics) as fetcher:
+
+        def pause():
+            if not fetcher.last_cached:
+                metrics.sleep(random.uniform(*PAGE_DELAY), "page_delay")
+
+        # 1. 구루별 티커
+        guru_tickers = {}
+        for i, guru in enumerate(gurus):
+            url_activity = f"https://www.dataroma.com/m/m_activity.php?m={guru['code']}&typ=a"
+            try:
+                html = fetcher.get(url_activity, wait_ms=5000)
+            except Exception as e:
+                print(f"   ❌ [{guru['name']}] Activity 에러: {e}")
+                html = None
+            guru_tickers[guru["code"]] = extract_stock_symbols(html)
+            print(f"--- [{i+1}/{len(gurus)}] {guru['name']}: {len(guru_tickers[guru['code']])}개 종목")
+            pause()
+
+        # 2. 종목별 stock.php
+        by_ticker, pair_pages = plan_stock_crawl(guru_tickers)
+        pending = [t for t in by_ticker if not stock_manifest.is_done(quarter, t)]
+        print(f"\n🧭 쌍 단위 hist.php {pair_pages}개 → 종목별 stock.php {len(by_ticker)}개 "
+              f"(완료 {len(by_ticker) - len(pending)}개 제외 {len(pending)}개 수집)\n")
+
+        stock_pages = 0
+        covered_pairs = 0  # 이번 실행에서 stock.php로 처리한 (구루, 티커) 수
+        saved_rows = 0
+        fallback = []
+        retry_queue = RetryQueue()
+
+        def fetch_stock(ticker):
+            nonlocal stock_pages, covered_pairs, saved_rows, fallback
+            stock_url = f"https://www.dataroma.com/m/stock.php?sym={ticker}"
+            try:
+                html = fetcher.get(stock_url, wait_ms=2000)
+            except Exception:
+                html = None
+                metrics.count("error")
+            if html is None and fetcher.last_outcome in RETRYABLE:
+                # 재시도 소진 → 대기열 (끝까지 실패하면 기록하지 않음 → 다음 실행에서 다시 시도)
+                retry_queue.add(ticker, fetcher.last_outcome)
+                return
+            if html is None and fetcher.last_outcome != EMPTY:
+                return
+            stock_pages += html is not None
+
+            # 보유자 페이지가 없으면 (empty) 모든 쌍을 hist.php로 확인
+            covered_pairs += len(by_ticker[ticker])
+            rows = parse_stock_html(html, gurus_by_code, ticker) if html is not None else pd.DataFrame()
+            found = set(rows["Code"]) if not rows.empty else set()
+            missing = [code for code in by_ticker[ticker] if code not in found]
+            fallback += [(gurus_by_code[code], ticker) for code in missing]
+            if not rows.empty:
+                rows = rows.drop(columns=["Code"])
+                with metrics.stage("save"):
+                    # 최신 분기 한 행이라 기존 이력은 지우지 않고 그 분기만 upsert (CSV보다 먼저)
+                    get_store().upsert_history(rows, source="dataroma", replace=False)
+                    append_csv(rows, STOCK_FILENAME)
+                saved_rows += len(rows)
+            # 보충할 쌍을 티커 완료와 같은 기록으로 남김 (3단계 전에 중단돼도 다음 실행에서 보충)
+            stock_manifest.mark_many([(FALLBACK, quarter, code, ticker) for code in missing] + [(quarter, ticker)],
+                                     rows=len(rows))
+
+        for count, ticker in enumerate(pending, 1):
+            print(f"   [{count}/{len(pending)}] {ticker}...", end="\r")
+            fetch_stock(ticker)
+            pause()
+        if retry_queue:
+            print(f"\n🔁 stock.php 재시도 대기열 {len(retry_queue)}개 ({retry_queue.summary()})")
+            for ticker in retry_queue.drain():
+                fetch_stock(ticker)
+                pause()
+
+        # 3. stock.php에 없는 (구루, 티커)는 hist.php로 보충 (이미 받은 쌍은 건너뜀)
+        already = len(fallback)
+        fallback = [(g, t) for g, t in fallback if not manifest.is_done(g["code"], t)]
+        covered_pairs -= already - len(fallback)
+        # 이전 실행에서 보충하지 못한 쌍 (stock.php는 완료로 기록됨)
+        fallback += [(g, t) for g, t in pending_fallback(stock_manifest, quarter, gurus_by_code)
+                     if not manifest.is_done(g["code"], t) and (g, t) not in fallback]
+        fallback_pages = 0
+        if fallback:
+            print(f"\n🔁 stock.php에 없는 {len(fallback)}개 (구루, 종목)은 hist.php로 보충")
+        retried = False
+        while fallback:
+            for guru, ticker in fallback:
+                try:
+                    fetch_history_pair(fetcher, manifest, guru, ticker, retry_queue)
+                    fallback_pages += fetcher.last_outcome == SUCCESS
+                except Exception:
+                    metrics.count("error")
+                pause()
+            # 재시도 소진된 쌍은 한 번만 더
+            fallback = [] if retried else retry_queue.drain()
+            retried = True
+        if retry_queue:
+            metrics.count("retry_exhausted", len(retry_queue))
+            print(f"   ⚠️ {len(retry_queue)}개는 여전히 실패 ({retry_queue.summary()}) → 재실행 시 이어서 수집")
+
+        # 쌍 단위 모드였다면 같은 (구루, 티커)마다 hist.php를 한 번씩 열었음
+        loaded = stock_pages + fallback_pages
+        saved = max(covered_pairs - loaded, 0)
+        metrics.count("pages_saved", saved)
+        print(f"\n📉 페이지 로드: stock.php {stock_pages}개 + hist.php 보충 {fallback_pages}개 = {loaded}개 "
+              f"(쌍 단위였다면 hist.php {covered_pairs}개 → {saved}개 절약)")
+        print(f"💾 +{saved_rows}행 저장 → {STOCK_FILENAME}" + (f", {FILENAME}" if fallback_pages else ""))
+        print(f"📡 수집 백엔드: 캐시 {fetcher.stats['cache']}회 / HTTP {fetcher.stats['http']}회 / 브라우저 {fetcher.stats['browser']}회")
+        if format_report(CLEAN_FAILURES):
+            print(f"\n⚠️ 숫자 변환 실패: {format_report(CLEAN_FAILURES)}")
+    metrics.finish()
+    return {"pair_pages": pair_pages, "stock_pages": stock_pages,
+            "fallback_pages": fallback_pages, "pages_saved": saved}
+
+
+# ============================================================================
+# 비동기 모드: 페이지 풀 + 호스트 단위 요청 예산
+# ============================================================================
+class HostRateLimiter:
+    """호스트 전체에 걸친 요청 간격 관리 (여러 페이지/구루가 하나의 예산을 공유)"""
+
+    def __init__(self, rate_per_sec):
+        self.interval = 1.0 / rate_per_sec
+        self._next_slot = 0.0
+        self.total_wait = 0.0  # 예산 때문에 기다린 시간 누적 (초)
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        # 다음 슬롯을 예약만 하고, 실제 대기는 lock 밖에서 (다른 작업은 다음 슬롯을 예약)
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot)
+            # 동기 모드처럼 약간의 랜덤 지터를 섞어 규칙적인 패턴을 피함
+            self._next_slot = slot + self.interval * random.uniform(1.0, 1.3)
+        delay = slot - now
+        if delay > 0:
+            self.total_wait += delay
+            get_metrics().add_wait(delay, "rate_limit")
+            await asyncio.sleep(delay)
+
+
+class AsyncPagePool:
+    """
+    Playwright 페이지 풀 (동시 요청 수 제한 겸용)
+    브라우저는 HTTP 폴백이 처음 필요할 때만 띄웁니다.
+    """
+
+    def __init__(self, size, user_agent=USER_AGENT, lean=None):
+        self.size = size
+        self.user_agent = user_agent
+        self.lean = lean or LeanProfile(DATAROMA_DOMAINS)
+        self.slots = asyncio.Semaphore(size)
+        self._pages = asyncio.Queue()
+        self._start_lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+
+    async def acquire(self):
+        async with self._start_lock:
+            if self._browser is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                context = await self._browser.new_context(user_agent=self.user_agent)
+                await self.lean.apply_async(context)
+                for _ in range(self.size):
+                    self._pages.put_nowait(await context.new_page())
+        return await self._pages.get()
+
+    def release(self, page):
+        self._pages.put_nowait(page)
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+            await self._playwright.stop()
+        self._browser = self._playwright = None
+
+
+async def fetch_result_async(page_pool, fetcher, limiter, url, wait_ms):
+    """
+    캐시 → HTTP → (#grid가 없으면) 풀의 페이지로 폴백. FetchResult 반환
+    타임아웃/차단은 fetcher.retry 정책으로 재시도 (백오프 동안은 슬롯을 반납)
+    """
+    html = fetcher.lookup(url)
+    if html is not None:
+        return FetchResult(SUCCESS, html, 200)
+
+    async def attempt(n):
+        async with page_pool.slots:
+            await limiter.wait()
+            result = await asyncio.to_thread(fetcher.fetch_http_result, url)
+            # 차단을 브라우저로 우회하지 않음 (DataromaFetcher.fetch_once와 같은 기준)
+            http_empty = result.outcome == EMPTY and result.status == 200
+            if result.outcome != TRANSIENT and not http_empty:
+                return result
+
+            try:
+                page = await page_pool.acquire()
+            except ImportError:
+                return result  # Playwright 미설치: HTTP 결과로 판단
+            timing = {}
+            try:
+                await limiter.wait()
+                # 재시도할수록 selector 대기를 늘림
+                html = await page_pool.lean.load_async(page, resolve_url(url), "#grid", timeout=20000,
+                                                       wait_ms=wait_ms * n, timing=timing)
+            except Exception as e:
+                fetcher.metrics.page_load("dataroma", url, timing, failure_status(e))
+                if http_empty and "selector_wait" in timing:
+                    return FetchResult(EMPTY, status=200)
+                return FetchResult(TRANSIENT, status=failure_status(e))
+            finally:
+                page_pool.release(page)
+            fetcher.stats["browser"] += 1
+            fetcher.metrics.page_load("dataroma", url, timing, nbytes=page_pool.lean.last_bytes)
+            return FetchResult(SUCCESS, html, 200)
+
+    result = await fetcher.retry.run_async(attempt, host_of(url))
+    if result.outcome == SUCCESS:
+        fetcher.remember(url, result.body)
+    else:
+        fetcher.stats["miss"] += 1
+        fetcher.metrics.count(f"fetch_{result.outcome}")
+    return result
+
+
+async def fetch_page_async(page_pool, fetcher, limiter, url, wait_ms):
+    """fetch_result_async의 HTML만 (실패하면 None)"""
+    return (await fetch_result_async(page_pool, fetcher, limiter, url, wait_ms)).body
+
+
+async def collect_activity_tickers_async(page_pool, fetcher, limiter, guru):
+    """m_activity.php에서 stock.php 링크를 모아 티커 목록 반환 (페이지를 못 읽었으면 None)"""
+    url_activity = f"https://www.dataroma.com/m/m_activity.php?m={guru['code']}&typ=a"
+
+    try:
+        html = await fetch_page_async(page_pool, fetcher, limiter, url_activity, wait_ms=5000)
+        if html is None:
+            print(f"   ⚠️ [{guru['name']}] 테이블 로딩 실패 (데이터 없음)")
+            return None
+        return extract_stock_symbols(html)
+    except Exception as e:
+        print(f"   ❌ [{guru['name']}] Activity 에러: {e}")
+        return None
+
+
+async def fetch_history_async(page_pool, fetcher, limiter, guru, ticker):
+    """
+    hist.php 한 페이지 수집 후 파싱. (티커, 결과 종류, DataFrame 또는 None) 반환
+    결과 종류: success / empty (데이터 없음) / transient · blocked (재시도 소진) / error (파싱 실패)
+    """
+    history_url = f"https://www.dataroma.com/m/hist/hist.php?f={guru['code']}&s={ticker}"
+
+    result = await fetch_result_async(page_pool, fetcher, limiter, history_url, wait_ms=2000)
+    if result.outcome != SUCCESS:
+        return ticker, result.outcome, None
+
+    # 파싱은 슬롯을 반납한 뒤에 (다른 작업이 바로 요청을 보낼 수 있도록)
+    try:
+        return ticker, SUCCESS, parse_history_html(result.body, guru, ticker)
+    except Exception:
+        get_metrics().count("error")
+        return ticker, "error", None
+
+
+async def save_history_results(page_pool, fetcher, limiter, manifest, retry_queue, guru, tickers):
+    """
+    tickers를 병렬로 수집해서 끝나는 순서대로 저장. (저장한 행 수, 실패 수) 반환
+    재시도를 다 쓴 종목은 retry_queue에 (구루, 티커)로 넣음
+    """
+    tasks = [fetch_history_async(page_pool, fetcher, limiter, guru, ticker) for ticker in tickers]
+    saved_rows = 0
+    failed = 0
+    # 동기 호출이라 다른 코루틴의 쓰기와 섞이지 않음
+    for task in asyncio.as_completed(tasks):
+        ticker, outcome, hist_df = await task
+        if outcome in RETRYABLE:
+            retry_queue.add((guru, ticker), outcome)
+        if outcome not in (SUCCESS, EMPTY):
+            # 실패는 기록하지 않음 → 재시도 대기열 / 다음 실행에서 다시 시도
+            failed += 1
+            continue
+        try:
+            saved_rows += commit_ticker(manifest, guru, ticker, hist_df)
+        except Exception:
+            # 저장 실패는 기록하지 않음 → 다음 실행에서 다시 시도
+            failed += 1
+            get_metrics().count("error")
+    return saved_rows, failed
+
+
+async def scrape_guru_async(page_pool, fetcher, limiter, manifest, retry_queue, guru_slots, guru, index, total):
+    """
+    구루 한 명 처리: 티커 수집 → 히스토리 병렬 수집 → 종목별 즉시 저장
+    실패가 남았으면 티커 목록 반환 (재시도 후 완료 판단용), 아니면 None
+    """
+    if manifest.is_done(guru["code"]):
+        print(f"--- [{index+1}/{total}] {guru['name']} ✔️ 완료됨 (건너뜀) ---")
+        return None
+
+    async with guru_slots:
+        print(f"--- [{index+1}/{total}] {guru['name']} ({guru['style']}) 시작 ---")
+
+        tickers = await collect_activity_tickers_async(page_pool, fetcher, limiter, guru)
+        activity_ok = tickers is not None
+        tickers = tickers or []
+        print(f"   👉 [{guru['name']}] {len(tickers)}개 종목 발견")
+
+        pending = [t for t in tickers if not manifest.is_done(guru["code"], t)]
+        saved_rows, failed = await save_history_results(page_pool, fetcher, limiter, manifest,
+                                                        retry_queue, guru, pending)
+
+        report_guru(guru["name"], saved_rows, len(tickers) - failed, len(tickers), failed)
+        # 순차 모드와 같은 기준: Activity 페이지를 읽었고 실패가 없으면 구루 완료
+        if activity_ok and failed == 0:
+            manifest.mark_done(guru["code"])
+        return tickers if activity_ok and failed else None
+
+
+async def scrape_and_save_async(concurrency=CONCURRENCY,
+                                guru_concurrency=GURU_CONCURRENCY,
+                                rate_per_sec=HOST_RATE_PER_SEC,
+                                gurus=None):
+    """
+    비동기 병렬 수집 모드
+    concurrency: 동시 요청 수 (HTTP 커넥션 / 폴백 페이지 풀 크기)
+    guru_concurrency: 동시에 진행할 구루 수
+    rate_per_sec: dataroma.com 전체에 대한 초당 요청 예산
+    gurus: 대상 구루 목록 (기본 TARGET_GURUS)
+    """
+    gurus = gurus or TARGET_GURUS
+    if os.path.exists(FILENAME):
+        print(f"ℹ️ 알림: '{FILENAME}' 파일이 이미 존재합니다. 뒤에 이어서 저장합니다.")
+    else:
+        print(f"ℹ️ 알림: 새로운 파일 '{FILENAME}'을 생성합니다.")
+
+    manifest = open_checkpoint()
+    metrics = start_run("dataroma_buysell_async")
+    page_pool = AsyncPagePool(concurrency)
+    limiter = HostRateLimiter(rate_per_sec)
+    guru_slots = asyncio.Semaphore(guru_concurrency)
+    retry_queue = RetryQueue()
+
+    print(f"\n⚡ [병렬 모드] 동시 요청 {concurrency}개, 구루 {guru_concurrency}명 동시, "
+          f"초당 {rate_per_sec}회 요청\n")
+
+    with DataromaFetcher(pool_size=concurrency, user_agent=USER_AGENT, metrics=metrics) as fetcher:
+        try:
+            remaining = await asyncio.gather(*[
+                scrape_guru_async(page_pool, fetcher, limiter, manifest, retry_queue, guru_slots, guru, i, len(gurus))
+                for i, guru in enumerate(gurus)
+            ])
+
+            # 재시도를 다 쓴 종목은 모든 구루가 끝난 뒤 한 번 더 (구루별로 묶어 병렬)
+            if retry_queue:
+                print(f"\n🔁 재시도 대기열 {len(retry_queue)}개 ({retry_queue.summary()}) 다시 수집")
+                by_guru = {}
+                for guru, ticker in retry_queue.drain():
+                    by_guru.setdefault(guru["code"], (guru, []))[1].append(ticker)
+                await asyncio.gather(*[
+                    save_history_results(page_pool, fetcher, limiter, manifest, retry_queue, guru, tickers)
+                    for guru, tickers in by_guru.values()
+                ])
+                unfinished = {g["code"]: tickers for g, tickers in zip(gurus, remaining) if tickers}
+                finish_retried_gurus(manifest, unfinished)
+                if retry_queue:
+                    metrics.count("retry_exhausted", len(retry_queue))
+                    print(f"   ⚠️ {len(retry_queue)}개는 여전히 실패 ({retry_queue.summary()}) "
+                          f"→ 재실행 시 이어서 수집")
+        finally:
+            await page_pool.close()
+
+        print(f"\n📡 수집 백엔드: 캐시 {fetcher.stats['cache']}회 / HTTP {fetcher.stats['http']}회 / 브라우저 {fetcher.stats['browser']}회")
+        if page_pool.lean.summary():
+            print(f"🪶 브라우저 전송량: {page_pool.lean.summary()}")
+        if format_report(CLEAN_FAILURES):
+            print(f"\n⚠️ 숫자 변환 실패: {format_report(CLEAN_FAILURES)}")
         print(f"\n🎉 모든 작업 종료. 결과 파일: {FILENAME}")
+        with metrics.stage("save"):
+            export_history_parquet()
+        metrics.finish()
+
 
 if __name__ == "__main__":
-    scrape_and_save_incremental()
\ No newline at end of file
+    # 옵션 1: 순차 모드 (안전, 느림)
+    scrape_and_save_incremental()
+
+    # 옵션 2: 비동기 병렬 모드 (페이지 풀 + 호스트 요청 예산)
+    # asyncio.run(scrape_and_save_async(concurrency=4, guru_concurrency=2, rate_per_sec=2.0))
+
+    # 옵션 3: DataRoma_craw_hold 스냅샷이 있는 기간은 hist.php 없이 로컬 계산
+    #         (hist.php 크롤링은 첫 스냅샷 이전 이력 보충용)
+    # from position_delta import compute_position_deltas
+    # events = compute_position_deltas(pd.read_csv("Guru_Portfolios_TimeSeries_2024-2025.csv"))
@@ -0,0 +1,92 @@
+"""
+테이블 파싱 벤치마크: 기존 pd.read_html(문서 전체) + normalize_table vs extract_table (#grid만)
+
+Dataroma 페이지와 비슷하게 메뉴/광고용 작은 테이블 여러 개 + #grid 본문 테이블을 만들어
+페이지당 파싱 시간을 비교합니다.
+    python benchmarks/bench_table_extract.py
+    python benchmarks/bench_table_extract.py --pages 50 --rows 20 100 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from io import StringIO
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_clean import normalize_table
+from table_extract import extract_table
+
+FILLER_TABLES = 8
+
+
+def make_page(rows, seed=0):
+    rng = random.Random(seed)
+    parts = ["<html><head><title>Holdings</title></head><body>"]
+    for i in range(FILLER_TABLES):
+        cells = "".join(f"<td><a href='/m/menu{i}_{j}.php'>Menu {j}</a></td>" for j in range(6))
+        parts.append(f"<table class='nav'><tr>{cells}</tr></table><div>{'lorem ipsum ' * 50}</div>")
+
+    parts.append("<table id='grid'><thead><tr><th>History</th><th>Stock</th><th>% of portfolio</th>"
+                 "<th>Recent activity</th><th>Shares</th><th>Reported Price</th><th>Value</th></tr></thead><tbody>")
+    for _ in range(rows):
+        sym = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(2, 4)))
+        parts.append(
+            f"<tr><td><a href='/m/hist/hist.php?f=BRK&s={sym}'><img src='h.gif'></a></td>"
+            f"<td><a href='/m/stock.php?sym={sym}'>{sym}<span> - {sym} Corp.</span></a></td>"
+            f"<td>{rng.uniform(0, 30):.2f}</td>"
+            f"<td>{rng.choice(['Add 12.5%', 'Reduce 3.1%', 'Buy', ''])}</td>"
+            f"<td>{rng.randint(1_000, 900_000_000):,}</td>"
+            f"<td>${rng.uniform(1, 900):,.2f}</td>"
+            f"<td>${rng.randint(1_000_000, 90_000_000_000):,}</td></tr>"
+        )
+    parts.append("</tbody></table></body></html>")
+    return "".join(parts)
+
+
+def legacy_parse(html):
+    """기존 방식: 문서의 모든 테이블 → 가장 큰 테이블 → 숫자 정리"""
+    dfs = pd.read_html(StringIO(html))
+    df = max(dfs, key=len)
+    return normalize_table(df)[0]
+
+
+def targeted_parse(html):
+    return extract_table(html, "grid", links=True)[0]
+
+
+def bench(func, pages):
+    start = time.perf_counter()
+    for html in pages:
+        func(html)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--rows", type=int, nargs="+", default=[20, 100, 500])
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} | {'read_html ms/page':>18} | {'extract ms/page':>16} | {'speedup':>8}")
+    print("-" * 58)
+    for rows in args.rows:
+        pages = [make_page(rows, seed=i) for i in range(args.pages)]
+
+        # 결과가 같은지 먼저 확인 (텍스트/숫자 컬럼)
+        legacy, targeted = legacy_parse(pages[0]), targeted_parse(pages[0])
+        assert len(legacy) == len(targeted) == rows
+        assert legacy["Value"].astype("float64").tolist() == targeted["Value"].astype("float64").tolist()
+
+        legacy_time = bench(legacy_parse, pages)
+        targeted_time = bench(targeted_parse, pages)
+        print(f"{rows:>6} | {legacy_time / args.pages * 1000:>18.2f} | "
+              f"{targeted_time / args.pages * 1000:>16.2f} | {legacy_time / targeted_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
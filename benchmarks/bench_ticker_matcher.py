@@ -0,0 +1,104 @@
+"""
+티커 매칭 벤치마크: 기존 티커별 re.search 방식 vs TickerMatcher (단일 패스)
+
+티커 수를 늘려가며 초당 처리 게시물 수를 비교합니다.
+    python benchmarks/bench_ticker_matcher.py
+    python benchmarks/bench_ticker_matcher.py --posts 500 --sizes 30 300 3000 10000
+"""
+
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ticker_matcher import TickerMatcher
+
+WORDS = (
+    "the stock market is going up today buy calls puts yolo earnings report "
+    "guidance revenue beat miss short squeeze moon diamond hands dip hold sell "
+    "on it for now all in so what can you see"
+).split()
+
+
+def legacy_extract(text, target_tickers):
+    """기존 RedditTickerCrawler.extract_tickers 구현 (비교용)"""
+    if not text:
+        return []
+    text_upper = text.upper()
+    found = []
+    for ticker in target_tickers:
+        if re.search(r'\b' + re.escape(ticker) + r'\b', text_upper):
+            found.append(ticker)
+    return found
+
+
+def make_tickers(n, seed=0):
+    rng = random.Random(seed)
+    tickers = {'AAPL', 'MSFT', 'GME', 'AMC', 'BB', 'TSLA', 'NVDA', 'SPY'}
+    while len(tickers) < n:
+        tickers.add(''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 5))))
+    return tickers
+
+
+def make_posts(n, tickers, seed=1):
+    rng = random.Random(seed)
+    pool = sorted(tickers)
+    posts = []
+    for _ in range(n):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(20, 200))]
+        for _ in range(rng.randint(0, 4)):
+            mention = rng.choice(pool)
+            words.insert(rng.randrange(len(words)), rng.choice([mention, f"${mention}", mention.lower()]))
+        posts.append(' '.join(words))
+    return posts
+
+
+def posts_per_sec(fn, posts, min_seconds=0.5):
+    done = 0
+    start = time.perf_counter()
+    while True:
+        for post in posts:
+            fn(post)
+        done += len(posts)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return done / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 100, 1000, 10000])
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="이 티커 수를 넘으면 기존 방식은 생략 (너무 느림)")
+    args = parser.parse_args()
+
+    print(f"{'티커 수':>8} | {'기존 (posts/s)':>15} | {'매처 (posts/s)':>15} | {'배율':>7}")
+    print("-" * 56)
+    for size in args.sizes:
+        tickers = make_tickers(size)
+        posts = make_posts(args.posts, tickers)
+
+        build_start = time.perf_counter()
+        matcher = TickerMatcher(tickers, ambiguous=None)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        new_rate = posts_per_sec(matcher.extract, posts)
+        if size <= args.legacy_max:
+            old_rate = posts_per_sec(lambda text: legacy_extract(text, tickers), posts)
+            # 모호한 티커 처리를 끈 상태에서는 결과가 같아야 함
+            for post in posts[:50]:
+                assert set(legacy_extract(post, tickers)) == set(matcher.extract(post)), post
+            print(f"{size:>8} | {old_rate:>15,.0f} | {new_rate:>15,.0f} | {new_rate / old_rate:>6.1f}x"
+                  f"  (빌드 {build_ms:.1f}ms)")
+        else:
+            print(f"{size:>8} | {'-':>15} | {new_rate:>15,.0f} | {'-':>7}  (빌드 {build_ms:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+"""
+오프라인 벤치마크용 로컬 대역 서버 (Dataroma HTML + PullPush JSON)
+
+실제 사이트에 요청하지 않고 스크래퍼를 반복 측정할 수 있도록
+- benchmarks/fixtures/ 에 녹화해 둔 페이지가 있으면 그대로,
+- 없으면 URL 파라미터로 시드를 정한 합성 페이지를 (항상 같은 내용으로)
+돌려줍니다. 응답 지연과 429 (Retry-After) 주입을 설정할 수 있습니다.
+
+    python benchmarks/fixture_server.py serve --port 8765 --latency 0.05 --error-rate 0.02
+    python benchmarks/fixture_server.py record https://www.dataroma.com/m/holdings.php?m=BRK
+    python benchmarks/fixture_server.py record-pullpush wallstreetbets --year 2023 --quarter 1 --pages 5
+
+WHALEBUZZ_DATAROMA_ORIGIN=http://127.0.0.1:8765 으로 Dataroma 요청을 이 서버로 돌리고,
+PullPush는 crawler.base_url을 <서버>/reddit/search/submission 으로 바꿔서 씁니다.
+"""
+
+import argparse
+import bisect
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+PULLPUSH_PATH = "/reddit/search/submission"
+
+# 합성 페이지에 쓰는 티커 (PullPush 벤치마크의 타겟 티커로도 사용)
+TICKERS = [
+    "AAPL", "MSFT", "AMZN", "GOOGL", "META", "NVDA", "TSLA", "BRK.B", "JPM", "V",
+    "KO", "BAC", "AXP", "OXY", "CVX", "KHC", "MCO", "DVA", "VRSN", "CHTR",
+    "GME", "AMC", "PLTR", "SOFI", "AMD", "INTC", "NFLX", "DIS", "PYPL", "COIN",
+    "BABA", "NKE", "SBUX", "COST", "WMT", "PFE", "MRK", "UNH", "JNJ", "XOM",
+    "GS", "MS", "C", "WFC", "USB", "BK", "SCHW", "BLK", "SPGI", "MA",
+]
+FILLER_TABLES = 6       # 메뉴/광고용 작은 테이블 수 (실제 페이지 구조 흉내)
+POSTS_PER_DAY = 400     # 합성 PullPush 게시물 밀도 (서브레딧당)
+
+_WORDS = ("calls puts moon yolo dip earnings guidance buyback dividend squeeze "
+          "bagholder tendies rally crash hedge value growth long short").split()
+
+
+def _rng(*parts):
+    """URL 파라미터로 시드를 정한 난수 생성기 (같은 요청 → 같은 페이지)"""
+    return random.Random(zlib.crc32("|".join(map(str, parts)).encode("utf-8")))
+
+
+def fixture_key(path, query=""):
+    """요청 경로 + 쿼리 → 녹화 파일 이름"""
+    raw = path.strip("/") + ("?" + query if query else "")
+    return re.sub(r"[^A-Za-z0-9.=-]+", "_", raw)
+
+
+def _base36(number):
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        number, rem = divmod(number, 36)
+        out = digits[rem] + out
+        if number == 0:
+            return out
+
+
+# ============================================================================
+# 합성 Dataroma 페이지
+# ============================================================================
+def _page(title, grid):
+    parts = [f"<html><head><title>{title}</title></head><body>"]
+    for i in range(FILLER_TABLES):
+        cells = "".join(f"<td><a href='/m/menu{i}_{j}.php'>Menu {j}</a></td>" for j in range(6))
+        parts.append(f"<table class='nav'><tr>{cells}</tr></table><div>{'lorem ipsum ' * 40}</div>")
+    parts.append(grid)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def _pick_tickers(rng, count):
+    return rng.sample(TICKERS, min(count, len(TICKERS)))
+
+
+def holdings_page(code, period=""):
+    rng = _rng("holdings", code, period)
+    rows = []
+    for sym in _pick_tickers(rng, rng.randint(20, 45)):
+        rows.append(
+            f"<tr><td><a href='/m/hist/hist.php?f={code}&s={sym}'><img src='h.gif'></a></td>"
+            f"<td><a href='/m/stock.php?sym={sym}'>{sym}<span> - {sym} Corp.</span></a></td>"
+            f"<td>{rng.uniform(0, 30):.2f}</td>"
+            f"<td>{rng.choice(['Add 12.5%', 'Reduce 3.1%', 'Buy', ''])}</td>"
+            f"<td>{rng.randint(1_000, 900_000_000):,}</td>"
+            f"<td>${rng.uniform(1, 900):,.2f}</td>"
+            f"<td>${rng.randint(1_000_000, 90_000_000_000):,}</td></tr>"
+        )
+    grid = ("<table id='grid'><thead><tr><th>History</th><th>Stock</th><th>% of portfolio</th>"
+            "<th>Recent activity</th><th>Shares</th><th>Reported Price</th><th>Value</th></tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody></table>")
+    return _page(f"Holdings {code} {period}", grid)
+
+
+def activity_rows(code):
+    """(활동, 티커, 주식 수 변화, 비중 변화) 목록"""
+    rng = _rng("activity", code)
+    return [
+        (rng.choice(['Buy', 'Add 4.2%', 'Reduce 10.0%', 'Sell']), sym,
+         rng.randint(1_000, 50_000_000), rng.uniform(-5, 5))
+        for sym in _pick_tickers(rng, rng.randint(8, 16))
+    ]
+
+
+def activity_page(code):
+    rows = []
+    for activity, sym, change, pct in activity_rows(code):
+        rows.append(
+            f"<tr><td>{activity}</td>"
+            f"<td><a href='/m/stock.php?sym={sym}'>{sym} - {sym} Corp.</a></td>"
+            f"<td>{change:,}</td>"
+            f"<td>{pct:.2f}</td></tr>"
+        )
+    grid = ("<table id='grid'><thead><tr><th>Activity</th><th>Stock</th><th>Share change</th>"
+            f"<th>% change to portfolio</th></tr></thead><tbody>{''.join(rows)}</tbody></table>")
+    return _page(f"Activity {code}", grid)
+
+
+def history_rows(code, sym):
+    """(분기, 주식 수, 비중, 활동, 비중 변화, 가격) 목록 (최신 분기부터)"""
+    rng = _rng("hist", code, sym)
+    year = 2025
+    return [
+        (f"{year - i // 4} Q{4 - i % 4}", rng.randint(1_000, 900_000_000), rng.uniform(0, 30),
+         rng.choice(['Add 12.5%', 'Reduce 3.1%', 'Buy', '']), rng.uniform(-3, 3), rng.uniform(1, 900))
+        for i in range(rng.randint(6, 24))
+    ]
+
+
+def history_page(code, sym):
+    rows = []
+    for period, shares, weight, activity, change, price in history_rows(code, sym):
+        rows.append(
+            f"<tr><td>{period}</td>"
+            f"<td>{shares:,}</td>"
+            f"<td>{weight:.2f}%</td>"
+            f"<td>{activity}</td>"
+            f"<td>{change:.2f}%</td>"
+            f"<td>${price:,.2f}</td></tr>"
+        )
+    grid = ("<table id='grid'><thead><tr><th>Period</th><th>Shares</th><th>% of portfolio</th>"
+            "<th>Activity</th><th>% change to portfolio</th><th>Reported Price</th></tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody></table>")
+    return _page(f"History {code} {sym}", grid)
+
+
+def _guru_codes():
+    """합성 stock.php에 보유자로 올릴 매니저 코드 (config.py의 두 구루 목록)"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import DEFAULT_CONFIG
+    codes = [g["code"] for section in ("history", "holdings") for g in DEFAULT_CONFIG[section]["gurus"]]
+    return list(dict.fromkeys(codes))
+
+
+def stock_page(sym):
+    """
+    종목별 보유자 목록. 각 매니저 행은 hist.php의 최신 분기 행과 같은 값
+    (Activity 페이지에서 'Sell'인 매니저는 전량 매도로 보고 목록에서 뺌)
+    """
+    rows = []
+    for code in _guru_codes():
+        activity = {s: a for a, s, _, _ in activity_rows(code)}
+        if activity.get(sym, "Sell") == "Sell":
+            continue
+        period, shares, weight, recent, _, price = history_rows(code, sym)[0]
+        rows.append(
+            f"<tr><td><a href='/m/hist/hist.php?f={code}&s={sym}'><img src='h.gif'></a></td>"
+            f"<td><a href='/m/holdings.php?m={code}'>{code} Capital</a></td>"
+            f"<td>{weight:.2f}%</td>"
+            f"<td>{recent}</td>"
+            f"<td>{shares:,}</td>"
+            f"<td>${price:,.2f}</td>"
+            f"<td>${shares * price:,.0f}</td></tr>"
+        )
+    grid = (f"<p>Period: {period.split()[1]} {period.split()[0]}</p>" if rows else "") + (
+        "<table id='grid'><thead><tr><th>History</th><th>Portfolio Manager - Firm</th>"
+        "<th>% of portfolio</th><th>Recent activity</th><th>Shares</th><th>Reported Price</th>"
+        f"<th>Value</th></tr></thead><tbody>{''.join(rows)}</tbody></table>")
+    return _page(f"Stock {sym}", grid)
+
+
+def perf_page(code):
+    rng = _rng("perf", code)
+    rows = "".join(f"<tr><td>{year}</td><td>{rng.uniform(-30, 45):.1f}%</td></tr>"
+                   for year in range(2025, 2009, -1))
+    return _page(f"Performance {code}", f"<table><tr><th>Year</th><th>Return</th></tr>{rows}</table>")
+
+
+def synthetic_dataroma(path, params):
+    """Dataroma 경로 → 합성 HTML (모르는 경로면 None)"""
+    get = lambda name: params.get(name, [""])[0]
+    if path.endswith("/holdings.php"):
+        return holdings_page(get("m"), get("p"))
+    if path.endswith("/m_activity.php"):
+        return activity_page(get("m"))
+    if path.endswith("/hist.php"):
+        return history_page(get("f"), get("s"))
+    if path.endswith("/stock.php"):
+        return stock_page(get("sym"))
+    if path.endswith("/perf.php"):
+        return perf_page(get("m"))
+    return None
+
+
+# ============================================================================
+# 합성 PullPush 게시물
+# ============================================================================
+class PostPool:
+    """
+    서브레딧별 게시물 풀 (created_utc 오름차순)
+    녹화 파일(pullpush_<subreddit>.json)이 있으면 그 게시물을, 없으면 시각만 만들어 두고
+    응답할 때 시각으로 시드를 정해 본문을 생성
+    """
+
+    def __init__(self, fixture_dir=FIXTURE_DIR, years=(2023, 2025), posts_per_day=POSTS_PER_DAY):
+        self.fixture_dir = fixture_dir
+        self.years = years
+        self.posts_per_day = posts_per_day
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _load(self, subreddit):
+        path = os.path.join(self.fixture_dir, f"pullpush_{subreddit}.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                posts = sorted(json.load(f), key=lambda p: p.get("created_utc", 0))
+            return [p.get("created_utc", 0) for p in posts], posts
+
+        rng = _rng("pullpush", subreddit)
+        start = int(datetime(self.years[0], 1, 1).timestamp())
+        end = int(datetime(self.years[1] + 1, 1, 1).timestamp())
+        count = int((end - start) / 86400 * self.posts_per_day)
+        return sorted(rng.randrange(start, end) for _ in range(count)), None
+
+    def pool(self, subreddit):
+        with self._lock:
+            if subreddit not in self._pools:
+                self._pools[subreddit] = self._load(subreddit)
+            return self._pools[subreddit]
+
+    def _make_post(self, subreddit, index, created_utc):
+        rng = _rng(subreddit, index)
+        mentioned = _pick_tickers(rng, rng.choice([0, 0, 1, 1, 2, 3]))
+        words = rng.sample(_WORDS, 6)
+        title = " ".join(words[:3] + [f"${t}" if rng.random() < 0.3 else t for t in mentioned])
+        post_id = _base36(zlib.crc32(subreddit.encode("utf-8")) * 10_000_000 + index)
+        return {
+            "id": post_id,
+            "created_utc": created_utc,
+            "title": title,
+            "selftext": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(10, 120))),
+            "score": rng.randint(0, 5000),
+            "num_comments": rng.randint(0, 800),
+            "upvote_ratio": round(rng.uniform(0.5, 1.0), 2),
+            "author": f"user{rng.randint(1, 99999)}",
+            "author_flair_text": None,
+            "url": f"https://www.reddit.com/r/{subreddit}/comments/{post_id}/",
+            "permalink": f"/r/{subreddit}/comments/{post_id}/",
+        }
+
+    def search(self, subreddit, after, before, size):
+        """after < created_utc < before 중 최신 size개 (created_utc 내림차순)"""
+        times, posts = self.pool(subreddit)
+        lo = bisect.bisect_right(times, after)
+        hi = bisect.bisect_left(times, before)
+        indexes = range(hi - 1, max(lo, hi - size) - 1, -1)
+        if posts is not None:
+            return [posts[i] for i in indexes]
+        return [self._make_post(subreddit, i, times[i]) for i in indexes]
+
+
+# ============================================================================
+# 서버
+# ============================================================================
+class FixtureServer:
+    """
+    with FixtureServer(latency=0.05, error_rate=0.02) as server:
+        server.url          # http://127.0.0.1:<port>
+        server.snapshot()   # {'dataroma': 120, 'pullpush': 40, 'throttled': 3, 'bytes': ...}
+
+    latency: 응답마다 추가 지연 (초), jitter: 지연에 더할 랜덤 범위 (초)
+    error_rate: PullPush 요청 중 429로 응답할 비율
+    dataroma_error_rate: Dataroma 요청 중 429로 응답할 비율
+    retry_after: 429 응답의 Retry-After 값 (초)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, fixture_dir=FIXTURE_DIR,
+                 latency=0.0, jitter=0.0, error_rate=0.0, dataroma_error_rate=0.0,
+                 retry_after=0.5, seed=0, posts_per_day=POSTS_PER_DAY):
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.dataroma_error_rate = dataroma_error_rate
+        self.retry_after = retry_after
+        self.posts = PostPool(fixture_dir, posts_per_day=posts_per_day)
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def _count(self, **values):
+        with self._lock:
+            self.stats.update(values)
+
+    def _throttle(self, rate):
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+            time.sleep(self.latency + extra)
+
+    def _recorded(self, path, query):
+        file = os.path.join(self.fixture_dir, fixture_key(path, query) + ".html")
+        if os.path.exists(file):
+            with open(file, encoding="utf-8") as f:
+                return f.read()
+        return None
+
+    def respond(self, path, query):
+        """(상태 코드, 헤더, 본문 bytes)"""
+        params = parse_qs(query)
+        if path == PULLPUSH_PATH:
+            if self._throttle(self.error_rate):
+                self._count(throttled=1)
+                return 429, {"Retry-After": str(self.retry_after)}, b""
+            get = lambda name, default: params.get(name, [default])[0]
+            posts = self.posts.search(get("subreddit", ""), int(get("after", 0)),
+                                      int(get("before", 2 ** 31)), int(get("size", 100)))
+            body = json.dumps({"data": posts}).encode("utf-8")
+            self._count(pullpush=1, bytes=len(body))
+            return 200, {"Content-Type": "application/json"}, body
+
+        if self._throttle(self.dataroma_error_rate):
+            self._count(throttled=1)
+            return 429, {"Retry-After": str(self.retry_after)}, b""
+        html = self._recorded(path, query)
+        if html is None:
+            html = synthetic_dataroma(path, params)
+        if html is None:
+            self._count(not_found=1)
+            return 404, {}, b"not found"
+        body = html.encode("utf-8")
+        self._count(dataroma=1, bytes=len(body))
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive (실제 서버처럼 커넥션 재사용)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                server._delay()
+                status, headers, body = server.respond(parts.path, parts.query)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+# ============================================================================
+# 녹화
+# ============================================================================
+def record_page(url, fixture_dir=FIXTURE_DIR):
+    """실제 Dataroma 페이지를 한 번 받아서 fixtures/에 저장 (벤치마크 때 합성 페이지 대신 사용)"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from dataroma_http import DataromaFetcher
+
+    parts = urlsplit(url)
+    with DataromaFetcher(use_cache=False) as fetcher:
+        html = fetcher.fetch_http(url, table_id=None)
+    if html is None:
+        raise RuntimeError(f"페이지를 받지 못했습니다: {url}")
+    os.makedirs(fixture_dir, exist_ok=True)
+    path = os.path.join(fixture_dir, fixture_key(parts.path, parts.query) + ".html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return path
+
+
+def record_pullpush(subreddit, year, quarter, pages=5, fixture_dir=FIXTURE_DIR):
+    """PullPush에서 분기 끝부터 pages 페이지를 받아 fixtures/pullpush_<subreddit>.json에 추가"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from raddit_craw_pullpush import RedditTickerCrawler
+
+    crawler = RedditTickerCrawler(use_cache=False)
+    start_ts, end_ts = crawler.get_quarter_timestamps(year, quarter)
+    path = os.path.join(fixture_dir, f"pullpush_{subreddit}.json")
+    posts = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            posts = {p["id"]: p for p in json.load(f)}
+
+    cursor = end_ts + 1
+    for _ in range(pages):
+        page = crawler._fetch_page(subreddit, start_ts - 1, cursor, cache_ttl=None)
+        if not page:
+            break
+        posts.update((p["id"], p) for p in page)
+        cursor = min(p["created_utc"] for p in page)
+
+    os.makedirs(fixture_dir, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sorted(posts.values(), key=lambda p: p["created_utc"]), f)
+    return path, len(posts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="서버 실행")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0)
+    serve.add_argument("--jitter", type=float, default=0.0)
+    serve.add_argument("--error-rate", type=float, default=0.0, help="PullPush 429 비율")
+    serve.add_argument("--dataroma-error-rate", type=float, default=0.0, help="Dataroma 429 비율")
+    serve.add_argument("--retry-after", type=float, default=0.5)
+
+    record = sub.add_parser("record", help="Dataroma 페이지 녹화")
+    record.add_argument("urls", nargs="+")
+
+    record_pp = sub.add_parser("record-pullpush", help="PullPush 게시물 녹화")
+    record_pp.add_argument("subreddit")
+    record_pp.add_argument("--year", type=int, required=True)
+    record_pp.add_argument("--quarter", type=int, required=True)
+    record_pp.add_argument("--pages", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        for url in args.urls:
+            print(f"💾 {url} → {record_page(url)}")
+    elif args.command == "record-pullpush":
+        path, count = record_pullpush(args.subreddit, args.year, args.quarter, args.pages)
+        print(f"💾 r/{args.subreddit} 게시물 {count}개 → {path}")
+    else:
+        server = FixtureServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                               error_rate=args.error_rate, dataroma_error_rate=args.dataroma_error_rate,
+                               retry_after=args.retry_after)
+        print(f"🧪 fixture 서버: {server.url} (Ctrl+C로 종료)")
+        try:
+            server._httpd.serve_forever()
+        except KeyboardInterrupt:
+            print(f"\n📊 {server.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
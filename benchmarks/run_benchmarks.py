@@ -0,0 +1,349 @@
+"""
+오프라인 스크래퍼 벤치마크 (로컬 fixture 서버 대상)
+
+각 스크래퍼 진입점을 benchmarks/fixture_server.py에 대고 별도 프로세스로 실행해서
+- pages/sec: 서버가 200으로 응답한 페이지 수 / 실행 시간
+- parse ms/page: extract_table (PullPush는 JSON 디코딩 + 티커 매칭) 누적 시간 / 호출 수
+- peak RSS: 실행 프로세스의 최대 메모리
+- rate-limit wait: 요청 예산/딜레이 때문에 기다린 시간
+을 측정하고 benchmarks/results/history.jsonl에 누적합니다.
+같은 설정의 직전 기록과 비교해서 느려진 항목을 표시합니다.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --scenarios dataroma_holdings pullpush --latency 0.02 --error-rate 0.05
+    python benchmarks/run_benchmarks.py --fail-on-regression 0.15
+
+캐시는 실행마다 임시 파일을 쓰므로 항상 콜드 스타트 기준입니다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_FILE = os.path.join(BENCH_DIR, "results", "history.jsonl")
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+from fixture_server import FixtureServer, PULLPUSH_PATH, TICKERS
+
+SCENARIOS = ["dataroma_holdings", "dataroma_buysell", "dataroma_buysell_async", "dataroma_buysell_stock",
+             "yahoo_dataroma", "pullpush"]
+
+
+# ============================================================================
+# 자식 프로세스: 계측 후 진입점 실행
+# ============================================================================
+class Probe:
+    """파싱 시간 / 대기 시간 누적"""
+
+    def __init__(self):
+        self.parse_seconds = 0.0
+        self.parse_calls = 0
+        self.sleep_seconds = 0.0
+
+    def timed(self, func, count=True):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.parse_seconds += time.perf_counter() - start
+                self.parse_calls += count
+        return wrapper
+
+    def install(self):
+        """스크래퍼 모듈을 import하기 전에 호출 (from table_extract import extract_table이 감싼 함수를 가져가도록)"""
+        import table_extract
+        table_extract.extract_table = self.timed(table_extract.extract_table)
+
+        sleep = time.sleep
+
+        def counted_sleep(seconds):
+            self.sleep_seconds += max(0.0, seconds)
+            sleep(seconds)
+        time.sleep = counted_sleep
+
+
+def _run_holdings(args, probe):
+    import DataRoma_craw_hold as hold
+    hold.PAGE_DELAY = (args.page_delay, args.page_delay)
+    df = hold.scrape_history_portfolios(update=False, gurus=hold.TARGET_GURUS[:args.gurus])
+    return {"rows": 0 if df is None else len(df)}
+
+
+def _run_buysell(args, probe):
+    import Dataroma_buysell_craw as buysell
+    buysell.PAGE_DELAY = (args.page_delay, args.page_delay)
+    buysell.scrape_and_save_incremental(gurus=buysell.TARGET_GURUS[:args.gurus])
+    return {"rows": _csv_rows(buysell.FILENAME)}
+
+
+def _run_buysell_async(args, probe):
+    import Dataroma_buysell_craw as buysell
+
+    limiters = []
+    limiter_class = buysell.HostRateLimiter
+
+    def make_limiter(rate):
+        limiters.append(limiter_class(rate))
+        return limiters[-1]
+    buysell.HostRateLimiter = make_limiter
+
+    asyncio.run(buysell.scrape_and_save_async(rate_per_sec=args.dataroma_rate,
+                                                gurus=buysell.TARGET_GURUS[:args.gurus]))
+    return {"rows": _csv_rows(buysell.FILENAME),
+            "rate_limit_wait": sum(limiter.total_wait for limiter in limiters)}
+
+
+def _run_buysell_stock(args, probe):
+    import Dataroma_buysell_craw as buysell
+    buysell.PAGE_DELAY = (args.page_delay, args.page_delay)
+    plan = buysell.scrape_by_stock(gurus=buysell.TARGET_GURUS[:args.gurus])
+    return {"rows": _csv_rows(buysell.STOCK_FILENAME) + _csv_rows(buysell.FILENAME),
+            "pages_saved": plan["pages_saved"]}
+
+
+def _run_yahoo(args, probe):
+    import yahoo_craw
+    portfolio, perf = yahoo_craw.get_guru_data()
+    return {"rows": len(portfolio) + len(perf)}
+
+
+def _run_pullpush(args, probe):
+    import json as json_module
+    import ticker_matcher
+    json_module.loads = probe.timed(json_module.loads, count=False)
+    ticker_matcher.TickerMatcher.extract = probe.timed(ticker_matcher.TickerMatcher.extract, count=False)
+
+    from raddit_craw_pullpush import RedditTickerCrawler
+    from reddit_sink import NDJSONSink
+
+    crawler = RedditTickerCrawler(requests_per_minute=args.pullpush_rpm, requests_per_hour=0,
+                                  shard_workers=2)
+    crawler.base_url = args.server + PULLPUSH_PATH
+    # 페이지 단위로 세기 위해 _fetch_page 호출 수를 파싱 호출 수로 사용
+    fetch_page = crawler._fetch_page
+
+    def counted_fetch(*a, **kw):
+        probe.parse_calls += 1
+        return fetch_page(*a, **kw)
+    crawler._fetch_page = counted_fetch
+
+    sink = NDJSONSink("bench_reddit.ndjson")
+    crawler.crawl_to_sink(args.year, args.year, set(TICKERS), sink,
+                          posts_per_quarter=args.posts, workers=3)
+    return {"rows": sink.rows, "rate_limit_wait": crawler.limiter.total_wait}
+
+
+RUNNERS = {
+    "dataroma_holdings": _run_holdings,
+    "dataroma_buysell": _run_buysell,
+    "dataroma_buysell_async": _run_buysell_async,
+    "dataroma_buysell_stock": _run_buysell_stock,
+    "yahoo_dataroma": _run_yahoo,
+    "pullpush": _run_pullpush,
+}
+
+
+def _csv_rows(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8-sig") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+def run_child(args):
+    """--child 모드: 시나리오 하나 실행 후 결과를 JSON 한 줄로 출력"""
+    probe = Probe()
+    probe.install()
+    result = {"error": None}
+    start = time.perf_counter()
+    try:
+        # 스크래퍼 진행 로그는 버림 (측정 결과만 출력)
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            result.update(RUNNERS[args.child](args, probe))
+    except BaseException as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    result["parse_seconds"] = probe.parse_seconds
+    result["parse_calls"] = probe.parse_calls
+    result.setdefault("rate_limit_wait", probe.sleep_seconds)
+    # Linux는 KB 단위
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(result))
+
+
+# ============================================================================
+# 부모 프로세스: 서버 실행 + 시나리오별 측정 + 기록
+# ============================================================================
+def run_scenario(name, args, server):
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as workdir:
+        env = dict(os.environ,
+                   WHALEBUZZ_CACHE=os.path.join(workdir, "cache.sqlite"),
+                   WHALEBUZZ_DATAROMA_ORIGIN=server.url)
+        command = [sys.executable, os.path.abspath(__file__), "--child", name, "--server", server.url,
+                   "--gurus", str(args.gurus), "--page-delay", str(args.page_delay),
+                   "--dataroma-rate", str(args.dataroma_rate), "--pullpush-rpm", str(args.pullpush_rpm),
+                   "--year", str(args.year), "--posts", str(args.posts)]
+        before = server.snapshot()
+        completed = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        after = server.snapshot()
+
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        return {"error": (completed.stderr.strip().splitlines() or ["unknown error"])[-1]}
+    result = json.loads(lines[-1])
+
+    served = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+    pages = served.get("dataroma", 0) + served.get("pullpush", 0)
+    seconds = max(result["seconds"], 1e-9)
+    metrics = {
+        "error": result["error"],
+        "pages": pages,
+        "throttled": served.get("throttled", 0),
+        "mb_served": round(served.get("bytes", 0) / 1e6, 2),
+        "rows": result.get("rows", 0),
+        "seconds": round(result["seconds"], 3),
+        "pages_per_sec": round(pages / seconds, 2),
+        "parse_ms_per_page": round(result["parse_seconds"] / max(result["parse_calls"], 1) * 1000, 3),
+        "peak_rss_mb": round(result["peak_rss_mb"], 1),
+        "rate_limit_wait": round(result["rate_limit_wait"], 2),
+    }
+    if "pages_saved" in result:
+        # 종목 중심 모드: 쌍 단위 계획 대비 줄인 페이지 수
+        metrics["pages_saved"] = result["pages_saved"]
+    return metrics
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=RESULTS_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_result(history, scenario, settings):
+    """같은 시나리오 + 같은 설정으로 측정한 가장 최근 기록"""
+    for entry in reversed(history):
+        if entry["scenario"] == scenario and entry["settings"] == settings and not entry["metrics"].get("error"):
+            return entry
+    return None
+
+
+def compare(metrics, previous, threshold):
+    """직전 기록 대비 변화율과 회귀 여부 (pages/sec 감소, 파싱 시간/메모리 증가)"""
+    if previous is None or metrics.get("error"):
+        return {}, []
+    old = previous["metrics"]
+    changes, regressions = {}, []
+    for key, higher_is_better in (("pages_per_sec", True), ("parse_ms_per_page", False), ("peak_rss_mb", False)):
+        if not old.get(key):
+            continue
+        change = metrics[key] / old[key] - 1
+        changes[key] = change
+        if (-change if higher_is_better else change) > threshold:
+            regressions.append(key)
+    return changes, regressions
+
+
+def _fmt(value, change):
+    return f"{value}" + (f" ({change:+.0%})" if change is not None else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답마다 추가 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="PullPush 429 비율")
+    parser.add_argument("--dataroma-error-rate", type=float, default=0.0, help="Dataroma 429 비율")
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--gurus", type=int, default=4, help="Dataroma 시나리오에서 돌릴 구루 수")
+    parser.add_argument("--page-delay", type=float, default=0.0, help="순차 모드 페이지 딜레이 (초)")
+    parser.add_argument("--dataroma-rate", type=float, default=50.0, help="비동기 모드 초당 요청 예산")
+    parser.add_argument("--pullpush-rpm", type=int, default=1200, help="PullPush 분당 요청 예산")
+    parser.add_argument("--year", type=int, default=2023, help="PullPush 크롤링 연도")
+    parser.add_argument("--posts", type=int, default=1000, help="PullPush 분기당 목표 매칭 수")
+    parser.add_argument("--fail-on-regression", type=float, default=None, metavar="RATIO",
+                        help="직전 기록 대비 이 비율 이상 나빠지면 종료 코드 1")
+    parser.add_argument("--no-save", action="store_true", help="결과를 기록하지 않음")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--server", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    settings = {key: getattr(args, key) for key in
+                ("latency", "jitter", "error_rate", "dataroma_error_rate", "retry_after", "gurus",
+                 "page_delay", "dataroma_rate", "pullpush_rpm", "year", "posts")}
+    history = load_history()
+    commit = git_commit()
+    threshold = args.fail_on_regression if args.fail_on_regression is not None else 0.1
+    entries, regressed = [], []
+
+    server = FixtureServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           dataroma_error_rate=args.dataroma_error_rate, retry_after=args.retry_after)
+    with server:
+        print(f"🧪 fixture 서버 {server.url} (지연 {args.latency}s, 429 비율 {args.error_rate}) / 커밋 {commit}\n")
+        print(f"{'scenario':<24} | {'pages':>6} | {'pages/s':>14} | {'parse ms/page':>15} | "
+              f"{'peak RSS MB':>14} | {'wait s':>7} | {'429':>4}")
+        print("-" * 104)
+        for name in args.scenarios:
+            metrics = run_scenario(name, args, server)
+            if metrics.get("error") and "pages" not in metrics:
+                print(f"{name:<24} | ❌ {metrics['error']}")
+                continue
+
+            changes, regressions = compare(metrics, previous_result(history, name, settings), threshold)
+            mark = " ⚠️ " + ",".join(regressions) if regressions else ""
+            if metrics.get("error"):
+                mark += f" ❌ {metrics['error']}"
+            print(f"{name:<24} | {metrics['pages']:>6} | "
+                  f"{_fmt(metrics['pages_per_sec'], changes.get('pages_per_sec')):>14} | "
+                  f"{_fmt(metrics['parse_ms_per_page'], changes.get('parse_ms_per_page')):>15} | "
+                  f"{_fmt(metrics['peak_rss_mb'], changes.get('peak_rss_mb')):>14} | "
+                  f"{metrics['rate_limit_wait']:>7} | {metrics['throttled']:>4}{mark}")
+
+            regressed.extend(f"{name}.{key}" for key in regressions)
+            entries.append({"timestamp": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+                            "scenario": name, "settings": settings, "metrics": metrics})
+
+    if entries and not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        print(f"\n💾 {len(entries)}개 결과 기록 → {os.path.relpath(RESULTS_FILE, REPO_ROOT)}")
+
+    if regressed:
+        print(f"⚠️ 직전 기록보다 {threshold:.0%} 이상 나빠진 항목: {', '.join(regressed)}")
+        if args.fail_on_regression is not None:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+재사용 가능한 Playwright 브라우저 풀 (async)
+
+브라우저는 한 번만 띄우고, 작업마다 격리된 context를 새로 만들어 나눠 줍니다.
+쿠키/로컬 스토리지(storage_state)는 파일로 저장해 두었다가 다음 실행의 context에
+다시 넣어 주므로, Cloudflare 등 첫 접속 핸드셰이크를 매번 다시 하지 않아도 됩니다.
+
+    async with BrowserPool(max_contexts=3, state_file=".cache/browser_state/whalewisdom.json") as pool:
+        async with pool.context() as context:
+            page = await context.new_page()
+            ...
+"""
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+
+
+STATE_DIR = os.path.join(".cache", "browser_state")
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+class BrowserPool:
+    """브라우저 1개 + 작업별 격리 context (동시에 max_contexts개까지)"""
+
+    def __init__(self, headless=True, max_contexts=3, state_file=None,
+                 user_agent=DEFAULT_USER_AGENT, launch_args=None):
+        self.headless = headless
+        self.max_contexts = max_contexts
+        self.state_file = state_file
+        self.user_agent = user_agent
+        self.launch_args = launch_args or ['--disable-blink-features=AutomationControlled']
+
+        self.launches = 0
+        self.contexts_opened = 0
+
+        self._playwright = None
+        self._browser = None
+        self._slots = None
+        self._start_lock = asyncio.Lock()
+        self._state_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        async with self._start_lock:
+            if self._browser is not None:
+                return
+            self._slots = asyncio.Semaphore(self.max_contexts)
+            from playwright.async_api import async_playwright  # 브라우저가 필요할 때만 로드
+            self._playwright = await async_playwright().start()
+            try:
+                self._browser = await self._playwright.chromium.launch(
+                    headless=self.headless, args=self.launch_args
+                )
+            except Exception:
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+            self.launches += 1
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser = self._playwright = None
+
+    def _load_state(self):
+        if self.state_file and os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                return None
+        return None
+
+    async def save_state(self, context):
+        """context의 쿠키/로컬 스토리지를 파일로 저장 (임시 파일에 쓰고 교체)"""
+        if not self.state_file:
+            return
+        state = await context.storage_state()
+        async with self._state_lock:
+            if os.path.dirname(self.state_file):
+                os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_file)
+
+    @asynccontextmanager
+    async def context(self, save_state=True):
+        """
+        격리된 context 하나를 빌려 줌
+        save_state=True면 작업이 예외 없이 끝났을 때 세션 상태를 저장
+        """
+        await self.start()
+        async with self._slots:
+            context = await self._browser.new_context(
+                user_agent=self.user_agent,
+                storage_state=self._load_state(),
+            )
+            self.contexts_opened += 1
+            try:
+                yield context
+                if save_state:
+                    await self.save_state(context)
+            finally:
+                await context.close()
@@ -0,0 +1,97 @@
+"""
+재시작 가능한 크롤링을 위한 체크포인트 매니페스트
+
+- 완료한 작업 키 (예: (guru, ticker))를 JSON Lines로 한 줄씩 기록
+- 기록할 때마다 결과 파일의 크기(커밋 지점)를 함께 남김
+- 재시작 시 결과 파일이 커밋 지점보다 길면 (기록 도중 중단) 그 꼬리를 잘라내어
+  같은 행이 두 번 쓰이지 않도록 함
+- scope (예: 보고 분기)를 주면 키 앞에 붙여서, 다른 scope에서 끝낸 작업은 다시 하도록 함
+"""
+
+import json
+import os
+
+
+class CheckpointManifest:
+    """
+    manifest = CheckpointManifest("out.checkpoint.jsonl", "out.csv", scope="2025 Q3")
+    manifest.recover()
+    if not manifest.is_done("BRK", "AAPL"):
+        ... 결과 파일에 append ...
+        manifest.mark_done("BRK", "AAPL", rows=12)
+    """
+
+    def __init__(self, path, output_file=None, scope=None):
+        self.path = path
+        self.output_file = output_file
+        self.scope = () if scope is None else (scope,)
+        self.done = {}
+        self.committed_size = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 마지막 줄이 쓰다 만 상태일 수 있음
+                    continue
+                self.done[tuple(entry["key"])] = entry.get("rows", 0)
+                self.committed_size = entry.get("size", self.committed_size)
+
+    @property
+    def is_new(self):
+        return not os.path.exists(self.path)
+
+    def _output_size(self):
+        if self.output_file and os.path.exists(self.output_file):
+            return os.path.getsize(self.output_file)
+        return 0
+
+    def recover(self):
+        """
+        결과 파일을 마지막 커밋 지점으로 되돌림. 잘라낸 바이트 수 반환
+        결과 파일이 커밋 지점보다 짧으면 (삭제/교체됨) 매니페스트를 초기화
+        """
+        if self.output_file is None or self.is_new:
+            return 0
+
+        size = self._output_size()
+        if size < self.committed_size:
+            self.reset()
+            return 0
+        if size > self.committed_size:
+            with open(self.output_file, "r+b") as f:
+                f.truncate(self.committed_size)
+        return size - self.committed_size
+
+    def reset(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = {}
+        self.committed_size = 0
+
+    def is_done(self, *key):
+        return self.scope + tuple(key) in self.done
+
+    def done_in_scope(self):
+        """현재 scope에서 완료한 작업 수"""
+        return sum(1 for key in self.done if key[:len(self.scope)] == self.scope)
+
+    def mark_done(self, *key, rows=0):
+        """작업 완료 기록 (결과 파일을 다 쓴 뒤에 호출해야 함)"""
+        self.mark_many([key], rows=rows)
+
+    def mark_many(self, keys, rows=0):
+        self.committed_size = self._output_size()
+        with open(self.path, "a", encoding="utf-8") as f:
+            for key in keys:
+                key = self.scope + tuple(key)
+                self.done[key] = rows
+                f.write(json.dumps({"key": list(key), "rows": rows,
+                                    "size": self.committed_size}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
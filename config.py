@@ -0,0 +1,185 @@
+"""
+whalebuzz 공용 설정
+
+크롤러마다 흩어져 있던 대상 목록(구루, WhaleWisdom 운용사, Reddit 티커)과 실행 옵션을
+여기 기본값 하나로 모으고, whalebuzz.toml (또는 WHALEBUZZ_CONFIG 경로)이 있으면 그 값으로 덮어씁니다.
+각 크롤러 모듈의 TARGET_GURUS 등은 이 기본값을 가리키므로 단독 실행해도 같은 목록을 씁니다.
+
+    config = load_config()                    # 기본값 + whalebuzz.toml
+    config["holdings"]["gurus"]               # [{"code": "BRK", "name": ..., "style": ...}, ...]
+    python whalebuzz.py config init           # 현재 설정을 whalebuzz.toml로 저장 (편집용)
+
+표준 라이브러리만 사용하므로 CLI 시작 시간에 영향을 주지 않습니다.
+"""
+
+import copy
+import json
+import os
+import tomllib
+
+CONFIG_FILE = os.environ.get("WHALEBUZZ_CONFIG", "whalebuzz.toml")
+
+DEFAULT_CONFIG = {
+    # DataRoma_craw_hold: 분기별 포트폴리오 스냅샷 (9대 거인)
+    "holdings": {
+        "start_quarter": "2024-03-31",  # 이후 분기 목록은 오늘 날짜 기준으로 자동 계산
+        "gurus": [
+            {"code": "BRK", "name": "Berkshire Hathaway", "style": "Value"},
+            {"code": "BAUPOST", "name": "Baupost Group", "style": "Value"},
+            {"code": "SAM", "name": "Scion Asset Mgmt", "style": "Value"},
+            {"code": "TGM", "name": "Tiger Global", "style": "Growth"},
+            {"code": "COAT", "name": "Coatue Management", "style": "Growth"},
+            {"code": "DA", "name": "Duquesne Family", "style": "Growth"},
+            {"code": "PSC", "name": "Pershing Square", "style": "Activist"},
+            {"code": "IC", "name": "Icahn Enterprises", "style": "Activist"},
+            {"code": "TP", "name": "Third Point", "style": "Activist"},
+        ],
+    },
+    # Dataroma_buysell_craw: 종목별 매매 히스토리 (21명, Dataroma 검증 완료)
+    # 이름은 기존 결과 파일의 Manager 값과 맞춰야 하므로 holdings 목록과 따로 둠
+    "history": {
+        "mode": "sequential",       # sequential / async / stock (종목별 stock.php, 최신 분기만)
+        "concurrency": 4,           # async: 동시 요청 수
+        "guru_concurrency": 2,      # async: 동시에 진행할 구루 수
+        "rate_per_sec": 2.0,        # async: dataroma.com 초당 요청 예산
+        "gurus": [
+            # --- Value (가치투자) ---
+            {"code": "BRK", "name": "Berkshire Hathaway (Buffett)", "style": "Value"},
+            {"code": "BAUPOST", "name": "Baupost Group (Klarman)", "style": "Value"},
+            {"code": "SAM", "name": "Scion Asset Mgmt (Burry)", "style": "Value"},
+            {"code": "HC", "name": "Himalaya Capital (Li Lu)", "style": "Value"},
+            {"code": "PI", "name": "Pabrai Investments(Pabrai)", "style": "Value"},  ## 다시 돌리기
+            {"code": "FS", "name": "Fundsmith (Terry Smith)", "style": "Value"},
+            {"code": "oaklx", "name": "Oakmark (Bill Nygren)", "style": "Value"},  ## 다시 돌리기
+            # --- Growth (성장주/Tiger Cubs) ---
+            {"code": "TGM", "name": "Tiger Global (Chase Coleman)", "style": "Growth"},
+            {"code": "AM", "name": "Appaloosa (David Tepper)", "style": "Growth"},
+            {"code": "vg", "name": "Viking Global (Halvorsen)", "style": "Growth"},  ## 다시 돌리기
+            {"code": "LPC", "name": "Lone Pine (Stephen Mandel)", "style": "Growth"},
+            {"code": "MC", "name": "Maverick Capital (Lee Ainslie)", "style": "Growth"},
+            {"code": "AC", "name": "Akre Capital (Chuck Akre)", "style": "Growth"},  # 다시 돌리기
+            {"code": "tci", "name": "TCI Fund (Chris Hohn)", "style": "Growth"},
+            # --- Activist / Deep Value (행동주의) ---
+            {"code": "PSC", "name": "Pershing Square (Ackman)", "style": "Activist"},
+            {"code": "IC", "name": "Icahn Capital (Carl Icahn)", "style": "Activist"},
+            {"code": "TP", "name": "Third Point (Dan Loeb)", "style": "Activist"},
+            {"code": "GL", "name": "Greenlight (David Einhorn)", "style": "Activist"},
+            {"code": "TRI", "name": "Trian Partners (Nelson Peltz)", "style": "Activist"},
+            {"code": "STAR", "name": "Starboard Value (Jeff Smith)", "style": "Activist"},
+            {"code": "FAIRX", "name": "Fairholme (Bruce Berkowitz)", "style": "Activist"},
+        ],
+    },
+    # yahoo_craw: 구루 포트폴리오 + Yahoo Finance 섹터/가격 (--gurus면 history 구루 목록에서 여러 명)
+    "yahoo": {
+        "guru_code": "BRK",
+        "guru_name": "Warren Buffett",
+        "max_workers": 8,
+        "portfolio_file": "Buffett_Enriched_Portfolio.csv",
+        "performance_file": "Buffett_Performance_History.csv",
+        "portfolios_file": "Guru_Enriched_Portfolios.csv",  # --gurus (여러 구루를 한 번에)
+    },
+    # whalewisedom_craw
+    "whalewisdom": {
+        "parallel": False,
+        "headless": False,          # Cloudflare 통과 세션이 저장돼 있으면 true로 충분
+        "mode": "api",              # api (그리드 JSON, 전체 종목) / dom (테이블 렌더링, 상위 20개)
+        "quarters_back": 0,         # api 모드: 최신 분기 외에 더 받을 과거 분기 수
+        "targets": [
+            {"name": "Berkshire Hathaway", "slug": "berkshire-hathaway-inc"},
+            {"name": "Bridgewater", "slug": "bridgewater-associates-lp"},
+            {"name": "Scion Asset", "slug": "scion-asset-management-llc"},
+        ],
+    },
+    # raddit_craw_pullpush
+    "reddit": {
+        "start_year": 2023,
+        "end_year": 2024,
+        "posts_per_quarter": 1000,  # 분기당 목표 개수 (티커 매칭된 것)
+        "workers": 3,               # 동시 작업 수 (rate limit 예산은 공유)
+        "requests_per_minute": 15,
+        "requests_per_hour": 1000,
+        "subreddits": ["wallstreetbets", "stocks", "investing"],
+        "output": "ndjson",         # ndjson / parquet / sqlite
+        "tickers": [
+            # 주요 테크 주식
+            "AAPL", "MSFT", "GOOGL", "GOOG", "AMZN", "META", "TSLA", "NVDA", "AMD",
+            # 유명 밈주
+            "GME", "AMC", "BB", "BBBY", "NOK",
+            # 에너지/석유
+            "OXY", "XOM", "CVX", "COP",
+            # 기타 인기 종목
+            "PLTR", "BABA", "NIO", "SOFI", "COIN", "HOOD",
+            # ETF
+            "SPY", "QQQ", "IWM", "DIA", "VOO",
+        ],
+    },
+}
+
+
+def _merge(base, override):
+    """dict는 키 단위로 재귀 병합, 나머지(리스트 포함)는 통째로 교체"""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(path=None):
+    """기본값 + 설정 파일 (없으면 기본값만). 반환값은 자유롭게 수정해도 기본값에 영향 없음"""
+    path = path or CONFIG_FILE
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            config = _merge(config, tomllib.load(f))
+    return config
+
+
+def select_gurus(gurus, codes=None):
+    """코드 목록으로 구루 선택 (대소문자 무시, codes가 비어 있으면 전체)"""
+    if not codes:
+        return gurus
+    wanted = {code.lower() for code in codes}
+    selected = [g for g in gurus if g["code"].lower() in wanted]
+    unknown = wanted - {g["code"].lower() for g in selected}
+    if unknown:
+        raise ValueError(f"설정에 없는 구루 코드: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def _toml_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, dict):
+        return "{ " + ", ".join(f"{k} = {_toml_value(v)}" for k, v in value.items()) + " }"
+    if isinstance(value, list):
+        return "[" + ", ".join(_toml_value(v) for v in value) + "]"
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def to_toml(config):
+    """설정 dict → TOML 텍스트 (섹션 1단계 + 값/리스트/인라인 테이블만 사용)"""
+    lines = []
+    for section, values in config.items():
+        lines.append(f"[{section}]")
+        for key, value in values.items():
+            if isinstance(value, list) and value and isinstance(value[0], dict):
+                # 구루/운용사 목록은 한 줄에 하나씩
+                lines.append(f"{key} = [")
+                lines.extend(f"    {_toml_value(item)}," for item in value)
+                lines.append("]")
+            else:
+                lines.append(f"{key} = {_toml_value(value)}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_config(config, path=None):
+    path = path or CONFIG_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(to_toml(config))
+    return path
@@ -0,0 +1,240 @@
+"""
+Dataroma 페이지 수집용 HTTP 백엔드
+
+holdings.php / m_activity.php / hist.php / perf.php는 서버 렌더링 HTML이라
+브라우저 없이 keep-alive HTTP + lxml로 충분합니다.
+#grid 테이블이 없을 때만 (JS 렌더링 등) Playwright로 폴백합니다.
+요청 결과는 fetch_policy 기준으로 분류해서 타임아웃/5xx는 백오프 재시도,
+429/403은 브라우저로 우회하지 않고 호스트 단위로 멈춘 뒤 재시도합니다.
+"""
+
+import os
+import re
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+
+from fetch_policy import (FetchResult, RetryPolicy, SUCCESS, EMPTY, TRANSIENT, BLOCKED,
+                          classify_status, host_of)
+from lean_page import LeanProfile, DATAROMA_DOMAINS
+from rate_limit import parse_retry_after
+from response_cache import get_cache
+from run_metrics import get_metrics, failure_status
+from table_extract import find_table_html
+
+BASE_URL = "https://www.dataroma.com/m/"
+SITE_ORIGIN = "https://www.dataroma.com"
+# 실제로 요청을 보낼 주소 (오프라인 벤치마크에서 로컬 서버로 바꿀 때 사용)
+# 캐시 키도 바뀐 주소로 만들어서 대역 서버 페이지가 실제 dataroma.com 캐시 항목을 덮어쓰지 않게 함
+ORIGIN = os.environ.get("WHALEBUZZ_DATAROMA_ORIGIN", SITE_ORIGIN).rstrip("/")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def make_session(pool_size=10, user_agent=USER_AGENT):
+    """커넥션 풀을 공유하는 keep-alive 세션 생성"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": user_agent,
+        "Accept": "text/html,application/xhtml+xml",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def resolve_url(url):
+    """ORIGIN이 바뀌어 있으면 dataroma.com URL을 그 주소로 변환"""
+    if ORIGIN != SITE_ORIGIN and url.startswith(SITE_ORIGIN):
+        return ORIGIN + url[len(SITE_ORIGIN):]
+    return url
+
+
+def has_table(html, table_id="grid"):
+    """HTML에 대상 테이블이 있는지 확인 (table_id=None이면 아무 <table>이나)"""
+    try:
+        return find_table_html(html, table_id) is not None
+    except Exception:
+        return False
+
+
+def extract_stock_symbols(html):
+    """stock.php?sym= 링크에서 티커 추출 (등장 순서 유지, 중복 제거)"""
+    if not html:
+        return []
+    tree = lxml_html.fromstring(html)
+    symbols = []
+    for href in tree.xpath('//a[contains(@href, "stock.php?sym=")]/@href'):
+        match = re.search(r'sym=([^&]+)', href)
+        if match and match.group(1) not in symbols:
+            symbols.append(match.group(1))
+    return symbols
+
+
+class DataromaFetcher:
+    """
+    HTTP 우선, 필요할 때만 Playwright를 띄우는 페이지 수집기
+
+    with DataromaFetcher() as fetcher:
+        html = fetcher.get("https://www.dataroma.com/m/holdings.php?m=BRK")
+    """
+
+    def __init__(self, pool_size=10, timeout=20, user_agent=USER_AGENT, headless=True,
+                 cache=None, use_cache=True, metrics=None, retry=None):
+        self.session = make_session(pool_size, user_agent)
+        # 디스크 응답 캐시 (기본: 프로세스 공유 캐시)
+        self.cache = (cache or get_cache()) if use_cache else None
+        self.last_cached = False
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.headless = headless
+
+        # Playwright는 폴백이 처음 필요할 때 시작
+        self._playwright = None
+        self._browser = None
+        self._page = None
+
+        # 브라우저 폴백 요청 차단 + 페이지별 전송량
+        self.lean = LeanProfile(DATAROMA_DOMAINS)
+
+        # 백엔드별 사용 횟수 + 요청별 시간/바이트/상태 코드 (실행 리포트)
+        self.stats = {"cache": 0, "http": 0, "browser": 0, "miss": 0}
+        self.metrics = metrics or get_metrics()
+
+        # 결과 분류별 재시도 (마지막 get()의 결과 종류는 last_outcome)
+        self.retry = retry or RetryPolicy(metrics=self.metrics)
+        self.last_outcome = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def fetch_http_result(self, url, table_id="grid"):
+        """HTTP로 한 번 요청하고 결과를 분류 (429/403은 blocked, 200인데 테이블이 없으면 empty)"""
+        start = time.perf_counter()
+        try:
+            response = self.session.get(resolve_url(url), timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            status = failure_status(e)
+            self.metrics.request("dataroma", url, status, time.perf_counter() - start)
+            return FetchResult(TRANSIENT, status=status)
+        self.metrics.request("dataroma", url, response.status_code, time.perf_counter() - start,
+                             len(response.content))
+        found = response.status_code == 200 and has_table(response.text, table_id)
+        outcome = classify_status(response.status_code, found)
+        if outcome == BLOCKED:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"), default=None)
+            return FetchResult(BLOCKED, status=response.status_code, retry_after=retry_after)
+        if outcome == SUCCESS:
+            self.stats["http"] += 1
+            return FetchResult(SUCCESS, response.text, response.status_code)
+        return FetchResult(outcome, status=response.status_code)
+
+    def fetch_http(self, url, table_id="grid"):
+        """HTTP로만 요청. 대상 테이블이 있으면 HTML, 없으면 None"""
+        return self.fetch_http_result(url, table_id).body
+
+    def fetch_browser_result(self, url, table_id="grid", wait_ms=3000):
+        """
+        Playwright 폴백 결과 분류
+        - 페이지 이동 실패 / 타임아웃: transient
+        - 페이지는 열렸는데 wait_ms 안에 테이블이 안 나타남: transient (status='no_table')
+          (느린 렌더링인지 정말 빈 페이지인지는 호출자가 HTTP 결과와 함께 판단)
+        """
+        page = self._get_page()
+        selector = f"#{table_id}" if table_id is not None else None
+        timing = {}
+        try:
+            html = self.lean.load(page, resolve_url(url), selector, timeout=self.timeout * 1000,
+                                  wait_ms=wait_ms, timing=timing)
+        except Exception as e:
+            status = failure_status(e)
+            self.metrics.page_load("dataroma", url, timing, status)
+            # selector_wait가 기록됐으면 goto는 성공하고 테이블 대기에서 실패한 것
+            return FetchResult(TRANSIENT, status="no_table" if "selector_wait" in timing else status)
+        self.metrics.page_load("dataroma", url, timing, nbytes=self.lean.last_bytes)
+        if not has_table(html, table_id):
+            return FetchResult(TRANSIENT, status="no_table")
+        self.stats["browser"] += 1
+        return FetchResult(SUCCESS, html, 200)
+
+    def fetch_browser(self, url, table_id="grid", wait_ms=3000):
+        """Playwright 폴백 (#grid 대기 후 HTML 반환, 실패 시 None)"""
+        return self.fetch_browser_result(url, table_id, wait_ms).body
+
+    def fetch_once(self, url, table_id="grid", wait_ms=3000):
+        """HTTP 한 번 (+ 필요하면 브라우저 한 번). 재시도 없이 분류된 결과만 반환"""
+        result = self.fetch_http_result(url, table_id)
+        # 성공 / 차단 / 404 같은 확정 결과는 그대로 (차단을 브라우저로 우회하면 같은 IP라 더 나빠질 뿐)
+        http_empty = result.outcome == EMPTY and result.status == 200
+        if result.outcome != TRANSIENT and not http_empty:
+            return result
+        try:
+            browser = self.fetch_browser_result(url, table_id, wait_ms)
+        except ImportError:
+            return result  # Playwright 미설치: HTTP 결과로 판단
+        if http_empty and browser.outcome == TRANSIENT and browser.status == "no_table":
+            # HTTP도 브라우저도 테이블이 없음 → 데이터가 없는 페이지
+            return FetchResult(EMPTY, status=200)
+        return browser
+    def lookup(self, url):
+        """캐시에서만 조회 (없으면 None)"""
+        if self.cache is None:
+            return None
+        html = self.cache.get(resolve_url(url))
+        if html is not None:
+            self.stats["cache"] += 1
+            self.metrics.count("cache_hit")
+        return html
+
+    def remember(self, url, html, ttl="default"):
+        """수집한 HTML을 캐시에 저장 (ttl=None이면 무기한)"""
+        if self.cache is not None and html is not None:
+            self.cache.set(resolve_url(url), html, source="dataroma", ttl=ttl)
+
+    def get(self, url, table_id="grid", wait_ms=3000, ttl="default"):
+        """
+        캐시 → HTTP → (테이블 없으면) Playwright 순으로 시도. 데이터가 없거나 재시도를 다 쓰면 None
+        ttl: 캐시 보관 기간 (초). 마감된 과거 분기는 None(무기한)
+        None일 때 last_outcome으로 구분: 'empty'(데이터 없음, 다시 받을 필요 없음) /
+        'transient' · 'blocked'(재시도 소진, 나중에 다시 받아야 함)
+        """
+        html = self.lookup(url)
+        self.last_cached = html is not None
+        if html is not None:
+            self.last_outcome = SUCCESS
+            return html
+
+        # 재시도할수록 selector 대기를 늘림 (느린 렌더링으로 조용히 빠지는 페이지 방지)
+        result = self.retry.run(lambda attempt: self.fetch_once(url, table_id, wait_ms * attempt),
+                                host_of(url))
+        self.last_outcome = result.outcome
+        if result.outcome != SUCCESS:
+            self.stats["miss"] += 1
+            self.metrics.count(f"fetch_{result.outcome}")
+            return None
+        self.remember(url, result.body, ttl)
+        return result.body
+
+    def _get_page(self):
+        if self._page is None:
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=self.headless)
+            context = self._browser.new_context(user_agent=self.user_agent)
+            self.lean.apply(context)
+            self._page = context.new_page()
+        return self._page
+
+    def close(self):
+        self.session.close()
+        if self._browser is not None:
+            self._browser.close()
+        if self._playwright is not None:
+            self._playwright.stop()
+        self._playwright = self._browser = self._page = None
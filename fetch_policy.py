@@ -0,0 +1,279 @@
+"""
+페이지 요청 결과 분류 + 재시도 + 호스트 단위 서킷 브레이커
+
+except: pass / continue로 실패를 삼키면 느린 페이지 하나가 조용히 데이터에서 빠집니다.
+여기서는 요청 결과를 네 가지로 나눠서 다르게 다룹니다.
+- success: 원하는 데이터가 있음
+- empty: 정상 응답인데 데이터가 없음 (404, 테이블 없는 페이지) → 재시도하지 않고 '없음'으로 기록
+- transient: 타임아웃, 연결 끊김, 5xx → 지터를 섞은 지수 백오프로 재시도
+- blocked: 429 / 403 → Retry-After만큼 호스트 전체를 멈추고,
+           최근 요청 중 차단 비율이 높아지면 서킷을 열어 한동안 그 호스트로 요청하지 않음
+재시도를 다 써도 실패한 항목은 RetryQueue에 모았다가 실행 끝에 한 번 더 시도합니다.
+
+    policy = RetryPolicy(max_attempts=3)
+    result = policy.run(lambda attempt: fetch_once(url), host="www.dataroma.com")
+    if result.outcome in RETRYABLE:
+        queue.add(item)
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from run_metrics import get_metrics
+
+SUCCESS = "success"
+EMPTY = "empty"
+TRANSIENT = "transient"
+BLOCKED = "blocked"
+RETRYABLE = (TRANSIENT, BLOCKED)
+
+BLOCK_STATUSES = {401, 403, 429, 451}
+TRANSIENT_STATUSES = {408, 425, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+
+
+class FetchResult(NamedTuple):
+    outcome: str
+    body: Optional[str] = None
+    status: object = None              # HTTP 상태 코드 또는 'timeout' / 'error' / 'no_table'
+    retry_after: Optional[float] = None
+
+
+def classify_status(status, has_data=True):
+    """HTTP 상태 코드 (+ 데이터 유무) → 결과 종류"""
+    if 200 <= status < 300:
+        return SUCCESS if has_data else EMPTY
+    if status in BLOCK_STATUSES:
+        return BLOCKED
+    if status in TRANSIENT_STATUSES or status >= 500:
+        return TRANSIENT
+    # 404 / 410 등은 다시 요청해도 같음
+    return EMPTY
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """attempt번째 실패 후 대기 시간: base * 2^(attempt-1)을 상한 cap으로 자르고 절반은 랜덤 (equal jitter)"""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """
+    호스트별 서킷 브레이커 (스레드 안전)
+
+    최근 window개 응답 중 차단(blocked) 비율이 threshold 이상이면 cooldown초 동안 열림.
+    열린 동안 wait_time()이 남은 시간을 돌려주고, 시간이 지나면 요청 하나만 시험으로 통과시킴
+    (half-open). 시험 요청 결과가 기록될 때까지 다른 호출자는 trial_wait초씩 기다림
+    (결과가 trial_timeout초 안에 오지 않으면 다음 호출자가 다시 시험).
+    시험 요청이 성공하면 닫히고, 또 차단되면 cooldown을 두 배로 늘려 다시 엶.
+    타임아웃/5xx로 끝나면 판단을 미루고 half-open을 유지한 채 다음 시험 요청 하나만 다시 통과시킴.
+    Retry-After를 받으면 비율과 상관없이 그 시각까지 호스트 전체가 기다림.
+    """
+
+    def __init__(self, window=20, threshold=0.5, min_samples=5, cooldown=30.0, max_cooldown=600.0,
+                 trial_wait=1.0, trial_timeout=60.0):
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.trial_wait = trial_wait
+        self.trial_timeout = trial_timeout
+        self.opened = 0  # 서킷이 열린 횟수 (실행 리포트용)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {
+                "recent": deque(maxlen=self.window),
+                "open_until": 0.0,
+                "cooldown": self.cooldown,
+                "half_open": False,
+                "trial_in_flight": False,
+                "trial_started": 0.0,
+                "paused_until": 0.0,
+            }
+        return state
+
+    def wait_time(self, host):
+        """요청 전에 기다려야 하는 시간 (초). 0이면 바로 요청"""
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            wait = max(state["open_until"], state["paused_until"]) - now
+            if wait > 0:
+                return wait
+            if state["trial_in_flight"] and now - state["trial_started"] < self.trial_timeout:
+                # 시험 요청 결과를 기다리는 중 → 나머지는 한꺼번에 몰리지 않게 잠깐 대기
+                return self.trial_wait
+            if state["open_until"] or state["half_open"]:
+                # 열린 시간이 지났거나 직전 시험이 판단 없이 끝남 → 이 호출자의 요청 하나만 시험으로 통과
+                state["open_until"] = 0.0
+                state["half_open"] = True
+                state["trial_in_flight"] = True
+                state["trial_started"] = now
+            return 0.0
+
+    def is_open(self, host):
+        with self._lock:
+            return self._state(host)["open_until"] > time.monotonic()
+
+    def record(self, host, outcome, retry_after=None):
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            blocked = outcome == BLOCKED
+            if blocked and retry_after:
+                state["paused_until"] = max(state["paused_until"], now + retry_after)
+
+            if state["trial_in_flight"]:
+                state["trial_in_flight"] = False
+                if blocked:
+                    state["cooldown"] = min(self.max_cooldown, state["cooldown"] * 2)
+                    self._open(state, now)
+                    return
+                if outcome in (SUCCESS, EMPTY):
+                    state["half_open"] = False
+                    state["cooldown"] = self.cooldown
+                    state["recent"].clear()
+
+            if outcome == TRANSIENT:
+                return  # 타임아웃/5xx는 차단 비율에 넣지 않음 (백오프로 충분)
+            state["recent"].append(blocked)
+            recent = state["recent"]
+            if len(recent) >= self.min_samples and sum(recent) / len(recent) >= self.threshold:
+                self._open(state, now)
+
+    def _open(self, state, now):
+        state["open_until"] = now + state["cooldown"]
+        state["half_open"] = False
+        state["recent"].clear()
+        self.opened += 1
+
+
+class RetryPolicy:
+    """
+    요청 한 번(attempt 함수)을 결과 종류에 따라 재시도
+
+    attempt(n): n번째 시도 (1부터). FetchResult 반환 (예외는 transient로 처리)
+    - success / empty: 바로 반환
+    - transient: backoff_delay만큼 쉬고 재시도
+    - blocked: 서킷 브레이커에 기록 (Retry-After가 있으면 그만큼 호스트 전체 대기) 후 재시도
+    max_attempts번 모두 실패하면 마지막 결과 반환 → 호출자가 RetryQueue에 넣음
+    """
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0, breaker=None, metrics=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or get_breaker()
+        self._metrics = metrics
+
+    @property
+    def metrics(self):
+        # 기본값은 호출 시점의 실행 리포트 (크롤러마다 start_run으로 새로 시작)
+        return self._metrics or get_metrics()
+
+    def _attempt(self, attempt, n):
+        try:
+            return attempt(n)
+        except Exception as e:
+            return FetchResult(TRANSIENT, status=f"error: {type(e).__name__}")
+
+    def _after(self, host, result, n):
+        """결과 기록 후 다음 시도 전 대기 시간 (None이면 종료)"""
+        self.breaker.record(host, result.outcome, result.retry_after)
+        if result.outcome not in RETRYABLE or n >= self.max_attempts:
+            if result.outcome in RETRYABLE:
+                self.metrics.count(f"gave_up_{result.outcome}")
+            return None
+        self.metrics.count(f"retry_{result.outcome}")
+        if result.outcome == BLOCKED and result.retry_after:
+            return 0.0  # 대기는 브레이커가 (호스트 전체가 같이 기다림)
+        return backoff_delay(n, self.base_delay, self.max_delay)
+
+    def run(self, attempt, host):
+        result = None
+        for n in range(1, self.max_attempts + 1):
+            # 서킷이 열렸거나 다른 호출자의 시험 요청이 끝나지 않았으면 통과될 때까지 대기
+            while (wait := self.breaker.wait_time(host)) > 0:
+                self.metrics.sleep(wait, "circuit_open")
+            result = self._attempt(attempt, n)
+            delay = self._after(host, result, n)
+            if delay is None:
+                return result
+            if delay > 0:
+                self.metrics.sleep(delay, "retry_backoff")
+        return result
+
+    async def run_async(self, attempt, host):
+        """run과 같음. attempt(n)은 코루틴 함수"""
+        result = None
+        for n in range(1, self.max_attempts + 1):
+            while (wait := self.breaker.wait_time(host)) > 0:
+                self.metrics.add_wait(wait, "circuit_open")
+                await asyncio.sleep(wait)
+            try:
+                result = await attempt(n)
+            except Exception as e:
+                result = FetchResult(TRANSIENT, status=f"error: {type(e).__name__}")
+            delay = self._after(host, result, n)
+            if delay is None:
+                return result
+            if delay > 0:
+                self.metrics.add_wait(delay, "retry_backoff")
+                await asyncio.sleep(delay)
+        return result
+
+
+class RetryQueue:
+    """
+    재시도를 다 써도 실패한 항목 (transient / blocked)을 모았다가 실행 끝에 다시 처리
+    (그동안 서킷이 닫히거나 일시적인 장애가 지나가 있을 가능성이 높음)
+
+    queue.add(("BRK", "AAPL"), result.outcome)
+    for item in queue.drain():
+        ...
+    """
+
+    def __init__(self):
+        self.items = []
+        self.outcomes = {}
+
+    def add(self, item, outcome=TRANSIENT):
+        self.items.append(item)
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def drain(self):
+        items, self.items = self.items, []
+        self.outcomes = {}
+        return items
+
+    def summary(self):
+        return ", ".join(f"{outcome} {count}개" for outcome, count in sorted(self.outcomes.items()))
+
+    def __len__(self):
+        return len(self.items)
+
+
+_shared_breaker = None
+_shared_lock = threading.Lock()
+
+
+def get_breaker():
+    """프로세스 전체에서 공유하는 서킷 브레이커 (같은 호스트를 쓰는 모든 크롤러가 같은 상태를 봄)"""
+    global _shared_breaker
+    with _shared_lock:
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker()
+        return _shared_breaker
@@ -0,0 +1,141 @@
+"""
+가벼운 페이지 로딩 프로필 (Playwright 공용)
+
+브라우저 폴백은 표 하나만 필요한데, 기본 설정으로는 광고/분석 스크립트/이미지까지 다 받고
+load 이벤트까지 기다립니다. 여기서는
+- 이미지/폰트/CSS/미디어 요청과 허용 목록 밖의 도메인 요청을 차단하고
+- domcontentloaded + 대상 셀렉터까지만 기다리며
+- 페이지마다 실제로 전송된 바이트를 기록합니다.
+
+    lean = LeanProfile(DATAROMA_DOMAINS)
+    lean.apply(context)                             # context/page 모두 가능
+    html = lean.load(page, url, "#grid")            # async: await lean.load_async(...)
+    print(lean.summary())
+"""
+
+import time
+from urllib.parse import urlsplit
+
+# 표를 그리는 데 필요 없는 리소스 타입
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+# 사이트별 허용 도메인 (하위 도메인 포함)
+DATAROMA_DOMAINS = ("dataroma.com",)
+# WhaleWisdom은 Cloudflare 챌린지 + CDN의 jQuery/DataTables 스크립트가 있어야 표가 그려짐
+WHALEWISDOM_DOMAINS = ("whalewisdom.com", "cloudflare.com", "jsdelivr.net", "googleapis.com")
+
+# 현재 문서와 하위 리소스의 전송 바이트 합 (Resource Timing API)
+_TRANSFER_SIZE_JS = """() => {
+    const entries = performance.getEntriesByType('navigation')
+        .concat(performance.getEntriesByType('resource'));
+    return entries.reduce((total, e) => total + (e.transferSize || 0), 0);
+}"""
+
+
+def host_allowed(host, allowed_domains):
+    host = (host or "").lower()
+    return any(host == d or host.endswith("." + d) for d in allowed_domains)
+
+
+class LeanProfile:
+    """요청 차단 규칙 + 로딩 방식 + 페이지별 전송량 기록"""
+
+    def __init__(self, allowed_domains, blocked_types=BLOCKED_RESOURCE_TYPES):
+        self.allowed_domains = tuple(d.lower() for d in allowed_domains)
+        self.blocked_types = frozenset(blocked_types)
+        self.stats = {"pages": 0, "bytes": 0, "requests": 0, "blocked": 0}
+        self.last_bytes = 0
+
+    def allows(self, url, resource_type):
+        """이 요청을 통과시킬지 여부"""
+        if resource_type in self.blocked_types:
+            return False
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return True  # data:, blob: 등은 네트워크를 쓰지 않음
+        return host_allowed(parts.hostname, self.allowed_domains)
+
+    def _count(self, request):
+        if self.allows(request.url, request.resource_type):
+            self.stats["requests"] += 1
+            return True
+        self.stats["blocked"] += 1
+        return False
+
+    # --- sync API ---
+
+    def _handle(self, route):
+        if self._count(route.request):
+            route.continue_()
+        else:
+            route.abort()
+
+    def apply(self, target):
+        """page 또는 context에 차단 규칙 등록"""
+        target.route("**/*", self._handle)
+        return target
+
+    def load(self, page, url, selector=None, timeout=20000, wait_ms=3000, timing=None):
+        """
+        domcontentloaded + selector까지만 기다린 뒤 HTML 반환
+        timing: dict를 넘기면 단계별 시간(초)을 채움 (goto / selector_wait, 타임아웃으로 끝나도 기록)
+        """
+        timing = {} if timing is None else timing
+        start = time.perf_counter()
+        try:
+            page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        finally:
+            timing["goto"] = time.perf_counter() - start
+        if selector:
+            start = time.perf_counter()
+            try:
+                page.wait_for_selector(selector, timeout=wait_ms)
+            finally:
+                timing["selector_wait"] = time.perf_counter() - start
+        html = page.content()
+        self._record(page.evaluate(_TRANSFER_SIZE_JS))
+        return html
+
+    # --- async API ---
+
+    async def _handle_async(self, route):
+        if self._count(route.request):
+            await route.continue_()
+        else:
+            await route.abort()
+
+    async def apply_async(self, target):
+        await target.route("**/*", self._handle_async)
+        return target
+
+    async def load_async(self, page, url, selector=None, timeout=20000, wait_ms=3000, timing=None):
+        timing = {} if timing is None else timing
+        start = time.perf_counter()
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        finally:
+            timing["goto"] = time.perf_counter() - start
+        if selector:
+            start = time.perf_counter()
+            try:
+                await page.wait_for_selector(selector, timeout=wait_ms)
+            finally:
+                timing["selector_wait"] = time.perf_counter() - start
+        html = await page.content()
+        self._record(await page.evaluate(_TRANSFER_SIZE_JS))
+        return html
+
+    def _record(self, transferred):
+        self.last_bytes = int(transferred or 0)
+        self.stats["pages"] += 1
+        self.stats["bytes"] += self.last_bytes
+
+    def summary(self):
+        """'페이지 N개 / 평균 X KB / 차단 M건' 형태 요약 (로드한 페이지가 없으면 빈 문자열)"""
+        pages = self.stats["pages"]
+        if not pages:
+            return ""
+        avg_kb = self.stats["bytes"] / pages / 1024
+        return (f"페이지 {pages}개 / 총 {self.stats['bytes'] / 1024:,.0f} KB "
+                f"(평균 {avg_kb:,.1f} KB) / 요청 {self.stats['requests']}건 통과, "
+                f"{self.stats['blocked']}건 차단")
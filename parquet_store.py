@@ -0,0 +1,229 @@
+"""
+파티션된 Parquet 저장소 (holdings / history / reddit)
+
+CSV는 읽을 때마다 텍스트를 다시 파싱하고 타입도 잃어버립니다
+(Shares, Value가 object로 돌아오는 등). 여기서는 명시적인 스키마로 저장하고,
+반복이 많은 문자열 컬럼은 dictionary 인코딩해서 읽을 때 category로 받습니다.
+
+    write_holdings(df)                       # data/holdings/Source=.../Manager=.../Report_Date=.../
+    read_dataset("data/holdings",
+                 columns=["Ticker", "Value"],
+                 filters=[("Manager", "==", "Berkshire Hathaway")])
+"""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+DATA_ROOT = "data"
+
+_DICT = pa.dictionary(pa.int32(), pa.string())
+
+# Dataroma 분기별 포트폴리오 (DataRoma_craw_hold)
+HOLDINGS_SCHEMA = pa.schema([
+    ("Source", _DICT),
+    ("Manager", _DICT),
+    ("Style", _DICT),
+    ("Report_Date", pa.string()),
+    ("Stock_Name", pa.string()),
+    ("Ticker", _DICT),
+    ("Weight_Pct", pa.float64()),
+    ("Shares", pa.float64()),
+    ("Price", pa.float64()),
+    ("Value", pa.float64()),
+])
+HOLDINGS_PARTITIONS = ["Source", "Manager", "Report_Date"]
+
+# Dataroma 종목별 매매 히스토리 (Dataroma_buysell_craw)
+# hist.php 테이블 컬럼은 페이지마다 달라서 메타데이터 컬럼만 고정하고 나머지는 추론
+HISTORY_SCHEMA = pa.schema([
+    ("Source", _DICT),
+    ("Manager", _DICT),
+    ("Style", _DICT),
+    ("Ticker", _DICT),
+])
+HISTORY_PARTITIONS = ["Source", "Manager"]
+
+# Reddit 게시물 (RedditTickerCrawler)
+REDDIT_SCHEMA = pa.schema([
+    ("post_id", pa.int64()),
+    ("id", pa.string()),
+    ("source", _DICT),
+    ("subreddit", _DICT),
+    ("subreddit_style", _DICT),
+    ("subreddit_strategy", _DICT),
+    ("ticker", _DICT),
+    ("title", pa.string()),
+    ("selftext", pa.string()),
+    ("upvote_ratio", pa.float64()),
+    ("score", pa.int64()),
+    ("num_comments", pa.int64()),
+    ("created_utc", pa.int64()),
+    ("created_date", pa.string()),
+    ("year", pa.int32()),
+    ("quarter", pa.int32()),
+    ("author", _DICT),
+    ("author_flair_text", pa.string()),
+    ("url", pa.string()),
+    ("permalink", pa.string()),
+])
+REDDIT_PARTITIONS = ["subreddit", "year", "quarter"]
+
+# 정규화된 Reddit 데이터 (reddit_tables): 게시물 1개당 1행 + (post_id, ticker) 언급
+REDDIT_POST_SCHEMA = pa.schema([
+    ("post_id", pa.int64()),
+    ("id", pa.string()),
+    ("source", _DICT),
+    ("subreddit", _DICT),
+    ("subreddit_style", _DICT),
+    ("subreddit_strategy", _DICT),
+    ("title", pa.string()),
+    ("selftext", pa.string()),
+    ("upvote_ratio", pa.float64()),
+    ("score", pa.int64()),
+    ("num_comments", pa.int64()),
+    ("created_utc", pa.int64()),
+    ("created_date", pa.string()),
+    ("year", pa.int32()),
+    ("quarter", pa.int32()),
+    ("author", _DICT),
+    ("author_flair_text", pa.string()),
+    ("url", pa.string()),
+    ("permalink", pa.string()),
+])
+REDDIT_MENTION_SCHEMA = pa.schema([
+    ("post_id", pa.int64()),
+    ("ticker", _DICT),
+    ("subreddit", _DICT),
+    ("year", pa.int32()),
+    ("quarter", pa.int32()),
+])
+
+
+def _to_table(df, schema):
+    """
+    스키마에 있는 컬럼은 그 타입으로, 없는 컬럼은 추론 (object는 string으로)
+    스키마 컬럼이 DataFrame에 없으면 에러
+    """
+    missing = [name for name in schema.names if name not in df.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼 누락: {missing}")
+
+    fields = []
+    for name in df.columns:
+        if name in schema.names:
+            fields.append(schema.field(name))
+        elif df[name].dtype == object:
+            fields.append(pa.field(str(name), pa.string()))
+        else:
+            fields.append(pa.field(str(name), pa.Array.from_pandas(df[name]).type))
+
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    for field in fields:
+        # 문자열 컬럼에 숫자/NaN이 섞여 있으면 (예: read_html 결과) 문자열로 맞춤
+        if pa.types.is_string(field.type) or pa.types.is_dictionary(field.type):
+            df[field.name] = df[field.name].map(lambda v: None if pd.isna(v) else str(v))
+    return pa.Table.from_pandas(df, schema=pa.schema(fields), preserve_index=False)
+
+
+def write_dataset(df, root, schema, partitions):
+    """
+    파티션 단위로 덮어쓰기 (같은 파티션을 다시 쓰면 교체 → 재실행해도 중복 없음)
+    """
+    if df is None or df.empty:
+        return None
+    import pyarrow.dataset as ds  # 무거운 모듈이라 실제로 쓸 때만 로드
+
+    table = _to_table(df, schema)
+    partitioning = ds.partitioning(
+        pa.schema([table.schema.field(name) for name in partitions]), flavor="hive"
+    )
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=partitioning,
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+    return root
+
+
+def write_holdings(df, root=os.path.join(DATA_ROOT, "holdings"), source="dataroma"):
+    if "Source" not in df.columns:
+        df = df.assign(Source=source)
+    return write_dataset(df, root, HOLDINGS_SCHEMA, HOLDINGS_PARTITIONS)
+
+
+def write_history(df, root=os.path.join(DATA_ROOT, "history"), source="dataroma"):
+    if "Source" not in df.columns:
+        df = df.assign(Source=source)
+    return write_dataset(df, root, HISTORY_SCHEMA, HISTORY_PARTITIONS)
+
+
+def write_reddit(df, root=os.path.join(DATA_ROOT, "reddit")):
+    return write_dataset(df, root, REDDIT_SCHEMA, REDDIT_PARTITIONS)
+
+
+def write_reddit_posts(df, root=os.path.join(DATA_ROOT, "reddit_posts")):
+    return write_dataset(df, root, REDDIT_POST_SCHEMA, REDDIT_PARTITIONS)
+
+
+def write_reddit_mentions(df, root=os.path.join(DATA_ROOT, "reddit_mentions")):
+    return write_dataset(df, root, REDDIT_MENTION_SCHEMA, REDDIT_PARTITIONS)
+
+
+def read_dataset(root, columns=None, filters=None):
+    """
+    Parquet 데이터셋 읽기
+    columns: 읽을 컬럼 (없으면 전체) - 필요한 컬럼만 디스크에서 읽음
+    filters: [("Manager", "==", "..."), ("Report_Date", ">=", "2025-01-01")] 형태
+             파티션 컬럼 조건은 해당 디렉터리만 열어서 처리 (partition pruning)
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    expression = None
+    for column, op, value in filters or []:
+        condition = _make_condition(dataset, column, op, value)
+        expression = condition if expression is None else expression & condition
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    # 디렉터리 이름에서 온 문자열 파티션 컬럼도 category로
+    for name in dataset.partitioning.schema.names:
+        if name in df.columns and df[name].dtype == object:
+            df[name] = df[name].astype("category")
+    return df
+
+
+def _make_condition(dataset, column, op, value):
+    import pyarrow.dataset as ds
+
+    field = ds.field(column)
+    # 파티션 값은 디렉터리 이름에서 추론되므로 타입을 맞춰 비교
+    if isinstance(value, (list, tuple, set)):
+        values = list(value)
+    else:
+        values = [value]
+    field_type = dataset.schema.field(column).type
+    if pa.types.is_string(field_type) or pa.types.is_dictionary(field_type):
+        values = [str(v) for v in values]
+
+    if op == "in":
+        return field.isin(values)
+    value = values[0]
+    if op == "==":
+        return field == value
+    if op == "!=":
+        return field != value
+    if op == ">":
+        return field > value
+    if op == ">=":
+        return field >= value
+    if op == "<":
+        return field < value
+    if op == "<=":
+        return field <= value
+    raise ValueError(f"지원하지 않는 연산자: {op}")
@@ -0,0 +1,135 @@
+"""
+분기 스냅샷 → 매매 이벤트 (신규/추가/축소/청산) 로컬 계산
+
+Dataroma_buysell_craw는 (구루, 종목)마다 hist.php를 한 번씩 열어서 매매 이력을 만듭니다.
+DataRoma_craw_hold로 분기별 보유 스냅샷을 이미 모아 두었다면 같은 정보를
+groupby/merge 몇 번으로 모든 매니저에 대해 한 번에 계산할 수 있습니다.
+hist.php 크롤링은 첫 스냅샷 이전 이력을 채울 때만 필요합니다.
+
+    holdings = pd.read_csv("Guru_Portfolios_TimeSeries_2024-2025.csv")
+    events = compute_position_deltas(holdings)
+"""
+
+import numpy as np
+import pandas as pd
+
+KEYS = ["Manager", "Ticker"]
+
+# 이벤트 종류
+NEW, ADD, REDUCE, EXIT, HOLD = "new", "add", "reduce", "exit", "hold"
+
+EVENT_COLUMNS = [
+    "Manager", "Ticker", "Report_Date", "Prev_Date", "Action",
+    "Shares", "Prev_Shares", "Share_Change", "Share_Change_Pct",
+    "Weight_Pct", "Prev_Weight_Pct", "Weight_Change",
+]
+
+
+def _snapshots(holdings):
+    """
+    매니저별 스냅샷 날짜와 직전/다음 스냅샷 날짜
+    (매니저마다 보고 분기가 달라도 각자의 연속된 스냅샷끼리 비교)
+    """
+    dates = holdings[["Manager", "Report_Date"]].drop_duplicates().sort_values(["Manager", "Report_Date"])
+    grouped = dates.groupby("Manager", observed=True)["Report_Date"]
+    dates["Prev_Date"] = grouped.shift(1)
+    dates["Next_Date"] = grouped.shift(-1)
+    return dates
+
+
+def compute_position_deltas(holdings, include_unchanged=False):
+    """
+    보유 스냅샷 → 매매 이벤트
+
+    Args:
+        holdings: Manager, Ticker, Report_Date, Shares 컬럼 (Weight_Pct는 있으면 사용)
+        include_unchanged: True면 주식 수가 그대로인 종목도 'hold'로 포함
+
+    Returns:
+        EVENT_COLUMNS 형태의 DataFrame. 각 매니저의 첫 스냅샷은 비교 대상이 없어서 제외
+    """
+    columns = KEYS + ["Report_Date", "Shares"]
+    has_weight = "Weight_Pct" in holdings.columns
+    if has_weight:
+        columns.append("Weight_Pct")
+
+    df = holdings[columns].copy()
+    for column in KEYS + ["Report_Date"]:
+        df[column] = df[column].astype(str)
+    df["Shares"] = pd.to_numeric(df["Shares"], errors="coerce").astype("float64")
+    if has_weight:
+        df["Weight_Pct"] = pd.to_numeric(df["Weight_Pct"], errors="coerce").astype("float64")
+    else:
+        df["Weight_Pct"] = np.nan
+
+    # 같은 스냅샷에 같은 티커가 여러 줄이면 (클래스 주식 등) 합산
+    df = df.groupby(KEYS + ["Report_Date"], as_index=False, observed=True).sum(min_count=1)
+
+    snapshots = _snapshots(df)
+
+    # 현재 스냅샷 쪽: 직전 스냅샷 날짜를 붙임 (첫 스냅샷은 Prev_Date가 NaN)
+    current = df.merge(snapshots[["Manager", "Report_Date", "Prev_Date"]], on=["Manager", "Report_Date"])
+
+    # 직전 스냅샷 쪽: 다음 스냅샷 날짜로 옮겨서 같은 키로 맞춤 (마지막 스냅샷은 비교 대상 없음)
+    previous = df.merge(snapshots[["Manager", "Report_Date", "Next_Date"]], on=["Manager", "Report_Date"])
+    previous = previous.dropna(subset=["Next_Date"]).rename(columns={
+        "Report_Date": "Prev_Date",
+        "Next_Date": "Report_Date",
+        "Shares": "Prev_Shares",
+        "Weight_Pct": "Prev_Weight_Pct",
+    })
+
+    events = current.merge(previous, on=KEYS + ["Report_Date"], how="outer", suffixes=("", "_prev"))
+    # 청산된 종목은 current 쪽이 없으므로 Prev_Date를 previous 쪽에서 채움
+    prev_date = events.pop("Prev_Date_prev")
+    events["Prev_Date"] = events["Prev_Date"].where(events["Prev_Date"].notna(), prev_date)
+    events = events.dropna(subset=["Prev_Date"])
+
+    held_now = events["Shares"].notna()
+    held_before = events["Prev_Shares"].notna()
+    shares = events["Shares"].fillna(0.0)
+    prev_shares = events["Prev_Shares"].fillna(0.0)
+    change = shares - prev_shares
+
+    events["Action"] = np.select(
+        [held_now & ~held_before, ~held_now & held_before, change > 0, change < 0],
+        [NEW, EXIT, ADD, REDUCE],
+        default=HOLD,
+    )
+    events["Shares"] = shares
+    events["Prev_Shares"] = prev_shares
+    events["Share_Change"] = change
+    events["Share_Change_Pct"] = (change / prev_shares.where(prev_shares != 0) * 100).round(2)
+    events["Weight_Pct"] = events["Weight_Pct"].fillna(0.0)
+    events["Prev_Weight_Pct"] = events["Prev_Weight_Pct"].fillna(0.0)
+    events["Weight_Change"] = (events["Weight_Pct"] - events["Prev_Weight_Pct"]).round(4)
+
+    if not include_unchanged:
+        events = events[events["Action"] != HOLD]
+
+    events = events.sort_values(["Manager", "Report_Date", "Ticker"], ignore_index=True)
+    return events[EVENT_COLUMNS]
+
+
+def first_snapshot_dates(holdings):
+    """매니저별 첫 스냅샷 날짜 (이 날짜 이전 이력만 hist.php로 보충하면 됨)"""
+    return holdings.groupby("Manager", observed=True)["Report_Date"].min().astype(str)
+
+
+def summarize_events(events):
+    """매니저 × 이벤트 종류별 건수"""
+    return events.pivot_table(index="Manager", columns="Action", values="Ticker",
+                              aggfunc="count", fill_value=0)
+
+
+if __name__ == "__main__":
+    from DataRoma_craw_hold import FILENAME as HOLDINGS_FILE
+
+    holdings = pd.read_csv(HOLDINGS_FILE, encoding="utf-8-sig")
+    events = compute_position_deltas(holdings)
+
+    output = "Guru_Position_Deltas.csv"
+    events.to_csv(output, index=False, encoding="utf-8-sig")
+    print(f"🧮 스냅샷 {holdings[['Manager', 'Report_Date']].drop_duplicates().shape[0]}개 → "
+          f"매매 이벤트 {len(events)}건 계산 완료 ('{output}')")
+    print(summarize_events(events))
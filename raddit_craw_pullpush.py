@@ -7,12 +7,31 @@ API 키 불필요, 무료 사용 가능
 
 import requests
 import pandas as pd
-import re
 from datetime import datetime, timedelta
 import time
 import json
-from typing import List, Dict, Set
+import math
+from typing import List, Dict, Set, Optional
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import os
+
+from response_cache import get_cache, ttl_for_period
+from ticker_matcher import TickerMatcher
+from parquet_store import write_reddit, write_reddit_posts, write_reddit_mentions
+from reddit_tables import post_key, split_records, split_wide, to_wide
+from rate_limit import RateLimiter, parse_retry_after
+from fetch_policy import FetchResult, RetryPolicy, SUCCESS, EMPTY, BLOCKED, TRANSIENT, RETRYABLE, classify_status, host_of
+from run_metrics import get_metrics, start_run, failure_status
+from config import DEFAULT_CONFIG
+from reddit_sink import SUMMARY_COLUMNS, NDJSONSink, ParquetSink, SQLiteSink, summarize
+
+PAGE_SIZE = 100      # PullPush 한 페이지 최대 게시물 수
+SHARD_PAGES = 5      # 샤드 하나에 담을 목표 페이지 수 (관측 밀도로 샤드 길이 결정)
+MAX_SHARDS = 16      # 분기당 최대 샤드 수
+MAX_ATTEMPTS = 3     # 타임아웃/5xx/429 재시도 횟수
+RETRY_BASE_DELAY = 2.0  # 재시도 백오프 시작 값 (초, 지수 증가 + 지터)
 
 class RedditTickerCrawler:
     """
@@ -22,16 +41,35 @@ class RedditTickerCrawler:
     - Rate Limit: 15 req/min (soft), 30 req/min (hard), 1000 req/hr (장기)
     """
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True,
+                 requests_per_minute: int = 15, requests_per_hour: int = 1000,
+                 shard_workers: int = 2, subreddits: Optional[List[str]] = None):
         self.base_url = "https://api.pullpush.io/reddit/search/submission"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'RedditTickerCrawler/1.0'
-        })
         
-        # Rate limiting 관리
-        self.request_count = 0
-        self.request_times = []
+        # 스레드마다 세션을 따로 둠 (requests.Session은 스레드 간 공유가 안전하지 않음)
+        self._local = threading.local()
+        
+        # Rate limiting 관리: 모든 워커가 하나의 토큰 버킷을 공유
+        self.limiter = RateLimiter(per_minute=requests_per_minute, per_hour=requests_per_hour)
+        
+        # 타임아웃/5xx는 지터 백오프로 재시도 (429는 limiter.pause로 전체 워커가 멈춘 뒤 재시도)
+        self.retry = RetryPolicy(max_attempts=MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY)
+        
+        # 분기 하나 안에서 동시에 가져올 시간 샤드 수
+        self.shard_workers = shard_workers
+        
+        # Ctrl+C 시 다른 워커도 멈추도록
+        self._stop = threading.Event()
+        
+        # 요청/파싱/대기 시간 기록 (crawl_all_quarters / crawl_to_sink가 실행마다 새로 시작)
+        self.metrics = get_metrics()
+        
+        # 디스크 응답 캐시 (마감된 분기 윈도우는 무기한 보관)
+        self.cache = get_cache() if use_cache else None
+        
+        # 티커 매처 (타겟 티커 세트가 바뀔 때만 다시 생성)
+        self._matcher = None
+        self._matcher_source = None
         
         self.subreddits_config = {
             'wallstreetbets': {
@@ -50,37 +88,46 @@ class RedditTickerCrawler:
                 'characteristics': '가치주 심층 분석'
             }
         }
+        
+        # 크롤링할 서브레딧만 남김 (기본: 전체)
+        if subreddits:
+            unknown = set(subreddits) - set(self.subreddits_config)
+            if unknown:
+                raise ValueError(f"지원하지 않는 서브레딧: {', '.join(sorted(unknown))}")
+            self.subreddits_config = {name: self.subreddits_config[name] for name in subreddits}
+    
+    @property
+    def session(self) -> requests.Session:
+        """현재 스레드 전용 세션"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'RedditTickerCrawler/1.0'
+            })
+            self._local.session = session
+        return session
     
     def rate_limit_wait(self):
-        """Rate limit 관리 (15 req/min soft limit)"""
-        current_time = time.time()
-        
-        # 1분 이내의 요청만 유지
-        self.request_times = [t for t in self.request_times if current_time - t < 60]
-        
-        # 15개 이상이면 대기
-        if len(self.request_times) >= 14:
-            wait_time = 60 - (current_time - self.request_times[0]) + 1
-            if wait_time > 0:
-                print(f"  Rate limit 대기: {wait_time:.1f}초")
-                time.sleep(wait_time)
-                self.request_times = []
-        
-        # 요청 간 최소 간격 (안전하게 4초)
-        time.sleep(4)
-        self.request_times.append(time.time())
+        """Rate limit 관리 (분당/시간당 토큰 버킷, 남은 허용량이 있으면 바로 통과)"""
+        waited = self.limiter.acquire()
+        self.metrics.add_wait(waited, 'rate_limit')
+        if waited >= 5:
+            print(f"  Rate limit 대기: {waited:.1f}초")
     
     def extract_tickers(self, text: str, target_tickers: Set[str]) -> List[str]:
         """텍스트에서 타겟 티커 추출"""
         if not text:
             return []
-        text_upper = text.upper()
-        found = []
-        for ticker in target_tickers:
-            # 단어 경계를 고려한 매칭
-            if re.search(r'\b' + re.escape(ticker) + r'\b', text_upper):
-                found.append(ticker)
-        return found
+        return self.get_matcher(target_tickers).extract(text)
+    
+    def get_matcher(self, target_tickers: Set[str]) -> TickerMatcher:
+        """타겟 티커용 단일 패스 매처 (단어 경계, $캐시태그, 모호한 티커 처리)"""
+        # 게시물마다 세트를 비교하면 O(티커 수)가 되므로 객체 동일성으로만 확인
+        if self._matcher is None or self._matcher_source is not target_tickers:
+            self._matcher = TickerMatcher(target_tickers)
+            self._matcher_source = target_tickers
+        return self._matcher
     
     def get_quarter_timestamps(self, year: int, quarter: int):
         """분기의 시작/종료 Unix timestamp 반환"""
@@ -99,11 +146,124 @@ class RedditTickerCrawler:
         
         return int(start_date.timestamp()), int(end_date.timestamp())
     
+    def _fetch_page(self, subreddit_name: str, after: int, before: int,
+                    cache_ttl) -> Optional[List[Dict]]:
+        """
+        after < created_utc < before 구간의 최신 게시물 한 페이지 (created_utc 내림차순)
+        캐시 → rate limit → 요청 순 (타임아웃/5xx/429는 재시도)
+        재시도를 다 쓰면 None, 404 같은 '데이터 없음' 응답은 빈 리스트
+        """
+        params = {
+            'subreddit': subreddit_name,
+            'after': after,
+            'before': before,
+            'sort': 'desc',
+            'sort_type': 'created_utc',  # 시간 커서와 같은 기준으로 정렬해야 페이지가 겹치거나 빠지지 않음
+            'size': PAGE_SIZE
+        }
+        
+        body = self.cache.get(self.base_url, params) if self.cache else None
+        if body is not None:
+            self.metrics.count('cache_hit')
+        else:
+            result = self.retry.run(lambda attempt: self._request_page(params, attempt),
+                                    host_of(self.base_url))
+            if result.outcome != SUCCESS or self._stop.is_set():
+                # 재시도 소진 → None (호출자가 다시 시도), 404 등 데이터 없음 → 빈 페이지
+                return None if result.outcome in RETRYABLE or self._stop.is_set() else []
+            body = result.body
+            if self.cache:
+                self.cache.set(self.base_url, body, params, source='pullpush', ttl=cache_ttl)
+        
+        with self.metrics.stage('parse'):
+            return json.loads(body).get('data', [])
+    
+    def _request_page(self, params: Dict, attempt: int) -> FetchResult:
+        """요청 1회 (rate limit 대기 포함) → 결과 분류"""
+        if self._stop.is_set():
+            return FetchResult(EMPTY, status='stopped')  # 재시도 없이 종료 (_fetch_page가 None 반환)
+        self.rate_limit_wait()
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=30)
+        except requests.exceptions.RequestException as e:
+            status = failure_status(e)
+            self.metrics.request('pullpush', self.base_url, status, time.perf_counter() - start,
+                                 retries=attempt - 1)
+            print(f"  ⏱️  {status}, 재시도...")
+            return FetchResult(TRANSIENT, status=status)
+        self.metrics.request('pullpush', response.url, response.status_code, time.perf_counter() - start,
+                             len(response.content), retries=attempt - 1)
+        
+        outcome = classify_status(response.status_code)
+        if outcome == BLOCKED:
+            # Retry-After 동안 모든 워커를 멈춤 (대기는 limiter가 하므로 백오프만 짧게 더해짐)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            print(f"  Rate limit 초과, {retry_after:.0f}초 대기...")
+            self.metrics.count('throttled')
+            self.limiter.pause(retry_after)
+        elif outcome != SUCCESS:
+            print(f"  ⚠️  HTTP {response.status_code} 에러")
+        if outcome != SUCCESS:
+            return FetchResult(outcome, status=response.status_code)
+        return FetchResult(SUCCESS, response.text, response.status_code)
+    
+    def _make_record(self, post: Dict, subreddit_name: str, year: int, quarter: int,
+                     tickers: List[str]) -> Dict:
+        """게시물 1개 = 레코드 1개 (언급한 티커는 tickers 리스트로)"""
+        created_utc = post.get('created_utc', 0)
+        selftext = post.get('selftext', '')
+        return {
+            'post_id': post_key(post.get('id'), post.get('permalink', '')),
+            'id': post.get('id'),
+            'source': 'reddit',
+            'subreddit': subreddit_name,
+            'subreddit_style': self.subreddits_config[subreddit_name]['style'],
+            'subreddit_strategy': self.subreddits_config[subreddit_name]['strategy'],
+            'tickers': tickers,
+            'title': post.get('title', ''),
+            'selftext': selftext[:1000] if selftext else '',
+            'upvote_ratio': post.get('upvote_ratio', 0),
+            'score': post.get('score', 0),
+            'num_comments': post.get('num_comments', 0),
+            'created_utc': created_utc,
+            'created_date': datetime.fromtimestamp(created_utc).strftime('%Y-%m-%d %H:%M:%S'),
+            'year': year,
+            'quarter': quarter,
+            'author': post.get('author', '[deleted]'),
+            'author_flair_text': post.get('author_flair_text', None),
+            'url': post.get('url', ''),
+            'permalink': f"https://reddit.com{post.get('permalink', '')}"
+        }
+    
+    def _plan_shards(self, start_ts: int, oldest_ts: int, end_ts: int,
+                     page_count: int) -> List[tuple]:
+        """
+        첫 페이지에서 관측한 게시물 밀도로 남은 구간 [start_ts, oldest_ts]를 나눔
+        샤드 하나가 대략 SHARD_PAGES 페이지 분량이 되도록 (최대 MAX_SHARDS개)
+        (after, before) 쌍을 최신 구간부터 반환 (API 경계가 둘 다 배타적이라 after는 1초 앞)
+        """
+        observed = max(end_ts - oldest_ts, 1)
+        density = page_count / observed  # 초당 게시물 수
+        remaining = oldest_ts + 1 - start_ts
+        if remaining <= 0:
+            return []
+        
+        shard_span = SHARD_PAGES * PAGE_SIZE / density
+        count = min(MAX_SHARDS, max(1, math.ceil(remaining / shard_span)))
+        bounds = [start_ts + remaining * i // count for i in range(count + 1)]
+        shards = [(bounds[i] - 1, bounds[i + 1]) for i in range(count)]
+        return shards[::-1]
+    
     def crawl_quarter(self, subreddit_name: str, year: int, quarter: int,
                       target_tickers: Set[str], target_count: int = 1000) -> List[Dict]:
         """
         특정 서브레딧의 분기별 데이터 크롤링
         
+        분기를 시간 샤드로 나눠 샤드마다 created_utc 커서로 페이지를 넘기고,
+        샤드들을 동시에 (rate limit 예산은 공유) 가져와 게시물 id로 중복을 제거합니다.
+        목표 개수에 도달하면 남은 샤드는 요청 없이 종료됩니다.
+        
         Args:
             subreddit_name: 서브레딧 이름
             year: 연도
@@ -112,286 +272,441 @@ class RedditTickerCrawler:
             target_count: 목표 데이터 수 (티커 매칭된 것)
             
         Returns:
-            크롤링된 데이터 리스트
+            티커가 매칭된 게시물 레코드 리스트 (최신순, 게시물당 1개 + tickers 리스트)
+            티커당 1행 형태가 필요하면 reddit_tables.split_records → to_wide
         """
         print(f"\n{'='*60}")
         print(f"크롤링: r/{subreddit_name} - {year}년 Q{quarter}")
         print(f"{'='*60}")
         
         start_ts, end_ts = self.get_quarter_timestamps(year, quarter)
-        results = []
+        # 지난 분기는 결과가 바뀌지 않으므로 무기한 캐시
+        cache_ttl = ttl_for_period('pullpush', end_ts)
         
-        params = {
-            'subreddit': subreddit_name,
-            'after': start_ts,
-            'before': end_ts,
-            'sort': 'desc',
-            'sort_type': 'score',  # 인기순 (score 기준)
-            'size': 100  # 한 번에 100개씩 가져오기
-        }
+        state = {'seen': set(), 'results': [], 'matched': 0, 'processed': 0, 'requests': 0,
+                 'failed': []}
+        lock = threading.Lock()
         
-        matched_count = 0
-        total_processed = 0
-        before_timestamp = end_ts
+        def done() -> bool:
+            return state['matched'] >= target_count or self._stop.is_set()
         
-        while matched_count < target_count:
-            params['before'] = before_timestamp
-            
-            try:
-                self.rate_limit_wait()
-                
-                response = self.session.get(self.base_url, params=params, timeout=30)
-                
-                if response.status_code != 200:
-                    print(f"  ⚠️  HTTP {response.status_code} 에러")
-                    if response.status_code == 429:
-                        print("  Rate limit 초과, 60초 대기...")
-                        time.sleep(60)
-                        continue
-                    break
-                
-                data = response.json()
-                posts = data.get('data', [])
-                
-                if not posts:
-                    print(f"  더 이상 데이터 없음")
-                    break
-                
+        def record(posts: List[Dict]):
+            start = time.perf_counter()
+            with lock:
                 for post in posts:
-                    total_processed += 1
-                    
-                    title = post.get('title', '')
-                    selftext = post.get('selftext', '')
-                    combined_text = f"{title} {selftext}"
-                    
-                    found_tickers = self.extract_tickers(combined_text, target_tickers)
-                    
-                    if found_tickers:
-                        for ticker in found_tickers:
-                            created_utc = post.get('created_utc', 0)
-                            
-                            post_data = {
-                                'source': 'reddit',
-                                'subreddit': subreddit_name,
-                                'subreddit_style': self.subreddits_config[subreddit_name]['style'],
-                                'subreddit_strategy': self.subreddits_config[subreddit_name]['strategy'],
-                                'ticker': ticker,
-                                'title': title,
-                                'selftext': selftext[:1000] if selftext else '',
-                                'upvote_ratio': post.get('upvote_ratio', 0),
-                                'score': post.get('score', 0),
-                                'num_comments': post.get('num_comments', 0),
-                                'created_utc': created_utc,
-                                'created_date': datetime.fromtimestamp(created_utc).strftime('%Y-%m-%d %H:%M:%S'),
-                                'year': year,
-                                'quarter': quarter,
-                                'author': post.get('author', '[deleted]'),
-                                'author_flair_text': post.get('author_flair_text', None),
-                                'url': post.get('url', ''),
-                                'permalink': f"https://reddit.com{post.get('permalink', '')}"
-                            }
-                            results.append(post_data)
-                            matched_count += 1
+                    post_id = post.get('id') or post.get('permalink')
+                    if post_id in state['seen']:
+                        continue
+                    state['seen'].add(post_id)
+                    state['processed'] += 1
                     
-                    # 다음 페이지를 위한 timestamp 업데이트
-                    before_timestamp = post.get('created_utc', before_timestamp)
-                
-                print(f"  📊 처리: {total_processed}개 | 매칭: {matched_count}/{target_count}개")
-                
-                # 목표 달성 시 종료
-                if matched_count >= target_count:
-                    break
-                
-            except requests.exceptions.Timeout:
-                print(f"  ⏱️  타임아웃, 재시도...")
-                time.sleep(5)
-                continue
+                    combined_text = f"{post.get('title', '')} {post.get('selftext', '')}"
+                    tickers = self.extract_tickers(combined_text, target_tickers)
+                    if tickers:
+                        state['results'].append(
+                            self._make_record(post, subreddit_name, year, quarter, tickers)
+                        )
+                        state['matched'] += len(tickers)
+            self.metrics.add_stage('match', time.perf_counter() - start)
+        
+        def crawl_shard(after: int, before: int):
+            """
+            샤드 하나를 최신 → 과거로 페이지 넘김
+            재시도를 다 쓴 페이지가 나오면 남은 구간 (after, cursor)을 실패 목록에 넣고 멈춤
+            """
+            cursor = before
+            while not done():
+                try:
+                    posts = self._fetch_page(subreddit_name, after, cursor, cache_ttl)
+                except Exception as e:
+                    print(f"  ❌ 샤드 에러: {str(e)}")
+                    posts = None
+                with lock:
+                    state['requests'] += 1
+                    if posts is None and not self._stop.is_set():
+                        state['failed'].append((after, cursor))
+                if not posts:
+                    return
+                record(posts)
+                if len(posts) < PAGE_SIZE:
+                    return  # 샤드 끝
+                # 같은 초에 올라온 게시물이 잘리지 않도록 oldest + 1까지 다시 요청 (중복은 id로 제거)
+                oldest = min(post.get('created_utc', cursor) for post in posts)
+                cursor = oldest + 1 if oldest + 1 < cursor else oldest
+                print(f"  📊 처리: {state['processed']}개 | 매칭: {state['matched']}/{target_count}개")
+        
+        # 1) 분기 끝에서 첫 페이지를 받아 게시물 밀도를 관측
+        #    (재시도를 다 쓰면 예외 → iter_quarter_results가 분기 전체를 나중에 다시 시도)
+        first_page = self._fetch_page(subreddit_name, start_ts - 1, end_ts + 1, cache_ttl)
+        state['requests'] += 1
+        if first_page is None:
+            raise RuntimeError(f"첫 페이지 수집 실패 (재시도 {MAX_ATTEMPTS}회 소진)")
+        if not first_page:
+            print(f"  더 이상 데이터 없음")
+            return []
+        record(first_page)
+        
+        try:
+            if len(first_page) == PAGE_SIZE and not done():
+                # 2) 남은 구간을 밀도 기반 샤드로 나눠 동시에 수집
+                oldest = min(post.get('created_utc', end_ts) for post in first_page)
+                shards = self._plan_shards(start_ts, oldest, end_ts, len(first_page))
+                print(f"  🧩 샤드 {len(shards)}개로 분할 (동시 {self.shard_workers}개)")
                 
-            except Exception as e:
-                print(f"  ❌ 에러: {str(e)}")
-                break
-        
-        print(f"✅ 완료: {len(results)}개 데이터 수집")
+                if self.shard_workers <= 1 or len(shards) == 1:
+                    for after, before in shards:
+                        crawl_shard(after, before)
+                else:
+                    with ThreadPoolExecutor(max_workers=self.shard_workers) as executor:
+                        for future in [executor.submit(crawl_shard, a, b) for a, b in shards]:
+                            future.result()
+            
+            # 3) 중간에 실패한 샤드는 끊긴 지점부터 한 번 더 (그래도 실패하면 구멍으로 남김)
+            failed, state['failed'] = state['failed'], []
+            if failed and not done():
+                print(f"  🔁 실패한 샤드 {len(failed)}개 재시도")
+                for after, before in failed:
+                    crawl_shard(after, before)
+            if state['failed']:
+                self.metrics.count('shard_failed', len(state['failed']))
+                print(f"  ⚠️  샤드 {len(state['failed'])}개는 끝까지 실패 (해당 구간 게시물 누락)")
+        except Exception as e:
+            print(f"  ❌ 에러: {str(e)}")
+        
+        results = sorted(state['results'], key=lambda r: r['created_utc'], reverse=True)
+        print(f"✅ 완료: 게시물 {len(results)}개 / 매칭 {state['matched']}개 수집 "
+              f"(요청 {state['requests']}회, 고유 게시물 {state['processed']}개)")
         return results
     
+    def quarter_tasks(self, start_year: int, end_year: int) -> List[tuple]:
+        """(서브레딧, 연도, 분기) 작업 목록 (미래 분기 제외)"""
+        current_year = datetime.now().year
+        current_quarter = (datetime.now().month - 1) // 3 + 1
+        
+        tasks = []
+        for year in range(start_year, end_year + 1):
+            for quarter in range(1, 5):
+                # 미래 분기는 스킵
+                if year == current_year and quarter > current_quarter:
+                    continue
+                for subreddit_name in self.subreddits_config.keys():
+                    tasks.append((subreddit_name, year, quarter))
+        return tasks
+    
+    def iter_quarter_results(self, start_year: int, end_year: int,
+                             target_tickers: Set[str],
+                             posts_per_quarter: int = 1000,
+                             workers: int = 1):
+        """
+        (서브레딧, 연도, 분기) 작업을 실행하고 끝나는 순서대로
+        ((서브레딧, 연도, 분기), 결과 리스트)를 하나씩 내보냄
+        
+        workers > 1이면 작업을 워커 스레드에 나눠 실행
+        (모든 워커가 같은 rate limit 예산을 나눠 씀)
+        """
+        tasks = self.quarter_tasks(start_year, end_year)
+        total_tasks = len(tasks)
+        # 실패한 분기는 다른 작업을 다 끝낸 뒤 한 번 더 (순차)
+        failed = []
+        
+        if workers <= 1:
+            for completed, task in enumerate(tasks, start=1):
+                subreddit_name, year, quarter = task
+                print(f"\n\n📍 진행률: {completed}/{total_tasks}")
+                try:
+                    quarter_data = self.crawl_quarter(
+                        subreddit_name, year, quarter,
+                        target_tickers, posts_per_quarter
+                    )
+                except Exception as e:
+                    print(f"❌ 에러: r/{subreddit_name} {year}Q{quarter} - {str(e)} → 마지막에 재시도")
+                    failed.append(task)
+                    continue
+                yield task, quarter_data
+            yield from self._retry_quarters(failed, target_tickers, posts_per_quarter)
+            return
+        
+        print(f"\n⚡ 병렬 모드: 워커 {workers}개, 작업 {total_tasks}개")
+        
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {
+            executor.submit(
+                self.crawl_quarter, subreddit_name, year, quarter,
+                target_tickers, posts_per_quarter
+            ): (subreddit_name, year, quarter)
+            for subreddit_name, year, quarter in tasks
+        }
+        
+        try:
+            for completed, future in enumerate(as_completed(futures), start=1):
+                subreddit_name, year, quarter = futures[future]
+                print(f"\n📍 진행률: {completed}/{total_tasks} "
+                      f"(r/{subreddit_name} {year}Q{quarter} 완료, "
+                      f"rate limit 대기 누적 {self.limiter.total_wait:.0f}초)")
+                try:
+                    quarter_data = future.result()
+                except Exception as e:
+                    print(f"❌ 에러: r/{subreddit_name} {year}Q{quarter} - {str(e)} → 마지막에 재시도")
+                    failed.append(futures[future])
+                    continue
+                yield futures[future], quarter_data
+            yield from self._retry_quarters(failed, target_tickers, posts_per_quarter)
+        finally:
+            # 정상 종료가 아니면 (Ctrl+C 등) 진행 중인 워커를 멈추고 남은 작업 취소
+            # 중간에 끊긴 분기 결과는 불완전하므로 버림
+            self._stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._stop.clear()
+    
+    def _retry_quarters(self, tasks: List[tuple], target_tickers: Set[str], posts_per_quarter: int):
+        """실패한 (서브레딧, 연도, 분기) 작업을 한 번씩 다시 실행 (그래도 실패하면 건너뜀)"""
+        if tasks:
+            print(f"\n🔁 실패한 분기 {len(tasks)}개 재시도")
+        for task in tasks:
+            subreddit_name, year, quarter = task
+            try:
+                quarter_data = self.crawl_quarter(subreddit_name, year, quarter,
+                                                  target_tickers, posts_per_quarter)
+            except Exception as e:
+                print(f"❌ 재시도 실패: r/{subreddit_name} {year}Q{quarter} - {str(e)}")
+                self.metrics.count('quarter_failed')
+                continue
+            yield task, quarter_data
+    
     def crawl_all_quarters(self, start_year: int, end_year: int,
                           target_tickers: Set[str], 
-                          posts_per_quarter: int = 1000) -> pd.DataFrame:
+                          posts_per_quarter: int = 1000,
+                          workers: int = 1, normalized: bool = True):
         """
-        모든 서브레딧의 분기별 데이터 크롤링
+        모든 서브레딧의 분기별 데이터 크롤링 (결과를 메모리에 모아서 반환)
         
         Args:
             start_year: 시작 연도
             end_year: 종료 연도
             target_tickers: 찾을 티커 세트
             posts_per_quarter: 분기당 목표 게시물 수
+            workers: 동시에 크롤링할 (서브레딧, 분기) 작업 수
+            normalized: True면 게시물/언급 테이블로 나눠서 반환 (기본값, save_data에 그대로 전달)
+                        False면 티커당 1행 wide DataFrame
             
         Returns:
-            전체 데이터 DataFrame
+            (posts, mentions) - normalized=False면 wide DataFrame (post_id / id 포함)
         """
         all_data = []
-        current_year = datetime.now().year
-        current_quarter = (datetime.now().month - 1) // 3 + 1
-        
-        total_tasks = 0
-        for year in range(start_year, end_year + 1):
-            for quarter in range(1, 5):
-                if year == current_year and quarter > current_quarter:
-                    continue
-                total_tasks += len(self.subreddits_config)
-        
-        completed = 0
-        
-        for year in range(start_year, end_year + 1):
-            for quarter in range(1, 5):
-                # 미래 분기는 스킵
-                if year == current_year and quarter > current_quarter:
-                    continue
-                
-                for subreddit_name in self.subreddits_config.keys():
-                    completed += 1
-                    print(f"\n\n📍 진행률: {completed}/{total_tasks}")
-                    
-                    try:
-                        quarter_data = self.crawl_quarter(
-                            subreddit_name, year, quarter,
-                            target_tickers, posts_per_quarter
-                        )
-                        all_data.extend(quarter_data)
-                        
-                    except KeyboardInterrupt:
-                        print("\n\n⚠️  사용자에 의해 중단됨")
-                        print(f"현재까지 수집된 데이터: {len(all_data)}개")
-                        if all_data:
-                            return pd.DataFrame(all_data)
-                        raise
-                        
-                    except Exception as e:
-                        print(f"❌ 에러: r/{subreddit_name} {year}Q{quarter} - {str(e)}")
-                        continue
+        self.metrics = start_run('pullpush')
+        
+        try:
+            for _, quarter_data in self.iter_quarter_results(
+                start_year, end_year, target_tickers, posts_per_quarter, workers
+            ):
+                all_data.extend(quarter_data)
+        
+        except KeyboardInterrupt:
+            print("\n\n⚠️  사용자에 의해 중단됨")
+            print(f"현재까지 수집된 게시물: {len(all_data)}개")
+            if not all_data:
+                raise
+        finally:
+            self.metrics.finish()
+        
+        posts, mentions = split_records(all_data)
+        if normalized:
+            return posts, mentions
+        return to_wide(posts, mentions)
+    
+    def crawl_to_sink(self, start_year: int, end_year: int,
+                      target_tickers: Set[str], sink,
+                      posts_per_quarter: int = 1000,
+                      workers: int = 1):
+        """
+        분기 배치가 끝날 때마다 sink(NDJSONSink / ParquetSink / SQLiteSink)에 바로 저장
+        메모리에는 진행 중인 배치만 남으므로 기간/티커가 많아도 사용량이 일정함
         
-        return pd.DataFrame(all_data)
+        Returns:
+            sink (통계는 print_stored_summary(sink)로 저장된 데이터에서 계산)
+        """
+        self.metrics = start_run('pullpush')
+        try:
+            for (subreddit_name, year, quarter), quarter_data in self.iter_quarter_results(
+                start_year, end_year, target_tickers, posts_per_quarter, workers
+            ):
+                with self.metrics.stage('save'):
+                    sink.write(quarter_data, subreddit_name, year, quarter)
+                print(f"  💾 r/{subreddit_name} {year}Q{quarter}: 게시물 {len(quarter_data)}개 저장 → {sink}")
+        
+        except KeyboardInterrupt:
+            print("\n\n⚠️  사용자에 의해 중단됨")
+            print(f"저장 완료된 배치: {sink.batches}개 (게시물 {sink.posts}개, 언급 {sink.rows}개) → {sink}")
+            raise
+        finally:
+            # 중단돼도 그때까지의 리포트는 남김
+            self.metrics.finish()
+        
+        return sink
     
-    def save_data(self, df: pd.DataFrame, base_filename: str = 'reddit_ticker_data'):
+    def save_data(self, data, base_filename: str = 'reddit_ticker_data',
+                  formats: tuple = ('csv', 'json', 'parquet'),
+                  parquet_root: str = 'data', normalized: bool = True):
         """
-        데이터를 CSV와 JSON으로 저장
+        데이터를 CSV / JSON / Parquet으로 저장
         
         Args:
-            df: 저장할 DataFrame
-            base_filename: 기본 파일명
+            data: crawl_all_quarters 결과 (posts, mentions) 또는 wide DataFrame (티커당 1행)
+            base_filename: 기본 파일명 (CSV, JSON)
+            formats: 저장할 형식
+            parquet_root: Parquet 데이터셋 상위 경로 (subreddit/year/quarter 파티션)
+            normalized: True면 게시물/언급 테이블로 나눠 저장 (게시물 본문 중복 없음)
+                        False면 기존처럼 티커당 1행으로 저장 (post_id / id 포함)
         """
-        if df.empty:
+        if isinstance(data, pd.DataFrame):
+            # 예전 wide 결과: id가 없으면 split_wide가 permalink 해시로 post_id를 만듦
+            posts, mentions = split_wide(data) if not data.empty else split_records([])
+        else:
+            posts, mentions = data
+        
+        if mentions.empty:
             print("⚠️  저장할 데이터가 없습니다.")
             return
         
-        # CSV 저장
-        csv_file = f"{base_filename}.csv"
-        df.to_csv(csv_file, index=False, encoding='utf-8-sig')
-        print(f"\n💾 CSV 저장: {csv_file}")
+        if normalized:
+            tables = {'posts': posts, 'mentions': mentions}
+            print(f"\n🗜️  정규화: {len(mentions)}행 → 게시물 {len(posts)}개 + 언급 {len(mentions)}개")
+        else:
+            tables = {None: to_wide(posts, mentions)}
         
-        # JSON 저장
-        json_file = f"{base_filename}.json"
-        df.to_json(json_file, orient='records', force_ascii=False, indent=2)
-        print(f"💾 JSON 저장: {json_file}")
+        for name, table in tables.items():
+            filename = f"{base_filename}_{name}" if name else base_filename
+            
+            # CSV 저장
+            if 'csv' in formats:
+                table.to_csv(f"{filename}.csv", index=False, encoding='utf-8-sig')
+                print(f"💾 CSV 저장: {filename}.csv")
+            
+            # JSON 저장
+            if 'json' in formats:
+                table.to_json(f"{filename}.json", orient='records', force_ascii=False, indent=2)
+                print(f"💾 JSON 저장: {filename}.json")
+        
+        # Parquet 저장 (분석용, 필요한 파티션/컬럼만 읽기 가능)
+        if 'parquet' in formats:
+            if normalized:
+                write_reddit_posts(posts, os.path.join(parquet_root, 'reddit_posts'))
+                write_reddit_mentions(mentions, os.path.join(parquet_root, 'reddit_mentions'))
+                print(f"📦 Parquet 저장: {parquet_root}/reddit_posts/, {parquet_root}/reddit_mentions/")
+            else:
+                write_reddit(tables[None], os.path.join(parquet_root, 'reddit'))
+                print(f"📦 Parquet 저장: {parquet_root}/reddit/")
         
         # 통계 출력
+        self.print_summary(summarize([to_wide(posts, mentions, SUMMARY_COLUMNS)]))
+    
+    def print_stored_summary(self, sink):
+        """저장된 데이터에서 필요한 컬럼만 조각 단위로 읽어 통계 출력"""
+        self.print_summary(summarize(sink.iter_frames(columns=SUMMARY_COLUMNS)))
+    
+    def print_summary(self, stats: Dict):
         print(f"\n{'='*60}")
         print(f"📊 크롤링 통계")
         print(f"{'='*60}")
-        print(f"총 데이터 수: {len(df):,}개\n")
+        print(f"총 데이터 수: {stats['total']:,}개\n")
+        
+        if not stats['total']:
+            return
         
         print("📌 서브레딧별 분포:")
-        print(df['subreddit'].value_counts().to_string())
+        print(stats['by_subreddit'].to_string())
         
         print(f"\n📈 티커별 분포:")
-        print(df['ticker'].value_counts().head(20).to_string())
+        print(stats['by_ticker'].head(20).to_string())
         
         print(f"\n📅 연도/분기별 분포:")
-        quarter_dist = df.groupby(['year', 'quarter']).size().sort_index()
-        print(quarter_dist.to_string())
+        print(stats['by_quarter'].to_string())
         
         print(f"\n💪 평균 Score (화력):")
-        avg_score = df.groupby('subreddit')['score'].mean().round(1)
-        print(avg_score.to_string())
+        print(stats['avg_score'].to_string())
         
         print(f"\n💬 평균 댓글 수:")
-        avg_comments = df.groupby('subreddit')['num_comments'].mean().round(1)
-        print(avg_comments.to_string())
+        print(stats['avg_comments'].to_string())
 
 
 # ============================================================================
 # 사용 예시
 # ============================================================================
-if __name__ == "__main__":
+def run_crawl(settings=None):
+    """
+    설정(config.py의 reddit 섹션 형태)대로 크롤링 후 sink 반환
+    python whalebuzz.py reddit 과 이 파일 단독 실행이 같이 사용
+    """
+    settings = settings or DEFAULT_CONFIG['reddit']
+    
     print("="*60)
     print("Reddit 주식 티커 크롤러 v2.0 (PullPush.io)")
     print("="*60)
     
     # 크롤러 초기화
-    crawler = RedditTickerCrawler()
+    crawler = RedditTickerCrawler(requests_per_minute=settings['requests_per_minute'],
+                                  requests_per_hour=settings['requests_per_hour'],
+                                  subreddits=settings['subreddits'])
     
     # 타겟 티커 설정
-    target_tickers = {
-        # 주요 테크 주식
-        'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'META', 'TSLA', 'NVDA', 'AMD',
-        
-        # 유명 밈주
-        'GME', 'AMC', 'BB', 'BBBY', 'NOK',
-        
-        # 에너지/석유
-        'OXY', 'XOM', 'CVX', 'COP',
-        
-        # 기타 인기 종목
-        'PLTR', 'BABA', 'NIO', 'SOFI', 'COIN', 'HOOD',
-        
-        # ETF
-        'SPY', 'QQQ', 'IWM', 'DIA', 'VOO'
-    }
+    target_tickers = set(settings['tickers'])
     
     print(f"\n🎯 타겟 티커 ({len(target_tickers)}개):")
     print(f"{', '.join(sorted(target_tickers))}\n")
     
     # 크롤링 파라미터
-    START_YEAR = 2023
-    END_YEAR = 2024
-    POSTS_PER_QUARTER = 1000  # 분기당 목표 개수 (티커 매칭된 것)
+    START_YEAR = settings['start_year']
+    END_YEAR = settings['end_year']
+    POSTS_PER_QUARTER = settings['posts_per_quarter']  # 분기당 목표 개수 (티커 매칭된 것)
+    WORKERS = settings['workers']                      # 동시 작업 수 (rate limit 예산은 공유)
     
     print(f"📅 기간: {START_YEAR}년 ~ {END_YEAR}년 (분기별)")
     print(f"📊 목표: 분기당 {POSTS_PER_QUARTER}개 (서브레딧당)")
-    print(f"⏱️  예상 소요시간: {(END_YEAR-START_YEAR+1)*4*3*5} ~ 10분")
-    print(f"\n⚠️  Rate Limit: 시간당 1000 요청, 분당 15 요청")
-    print(f"💡 중단하려면 Ctrl+C를 누르세요 (현재까지 데이터는 저장됨)\n")
+    print(f"⏱️  예상 소요시간: {(END_YEAR-START_YEAR+1)*4*len(crawler.subreddits_config)*5} ~ 10분")
+    print(f"\n⚠️  Rate Limit: 시간당 {settings['requests_per_hour']} 요청, "
+          f"분당 {settings['requests_per_minute']} 요청 (워커 {WORKERS}개가 공유)")
+    print(f"💡 중단하려면 Ctrl+C를 누르세요 (완료된 분기 배치는 이미 저장됨)\n")
     
-    input("🚀 Enter를 눌러 크롤링 시작...")
+    # 분기 배치가 끝날 때마다 바로 저장 (메모리 사용량 일정, 중단돼도 끝난 배치는 보존)
+    if settings['output'] == 'parquet':
+        sink = ParquetSink('data/reddit_posts', 'data/reddit_mentions')
+    elif settings['output'] == 'sqlite':
+        sink = SQLiteSink()
+    else:
+        sink = NDJSONSink(f'reddit_ticker_data_{START_YEAR}_{END_YEAR}.ndjson')
     
     try:
         # 크롤링 시작
         start_time = time.time()
         
-        df = crawler.crawl_all_quarters(
+        crawler.crawl_to_sink(
             start_year=START_YEAR,
             end_year=END_YEAR,
             target_tickers=target_tickers,
-            posts_per_quarter=POSTS_PER_QUARTER
+            sink=sink,
+            posts_per_quarter=POSTS_PER_QUARTER,
+            workers=WORKERS
         )
         
         elapsed = time.time() - start_time
         print(f"\n\n⏱️  총 소요시간: {elapsed/60:.1f}분")
         
-        # 데이터 저장
-        if not df.empty:
-            crawler.save_data(df, f'reddit_ticker_data_{START_YEAR}_{END_YEAR}')
-            print(f"\n✅ 모든 작업 완료!")
+        # 통계는 저장된 데이터에서 계산
+        if sink.rows:
+            crawler.print_stored_summary(sink)
+            print(f"\n✅ 모든 작업 완료! 결과 파일: {sink}")
         else:
             print(f"\n⚠️  수집된 데이터가 없습니다.")
             
     except KeyboardInterrupt:
         print("\n\n⚠️  사용자에 의해 중단됨")
-        if not df.empty:
-            crawler.save_data(df, f'reddit_ticker_data_partial_{START_YEAR}_{END_YEAR}')
-            print(f"✅ 부분 데이터 저장 완료")
+        if sink.rows:
+            crawler.print_stored_summary(sink)
+            print(f"✅ 부분 데이터 저장 완료: {sink}")
     
-    except Exception as e:
-        print(f"\n❌ 치명적 에러: {str(e)}")
-        import traceback
-        traceback.print_exc()
\ No newline at end of file
+    return sink
+
+
+if __name__ == "__main__":
+    # 설정은 config.py (CLI: python whalebuzz.py reddit, whalebuzz.toml로 변경 가능)
+    run_crawl()
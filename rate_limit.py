@@ -0,0 +1,91 @@
+"""
+여러 워커가 공유하는 토큰 버킷 Rate Limiter
+
+고정 sleep 대신 "허용량이 남아 있으면 바로, 없으면 필요한 만큼만" 기다립니다.
+- 분당/시간당 한도를 각각 버킷으로 두고 모두 통과해야 요청 가능
+- 429 응답의 Retry-After를 받으면 모든 워커가 그 시각까지 대기
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """capacity개까지 쌓이고 초당 rate개씩 채워지는 버킷 (lock은 호출자가 관리)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """토큰 1개를 쓰려면 기다려야 하는 시간 (초)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """
+    분당 + 시간당 한도를 함께 지키는 스레드 안전 리미터
+
+    limiter = RateLimiter(per_minute=15, per_hour=1000)
+    limiter.acquire()          # 필요한 만큼만 대기
+    limiter.pause(retry_after) # 429 응답 시 전체 워커 일시 정지
+    """
+
+    def __init__(self, per_minute=15, per_hour=1000, burst=None):
+        # burst: 분당 버킷에 한 번에 쌓일 수 있는 최대 요청 수 (기본은 분당 한도의 1/3)
+        burst = burst or max(1, per_minute // 3)
+        self.buckets = [TokenBucket(per_minute / 60.0, burst)]
+        if per_hour:
+            self.buckets.append(TokenBucket(per_hour / 3600.0, per_hour))
+        self.paused_until = 0.0
+        self.total_wait = 0.0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """요청 하나를 보낼 수 있을 때까지 대기. 실제로 기다린 시간(초) 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max([self.paused_until - now] + [b.wait_time(now) for b in self.buckets])
+                if wait <= 0:
+                    for bucket in self.buckets:
+                        bucket.take()
+                    self.requests += 1
+                    self.total_wait += waited
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds):
+        """모든 워커를 seconds초 동안 멈춤 (429 Retry-After 대응)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+def parse_retry_after(value, default=60.0):
+    """Retry-After 헤더 (초 또는 HTTP 날짜) → 대기 초. 없거나 이상하면 default"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,180 @@
+"""
+Reddit 크롤링 결과 스트리밍 저장소
+
+(서브레딧, 연도, 분기) 배치가 끝날 때마다 바로 디스크에 쓰고 메모리에서 버립니다.
+게시물은 한 번만 저장하고 티커 언급은 따로 둡니다 (reddit_tables 참고).
+전체 결과를 메모리에 모았다가 마지막에 저장하지 않으므로
+- 수년치 / 수천 티커 크롤링에도 메모리 사용량이 일정하고
+- Ctrl+C나 에러로 중단돼도 끝난 배치는 남습니다.
+
+통계는 저장된 데이터를 필요한 컬럼만 조각 단위로 읽어서 계산합니다.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from parquet_store import write_reddit_posts, write_reddit_mentions
+from reddit_tables import WIDE_COLUMNS, split_records, to_wide
+
+# 통계 계산에 필요한 컬럼만 읽음
+SUMMARY_COLUMNS = ['subreddit', 'ticker', 'year', 'quarter', 'score', 'num_comments']
+
+
+class NDJSONSink:
+    """
+    게시물 1개를 한 줄로 이어쓰는 append-only 저장소
+    언급한 티커는 "tickers" 리스트로 같은 줄에 둬서 게시물 본문이 중복 저장되지 않음
+    (같은 배치를 다시 쓰면 중복되므로 재실행 시에는 새 파일을 쓰거나 ParquetSink 사용)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0      # 언급 (게시물 × 티커) 수
+        self.posts = 0
+        self.batches = 0
+
+    def write(self, records, subreddit: str, year: int, quarter: int):
+        if not records:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.rows += sum(len(record['tickers']) for record in records)
+        self.posts += len(records)
+        self.batches += 1
+
+    def iter_frames(self, columns=None, chunksize: int = 50000):
+        """티커당 1행 (wide) 조각으로 읽기"""
+        if not os.path.exists(self.path):
+            return
+        with pd.read_json(self.path, lines=True, chunksize=chunksize) as reader:
+            for chunk in reader:
+                posts, mentions = split_records(chunk.to_dict('records'))
+                yield to_wide(posts, mentions, columns)
+
+    def __str__(self):
+        return self.path
+
+
+class ParquetSink:
+    """
+    배치마다 posts / mentions 데이터셋의 subreddit/year/quarter 파티션 하나씩 씀
+    (다시 쓰면 교체 → 재실행해도 중복 없음)
+    """
+
+    def __init__(self, posts_root: str = 'data/reddit_posts',
+                 mentions_root: str = 'data/reddit_mentions'):
+        self.posts_root = posts_root
+        self.mentions_root = mentions_root
+        self.rows = 0
+        self.posts = 0
+        self.batches = 0
+
+    def write(self, records, subreddit: str, year: int, quarter: int):
+        if not records:
+            return
+        posts, mentions = split_records(records)
+        write_reddit_posts(posts, self.posts_root)
+        write_reddit_mentions(mentions, self.mentions_root)
+        self.rows += len(mentions)
+        self.posts += len(posts)
+        self.batches += 1
+
+    def iter_frames(self, columns=None):
+        """파티션(= 크롤링 배치) 단위로 posts와 mentions를 조인해서 wide 조각으로 읽기"""
+        if not os.path.exists(self.mentions_root):
+            return
+        for partition in sorted(_partition_dirs(self.mentions_root)):
+            values = dict(part.split('=', 1) for part in partition.split(os.sep))
+            mentions = pd.read_parquet(os.path.join(self.mentions_root, partition))
+            posts_dir = os.path.join(self.posts_root, partition)
+            post_columns = None
+            if columns:
+                post_columns = ['post_id'] + [c for c in columns if c not in mentions.columns
+                                              and c not in values and c != 'ticker']
+            posts = pd.read_parquet(posts_dir, columns=post_columns)
+            for name, value in values.items():
+                mentions[name] = int(value) if value.isdigit() else value
+            yield to_wide(posts, mentions, columns)
+
+    def __str__(self):
+        return f"{self.posts_root}/, {self.mentions_root}/"
+
+
+class SQLiteSink:
+    """
+    배치마다 SQLite 저장소 (sqlite_store)의 reddit_posts / reddit_mentions에 upsert
+    (post_id 기준이라 재실행해도 중복 없음, 다른 크롤러 결과와 같은 파일에서 조인 가능)
+    """
+
+    def __init__(self, store=None):
+        from sqlite_store import get_store
+        self.store = store or get_store()
+        self.rows = 0
+        self.posts = 0
+        self.batches = 0
+
+    def write(self, records, subreddit: str, year: int, quarter: int):
+        if not records:
+            return
+        posts, mentions = split_records(records)
+        self.store.upsert_reddit(posts, mentions)
+        self.rows += len(mentions)
+        self.posts += len(posts)
+        self.batches += 1
+
+    def iter_frames(self, columns=None, chunksize: int = 50000):
+        """티커당 1행 (wide) 조각으로 읽기 (테이블에 없는 컬럼은 생략)"""
+        stored = set(self.store.query("SELECT * FROM reddit_posts WHERE 0").columns)
+        selected = [f"p.{c}" for c in columns or WIDE_COLUMNS if c in stored and c != 'ticker']
+        sql = (f"SELECT m.ticker, {', '.join(selected)} FROM reddit_mentions m "
+               "JOIN reddit_posts p ON p.post_id = m.post_id")
+        yield from self.store.iter_query(sql, chunksize=chunksize)
+
+    def __str__(self):
+        return self.store.path
+
+
+def _partition_dirs(root):
+    """root 아래 Parquet 파일이 있는 디렉터리 (root 기준 상대 경로)"""
+    for dirpath, _, filenames in os.walk(root):
+        if any(name.endswith('.parquet') for name in filenames):
+            yield os.path.relpath(dirpath, root)
+
+
+def summarize(frames) -> dict:
+    """
+    DataFrame 조각들을 차례로 집계해 통계 계산
+    (한 번에 한 조각만 메모리에 올리고, 조각별 집계 결과만 모아서 합산)
+    """
+    total = 0
+    parts = {'subreddit': [], 'ticker': [], 'quarter': [], 'sums': []}
+
+    for df in frames:
+        if df.empty:
+            continue
+        total += len(df)
+        subreddit = df['subreddit'].astype(str)
+        parts['subreddit'].append(subreddit.value_counts())
+        parts['ticker'].append(df['ticker'].astype(str).value_counts())
+        parts['quarter'].append(df.groupby(['year', 'quarter']).size())
+        parts['sums'].append(df.groupby(subreddit)[['score', 'num_comments']].sum())
+
+    if not total:
+        return {'total': 0}
+
+    def combine(series_list):
+        return pd.concat(series_list).groupby(level=list(range(series_list[0].index.nlevels))).sum()
+
+    by_subreddit = combine(parts['subreddit'])
+    sums = pd.concat(parts['sums']).groupby(level=0).sum()
+    return {
+        'total': total,
+        'by_subreddit': by_subreddit.sort_values(ascending=False),
+        'by_ticker': combine(parts['ticker']).sort_values(ascending=False),
+        'by_quarter': combine(parts['quarter']).sort_index(),
+        'avg_score': (sums['score'] / by_subreddit).round(1),
+        'avg_comments': (sums['num_comments'] / by_subreddit).round(1),
+    }
@@ -0,0 +1,86 @@
+"""
+Reddit 게시물 정규화 (posts / mentions)
+
+티커 여러 개를 언급한 게시물을 티커마다 통째로 복사하지 않고
+- posts: 게시물 1개당 1행 (post_id = Reddit id를 36진수로 읽은 정수, id = Reddit id 원문)
+- mentions: (post_id, ticker) 1행씩, ticker는 category
+로 나눠 저장합니다. 기존처럼 티커당 1행인 wide 형태가 필요하면 to_wide로 조인합니다.
+
+    posts, mentions = split_records(records)   # 크롤러 결과 (tickers 리스트 포함)
+    wide = to_wide(posts, mentions)            # 기존 컬럼 구성 + post_id / id
+"""
+
+import hashlib
+
+import pandas as pd
+
+# 기존 티커당 1행 형태의 컬럼 순서 (post_id / id를 남겨 wide 결과로도 게시물을 구분)
+WIDE_COLUMNS = [
+    'post_id', 'id', 'source', 'subreddit', 'subreddit_style', 'subreddit_strategy', 'ticker',
+    'title', 'selftext', 'upvote_ratio', 'score', 'num_comments',
+    'created_utc', 'created_date', 'year', 'quarter',
+    'author', 'author_flair_text', 'url', 'permalink',
+]
+
+# mentions에 같이 두는 컬럼 (Parquet 파티션 컬럼이라 행마다 저장되지 않음)
+PARTITION_COLUMNS = ['subreddit', 'year', 'quarter']
+
+# posts 테이블 컬럼 (게시물이 하나도 없을 때도 같은 구성으로)
+POST_COLUMNS = [c for c in WIDE_COLUMNS if c != 'ticker']
+
+
+def post_key(reddit_id, permalink=''):
+    """
+    Reddit id (36진수 문자열) → 정수 키. id가 없으면 permalink의 64비트 해시
+    (해시 키는 음수라 실제 id로 만든 키와 겹치지 않고, int64에 들어감)
+    """
+    if reddit_id:
+        try:
+            return int(str(reddit_id), 36)
+        except ValueError:
+            pass
+    digest = hashlib.blake2b(str(permalink).encode('utf-8'), digest_size=8).digest()
+    return -1 - (int.from_bytes(digest, 'big') >> 1)
+
+
+def split_records(records):
+    """
+    게시물 레코드 (tickers 리스트 포함) → (posts, mentions) DataFrame
+    """
+    posts = pd.DataFrame(records)
+    if posts.empty:
+        # 매칭된 게시물이 없어도 to_wide / Parquet 쓰기에서 컬럼을 찾을 수 있게
+        return pd.DataFrame(columns=POST_COLUMNS), pd.DataFrame(columns=['post_id', 'ticker'] + PARTITION_COLUMNS)
+
+    mentions = posts[['post_id', 'tickers'] + PARTITION_COLUMNS].explode('tickers')
+    mentions = mentions.dropna(subset=['tickers']).rename(columns={'tickers': 'ticker'})
+    mentions['ticker'] = mentions['ticker'].astype('category')
+    mentions = mentions.reset_index(drop=True)
+
+    posts = posts.drop(columns=['tickers']).drop_duplicates('post_id', ignore_index=True)
+    return posts, mentions
+
+
+def split_wide(df):
+    """기존 wide DataFrame (티커당 1행) → (posts, mentions)"""
+    df = df.copy()
+    if 'post_id' not in df.columns:
+        # 예전 데이터에는 id가 없으므로 permalink로 키를 만듦
+        df['post_id'] = [post_key(None, link) for link in df['permalink']]
+    if 'id' not in df.columns:
+        df['id'] = None
+    mentions = df[['post_id', 'ticker'] + PARTITION_COLUMNS].drop_duplicates(ignore_index=True)
+    mentions['ticker'] = mentions['ticker'].astype('category')
+    posts = df.drop(columns=['ticker']).drop_duplicates('post_id', ignore_index=True)
+    return posts, mentions
+
+
+def to_wide(posts, mentions, columns=None):
+    """
+    (posts, mentions) → 티커당 1행 wide DataFrame
+    columns: 필요한 컬럼만 (예: SUMMARY_COLUMNS) - 지정하면 그 컬럼만 조인
+    """
+    columns = columns or WIDE_COLUMNS
+    post_columns = ['post_id'] + [c for c in columns if c in posts.columns and c not in mentions.columns]
+    wide = mentions.merge(posts[post_columns], on='post_id', how='inner')
+    return wide[[c for c in columns if c in wide.columns]]
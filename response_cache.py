@@ -0,0 +1,243 @@
+"""
+모든 크롤러가 공유하는 디스크 응답 캐시
+
+- 키: 정규화된 URL + 파라미터의 SHA-256 (파라미터 순서/대소문자 호스트 차이 무시)
+- 본문: zlib 압축 후 내용 해시로 저장 (같은 본문은 한 번만 저장)
+- TTL: 소스별 기본값, 마감된 분기(과거 데이터)는 무기한(None)
+- 용량 초과 시 가장 오래 안 쓴 항목부터 삭제 (LRU)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+DEFAULT_PATH = os.environ.get("WHALEBUZZ_CACHE", os.path.join(".cache", "responses.sqlite"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 압축 기준 512MB
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# 소스별 기본 TTL (초). None = 만료 없음
+DEFAULT_TTLS = {
+    "dataroma": 12 * HOUR,   # 최신 포트폴리오/액티비티 (분기마다 갱신)
+    "pullpush": 6 * HOUR,    # 진행 중인 분기의 게시물
+    "whalewisdom": 12 * HOUR,
+    "yahoo": 7 * DAY,        # 섹터/산업 정보
+    "default": 1 * HOUR,
+}
+
+# 13F 제출 마감 (분기말 + 45일) 이후에는 해당 분기 보고서가 바뀌지 않음
+FILING_GRACE_DAYS = 45
+
+
+def normalize_url(url, params=None):
+    """스킴/호스트 소문자화, fragment 제거, 쿼리 파라미터 정렬"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query += [(str(k), str(v)) for k, v in params.items() if v is not None]
+    query.sort()
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or "/",
+        urlencode(query),
+        "",
+    ))
+
+
+def cache_key(url, params=None):
+    return hashlib.sha256(normalize_url(url, params).encode("utf-8")).hexdigest()
+
+
+def quarter_is_closed(period_end, grace_days=0, now=None):
+    """
+    분기가 마감되어 더 이상 바뀌지 않는지 여부
+    period_end: 'YYYY-MM-DD' 문자열, datetime 또는 Unix timestamp
+    """
+    if isinstance(period_end, str):
+        period_end = datetime.strptime(period_end, "%Y-%m-%d")
+    elif isinstance(period_end, (int, float)):
+        period_end = datetime.fromtimestamp(period_end)
+    now = now or datetime.now()
+    return now > period_end + timedelta(days=grace_days)
+
+
+def ttl_for_period(source, period_end, grace_days=0):
+    """마감된 기간이면 무기한, 아니면 소스 기본 TTL"""
+    if quarter_is_closed(period_end, grace_days):
+        return None
+    return DEFAULT_TTLS.get(source, DEFAULT_TTLS["default"])
+
+
+class ResponseCache:
+    """
+    SQLite 한 파일에 담긴 압축 응답 캐시 (스레드 안전)
+
+    cache = ResponseCache()
+    body = cache.get(url, params)
+    if body is None:
+        body = requests.get(url, params=params).text
+        cache.set(url, body, params, source="pullpush", ttl=None)
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                content_hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+            CREATE INDEX IF NOT EXISTS idx_responses_hash ON responses(content_hash);
+        """)
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+    def get(self, url, params=None):
+        """캐시된 본문(str) 반환. 없거나 만료되었으면 None"""
+        key = cache_key(url, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.expires_at, b.data FROM responses r "
+                "JOIN blobs b ON b.content_hash = r.content_hash WHERE r.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or (row[0] is not None and row[0] < now):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return zlib.decompress(row[1]).decode("utf-8")
+
+    def set(self, url, body, params=None, source="default", ttl="default"):
+        """
+        본문 저장
+        ttl: 초 단위, None이면 무기한, 생략하면 소스 기본값
+        """
+        if ttl == "default":
+            ttl = self.ttls.get(source, self.ttls["default"])
+
+        raw = body.encode("utf-8")
+        content_hash = hashlib.sha256(raw).hexdigest()
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if not exists:
+                data = zlib.compress(raw, 6)
+                self._conn.execute(
+                    "INSERT INTO blobs (content_hash, data, size) VALUES (?, ?, ?)",
+                    (content_hash, data, len(data)),
+                )
+                self._total_bytes += len(data)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, source, url, content_hash, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(url, params), source, normalize_url(url, params),
+                 content_hash, now, expires_at, now),
+            )
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def get_or_fetch(self, url, fetch, params=None, source="default", ttl="default"):
+        """캐시에 없으면 fetch()를 호출해 저장. fetch가 None을 주면 저장하지 않음"""
+        body = self.get(url, params)
+        if body is not None:
+            return body
+        body = fetch()
+        if body is not None:
+            self.set(url, body, params, source, ttl)
+        return body
+
+    def purge_expired(self):
+        """만료된 항목과 참조가 끊긴 본문 삭제"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),),
+            )
+            self._drop_orphans()
+            self._conn.commit()
+
+    def _evict(self):
+        # 최대 용량의 90%까지 LRU 순으로 삭제 (lock 안에서 호출)
+        target = self.max_bytes * 0.9
+        self._conn.execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (time.time(),),
+        )
+        self._drop_orphans()
+        while self._total_bytes > target:
+            keys = self._conn.execute(
+                "SELECT key FROM responses ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not keys:
+                break
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+            self._drop_orphans()
+
+    def _drop_orphans(self):
+        self._conn.execute(
+            "DELETE FROM blobs WHERE content_hash NOT IN (SELECT content_hash FROM responses)"
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": entries, "bytes": self._total_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_cache():
+    """프로세스 전체에서 공유하는 기본 캐시 인스턴스"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache()
+        return _shared_cache
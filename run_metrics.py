@@ -0,0 +1,285 @@
+"""
+크롤러 공통 계측 (요청/단계별 시간, 바이트, 상태 코드, 재시도, 스킵, 대기 시간)
+
+print 로그만으로는 실행 시간이 네트워크 / 파싱 / 고정 sleep / selector 대기 / rate limit 중
+어디에 쓰였는지 알 수 없어서, 모든 크롤러가 같은 RunMetrics에 기록하고
+실행이 끝나면 JSON 리포트 + Prometheus 텍스트 파일로 남깁니다.
+
+    metrics = start_run("dataroma_holdings")
+    metrics.request("dataroma", url, status=200, seconds=0.31, nbytes=48_000, backend="http")
+    with metrics.stage("parse"):
+        df = extract_table(html)
+    metrics.sleep(1.2, "page_delay")        # 기록 + 실제 대기
+    metrics.add_wait(0.8, "rate_limit")     # 다른 곳에서 이미 기다린 시간만 기록
+    metrics.count("skip")
+    metrics.write()                          # reports/dataroma_holdings_<시각>.json + .prom
+
+스레드 안전합니다. 여러 워커의 단계 시간은 합산되므로 벽시계 시간보다 클 수 있습니다.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlsplit
+
+REPORT_DIR = os.environ.get("WHALEBUZZ_REPORT_DIR", "reports")
+
+# 요청 시간 히스토그램 경계 (초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 리포트에 그대로 남길 요청 기록 수 (그 이상은 집계만)
+MAX_REQUEST_LOG = 5000
+SLOWEST_REQUESTS = 20
+
+
+def _number(value):
+    """Prometheus 값 표기 (지수 표기로 정밀도를 잃지 않도록)"""
+    if isinstance(value, float):
+        return f"{value:.6f}".rstrip("0").rstrip(".")
+    return str(value)
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def failure_status(error):
+    """예외 → 요청 상태 라벨 ('timeout' / 'error')"""
+    return "timeout" if "timeout" in type(error).__name__.lower() else "error"
+
+
+class RunMetrics:
+    """실행 하나의 계측 기록"""
+
+    def __init__(self, name="run", report_dir=None):
+        self.name = name
+        self.report_dir = report_dir or REPORT_DIR
+        self.started = time.time()
+        self._clock = time.perf_counter()
+        self._lock = threading.Lock()
+
+        # (source, backend, status) → [요청 수, 누적 초, 바이트, 재시도]
+        self.requests = defaultdict(lambda: [0, 0.0, 0, 0])
+        self.latencies = defaultdict(list)         # (source, backend) → 요청별 초
+        self.log = []                              # 요청별 기록 (MAX_REQUEST_LOG까지)
+        self.stages = defaultdict(lambda: [0, 0.0])  # stage → [호출 수, 누적 초]
+        self.waits = Counter()                     # 대기 사유 → 누적 초
+        self.events = Counter()                    # skip, cache_hit, retry, timeout ...
+
+    # --- 기록 ---
+
+    def request(self, source, url, status, seconds, nbytes=0, backend="http", retries=0):
+        """
+        요청 1건 기록
+        status: HTTP 상태 코드 또는 'timeout' / 'error' 같은 문자열
+        """
+        status = str(status)
+        with self._lock:
+            entry = self.requests[(source, backend, status)]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += nbytes
+            entry[3] += retries
+            self.latencies[(source, backend)].append(seconds)
+            if len(self.log) < MAX_REQUEST_LOG:
+                self.log.append({"source": source, "backend": backend, "path": urlsplit(url).path,
+                                 "url": url, "status": status, "seconds": round(seconds, 4),
+                                 "bytes": nbytes, "retries": retries})
+
+    @contextmanager
+    def stage(self, name):
+        """with 블록의 실행 시간을 단계별로 누적"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name][0] += 1
+                self.stages[name][1] += elapsed
+
+    def page_load(self, source, url, timing, status="ok", nbytes=0):
+        """브라우저 페이지 로드 1건 기록 (timing: LeanProfile.load가 채운 단계별 시간)"""
+        for stage, seconds in timing.items():
+            self.add_stage(stage, seconds)
+        self.request(source, url, status, sum(timing.values()), nbytes, backend="browser")
+
+    def add_stage(self, name, seconds):
+        with self._lock:
+            self.stages[name][0] += 1
+            self.stages[name][1] += seconds
+
+    def add_wait(self, seconds, reason):
+        """이미 기다린 시간 기록 (rate limiter 등)"""
+        if seconds > 0:
+            with self._lock:
+                self.waits[reason] += seconds
+
+    def sleep(self, seconds, reason):
+        """기록하고 실제로 대기 (고정 딜레이용)"""
+        self.add_wait(seconds, reason)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def count(self, event, n=1):
+        with self._lock:
+            self.events[event] += n
+
+    # --- 리포트 ---
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._clock
+
+    def report(self):
+        """JSON으로 쓸 수 있는 요약 dict"""
+        with self._lock:
+            by_status = [
+                {"source": s, "backend": b, "status": st, "count": c, "seconds": round(t, 3),
+                 "bytes": n, "retries": r}
+                for (s, b, st), (c, t, n, r) in sorted(self.requests.items())
+            ]
+            latency = {
+                f"{s}/{b}": {"count": len(v), "mean": round(sum(v) / len(v), 4),
+                             "p50": round(_percentile(v, 0.5), 4), "p95": round(_percentile(v, 0.95), 4),
+                             "max": round(max(v), 4)}
+                for (s, b), v in sorted(self.latencies.items()) if v
+            }
+            total_requests = sum(c for c, _, _, _ in self.requests.values())
+            network = sum(t for _, t, _, _ in self.requests.values())
+            return {
+                "name": self.name,
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "wall_seconds": round(self.elapsed, 3),
+                "totals": {
+                    "requests": total_requests,
+                    "bytes": sum(n for _, _, n, _ in self.requests.values()),
+                    "retries": sum(r for _, _, _, r in self.requests.values()),
+                    "network_seconds": round(network, 3),
+                    "wait_seconds": round(sum(self.waits.values()), 3),
+                },
+                "requests": by_status,
+                "latency": latency,
+                "stages": {k: {"calls": c, "seconds": round(t, 3)} for k, (c, t) in sorted(self.stages.items())},
+                "waits": {k: round(v, 3) for k, v in sorted(self.waits.items())},
+                "events": dict(sorted(self.events.items())),
+                "slowest": sorted(self.log, key=lambda r: r["seconds"], reverse=True)[:SLOWEST_REQUESTS],
+                "log": list(self.log),
+            }
+
+    def prometheus(self):
+        """Prometheus 텍스트 형식 (node_exporter textfile collector용)"""
+        run = self.name
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP whalebuzz_{name} {help_text}")
+            lines.append(f"# TYPE whalebuzz_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in [("run", run)] + list(labels))
+                lines.append(f"whalebuzz_{name}{{{label_text}}} {_number(value)}")
+
+        with self._lock:
+            requests = sorted(self.requests.items())
+            latencies = sorted(self.latencies.items())
+            stages = sorted(self.stages.items())
+            waits = sorted(self.waits.items())
+            events = sorted(self.events.items())
+
+        def request_labels(source, backend, status):
+            return (("source", source), ("backend", backend), ("status", status))
+
+        metric("requests_total", "counter", "Requests by source, backend and status",
+               [(request_labels(*key), c) for key, (c, _, _, _) in requests])
+        metric("response_bytes_total", "counter", "Response bytes by source, backend and status",
+               [(request_labels(*key), n) for key, (_, _, n, _) in requests])
+        metric("retries_total", "counter", "Retries by source, backend and final status",
+               [(request_labels(*key), r) for key, (_, _, _, r) in requests])
+
+        lines.append("# HELP whalebuzz_request_seconds Request latency")
+        lines.append("# TYPE whalebuzz_request_seconds histogram")
+        for (source, backend), values in latencies:
+            labels = f'run="{run}",source="{source}",backend="{backend}"'
+            for bound in LATENCY_BUCKETS:
+                lines.append(f'whalebuzz_request_seconds_bucket{{{labels},le="{bound:g}"}} '
+                             f'{sum(1 for v in values if v <= bound)}')
+            lines.append(f'whalebuzz_request_seconds_bucket{{{labels},le="+Inf"}} {len(values)}')
+            lines.append(f"whalebuzz_request_seconds_sum{{{labels}}} {_number(sum(values))}")
+            lines.append(f"whalebuzz_request_seconds_count{{{labels}}} {len(values)}")
+
+        metric("stage_seconds_total", "counter", "Time spent per stage (summed across workers)",
+               [((("stage", k),), t) for k, (_, t) in stages])
+        metric("stage_calls_total", "counter", "Calls per stage", [((("stage", k),), c) for k, (c, _) in stages])
+        metric("wait_seconds_total", "counter", "Sleep / rate-limit wait by reason",
+               [((("reason", k),), v) for k, v in waits])
+        metric("events_total", "counter", "Skips, cache hits, retries and other events",
+               [((("event", k),), v) for k, v in events])
+        metric("run_duration_seconds", "gauge", "Wall time of the run", [((), self.elapsed)])
+        metric("run_start_timestamp_seconds", "gauge", "Run start (unix time)", [((), self.started)])
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """'요청 N건 (네트워크 X초) / 대기 Y초 / 파싱 Z초' 한 줄 요약"""
+        report = self.report()
+        totals = report["totals"]
+        parts = [f"요청 {totals['requests']}건 (네트워크 {totals['network_seconds']:.1f}초, "
+                 f"{totals['bytes'] / 1024 / 1024:,.1f} MB)"]
+        if report["waits"]:
+            parts.append("대기 " + ", ".join(f"{k} {v:.1f}초" for k, v in report["waits"].items()))
+        if report["stages"]:
+            parts.append("단계 " + ", ".join(f"{k} {v['seconds']:.1f}초" for k, v in report["stages"].items()))
+        return " / ".join(parts)
+
+    def write(self, report_dir=None):
+        """
+        reports/<name>_<시각>.json (실행별) + reports/<name>.prom (최신 실행, 덮어씀)
+        (json 경로, prom 경로) 반환
+        """
+        report_dir = report_dir or self.report_dir
+        os.makedirs(report_dir, exist_ok=True)
+        stamp = datetime.fromtimestamp(self.started).strftime("%Y%m%d_%H%M%S")
+        json_path = os.path.join(report_dir, f"{self.name}_{stamp}.json")
+        prom_path = os.path.join(report_dir, f"{self.name}.prom")
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        # textfile collector가 쓰다 만 파일을 읽지 않도록 임시 파일 → rename
+        tmp_path = prom_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, prom_path)
+        return json_path, prom_path
+
+    def finish(self):
+        """리포트를 쓰고 요약을 출력 (크롤러 진입점 마지막에 호출)"""
+        json_path, prom_path = self.write()
+        print(f"📈 실행 리포트: {self.summary()}")
+        print(f"   → {json_path} / {prom_path}")
+        return json_path, prom_path
+
+
+_shared_metrics = None
+_shared_lock = threading.Lock()
+
+
+def get_metrics():
+    """프로세스 전체에서 공유하는 현재 실행의 계측기 (start_run 전이면 'run' 이름으로 생성)"""
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = RunMetrics()
+        return _shared_metrics
+
+
+def start_run(name, report_dir=None):
+    """새 실행 시작 (공유 계측기를 새로 만듦)"""
+    global _shared_metrics
+    with _shared_lock:
+        _shared_metrics = RunMetrics(name, report_dir)
+        return _shared_metrics
@@ -0,0 +1,233 @@
+"""
+Reddit 언급 × 13F 보유 스냅샷 → (티커, 분기, 매니저) 패널
+
+RedditTickerCrawler 결과 (NDJSON / Parquet / SQLite)와 DataRoma_craw_hold 스냅샷을
+노트북에서 매번 따로 조인하지 않도록 한 번에 묶습니다.
+- 티커 표기 통일: BRK.B / BRK-B / BRK/B / $BRK.B → BRK-B,
+  클래스 주식이 하나만 추적 중이면 $BRK 같은 기본 심볼도 그 클래스로 (class_share_aliases)
+- 언급은 조각 단위로 읽으면서 (티커, 주간 버킷)으로 먼저 줄이고
+- 버킷 → 분기말은 merge_asof(forward), 분기말 직전 N일 언급은 merge_asof(backward)로 맞춤
+- 보유 스냅샷에는 position_delta의 매매 이벤트 (신규/추가/축소/청산)를 붙임
+행 단위 루프 없이 groupby / merge / merge_asof만 쓰므로 티커가 수천 개여도 그대로 동작합니다.
+
+    holdings = pd.read_csv("Guru_Portfolios_TimeSeries_2024-2025.csv")
+    frames = NDJSONSink("reddit_ticker_data_2023_2024.ndjson").iter_frames(MENTION_COLUMNS)
+    panel = build_panel(holdings, frames)
+"""
+
+import numpy as np
+import pandas as pd
+
+from position_delta import compute_position_deltas, EXIT
+
+# 언급 집계에 필요한 컬럼만 읽음 (reddit_sink iter_frames의 columns)
+MENTION_COLUMNS = ["ticker", "created_utc", "score", "num_comments"]
+KEYS = ["Ticker", "Report_Date", "Manager"]
+
+BUCKET_FREQ = "W"      # 언급 집계 시간 버킷 (pandas period 표기)
+TRAILING_DAYS = 28     # 분기말 직전 언급 창 (일)
+
+PANEL_COLUMNS = [
+    "Ticker", "Report_Date", "Manager",
+    "Shares", "Weight_Pct", "Value", "Action", "Share_Change", "Weight_Change", "Holders",
+    "Mentions", "Score", "Comments", "Mentions_Trailing", "Mention_Share", "Mention_Z", "Next_Mentions",
+]
+MENTION_STATS = ["Mentions", "Score", "Comments", "Mentions_Trailing", "Mention_Share", "Next_Mentions"]
+
+
+def normalize_tickers(tickers, aliases=None):
+    """
+    티커 표기 통일 (대문자, $ 제거, 클래스 구분자 . / 공백 → -)
+    고유값만 정리해서 원래 위치로 펼치므로 언급 수백만 행도 티커 수만큼만 문자열 처리
+    aliases: 정리 후 추가로 바꿀 {티커: 대표 티커} (class_share_aliases)
+    """
+    codes, uniques = pd.factorize(pd.Series(tickers, copy=False))
+    cleaned = (
+        pd.Series(uniques, dtype="string")
+        .str.strip().str.upper()
+        .str.replace(r"^\$+", "", regex=True)
+        .str.replace(r"[./\s]+", "-", regex=True)
+        .str.replace(r"[^A-Z0-9-]", "", regex=True)
+        .str.strip("-")
+    )
+    if aliases:
+        cleaned = cleaned.map(aliases).fillna(cleaned)
+    cleaned = cleaned.mask(cleaned == "")
+    # factorize의 결측 코드(-1)는 마지막에 붙인 NA로
+    values = np.append(cleaned.to_numpy(dtype=object), pd.NA)
+    return pd.Series(values[codes], index=getattr(tickers, "index", None), dtype="string")
+
+
+def class_share_aliases(known):
+    """
+    클래스 주식 기본 심볼 → 추적 중인 유일한 클래스 ({'BRK': 'BRK-B'})
+    기본 심볼 자체가 추적 대상이거나 클래스가 여러 개면 (GOOG/GOOGL처럼 별도 심볼 포함) 건드리지 않음
+    """
+    known = pd.Series(pd.unique(pd.Series(known, dtype="string").dropna()), dtype="string")
+    classes = known[known.str.fullmatch(r"[A-Z0-9]+-[A-Z]")]
+    base = classes.str.split("-").str[0]
+    unique = ~base.duplicated(keep=False) & ~base.isin(known)
+    return dict(zip(base[unique], classes[unique]))
+
+
+def bucket_mentions(frames, freq=BUCKET_FREQ, aliases=None):
+    """
+    wide 언급 조각 (티커당 1행) → (Ticker, Bucket_End)별 Mentions / Score / Comments
+    frames: DataFrame 하나 또는 조각 iterator (reddit_sink iter_frames)
+    조각마다 먼저 버킷으로 줄여서 전체 언급을 메모리에 올리지 않음
+    """
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    parts = []
+    for frame in frames:
+        if frame.empty:
+            continue
+        created = pd.to_datetime(pd.to_numeric(frame["created_utc"], errors="coerce"), unit="s")
+        chunk = pd.DataFrame({
+            "Ticker": normalize_tickers(frame["ticker"].astype(object), aliases).to_numpy(),
+            "Bucket_End": created.dt.to_period(freq).dt.end_time.dt.normalize().to_numpy(),
+            "Score": pd.to_numeric(frame["score"], errors="coerce").to_numpy() if "score" in frame else 0,
+            "Comments": (pd.to_numeric(frame["num_comments"], errors="coerce").to_numpy()
+                         if "num_comments" in frame else 0),
+        }).dropna(subset=["Ticker", "Bucket_End"])
+        parts.append(chunk.groupby(["Ticker", "Bucket_End"]).agg(
+            Mentions=("Ticker", "size"), Score=("Score", "sum"), Comments=("Comments", "sum")))
+    if not parts:
+        return pd.DataFrame(columns=["Ticker", "Bucket_End", "Mentions", "Score", "Comments"])
+    # 조각 경계에 걸친 버킷은 한 번 더 합산
+    return pd.concat(parts).groupby(level=[0, 1]).sum().reset_index()
+
+
+def quarter_grid(*dates):
+    """주어진 날짜들을 모두 덮는 연속된 분기말 날짜 (빈 분기 없이)"""
+    dates = pd.to_datetime(pd.concat([pd.Series(d) for d in dates], ignore_index=True)).dropna()
+    if dates.empty:
+        return pd.DatetimeIndex([])
+    periods = pd.period_range(dates.min().to_period("Q"), dates.max().to_period("Q"), freq="Q")
+    return periods.end_time.normalize()
+
+
+def quarter_mentions(buckets, report_dates, trailing_days=TRAILING_DAYS):
+    """
+    버킷 → 분기말 정렬 (Ticker, Report_Date)
+    - Mentions / Score / Comments: 직전 분기말 다음 날 ~ 분기말 사이 버킷 합계 (merge_asof forward)
+    - Mentions_Trailing: 분기말 직전 trailing_days일 언급 (merge_asof backward)
+    - Mention_Share: 그 분기 전체 언급 중 비중
+    - Mention_Z: 티커 자신의 분기별 언급 수 대비 z-score
+    - Next_Mentions: 다음 분기 언급 (13F 공개 후 반응)
+    """
+    columns = ["Ticker", "Report_Date", "Mentions", "Score", "Comments",
+               "Mentions_Trailing", "Mention_Share", "Mention_Z", "Next_Mentions"]
+    if buckets.empty:
+        # 보유 패널과 조인할 수 있게 키 타입은 맞춰서
+        empty = pd.DataFrame({c: pd.Series(dtype="float64") for c in columns})
+        return empty.astype({"Ticker": "string", "Report_Date": "datetime64[ns]"})
+
+    buckets = buckets.sort_values("Bucket_End", ignore_index=True)
+    grid = quarter_grid(report_dates, buckets["Bucket_End"])
+    assigned = pd.merge_asof(buckets, pd.DataFrame({"Report_Date": grid}),
+                             left_on="Bucket_End", right_on="Report_Date", direction="forward")
+    sums = assigned.groupby(["Ticker", "Report_Date"])[["Mentions", "Score", "Comments"]].sum()
+
+    # 언급이 없는 분기도 0으로 있어야 z-score / 다음 분기 값이 맞으므로 (티커 × 분기) 전체로 펼침
+    index = pd.MultiIndex.from_product([sums.index.levels[0], grid], names=["Ticker", "Report_Date"])
+    quarters = sums.reindex(index, fill_value=0).reset_index()
+
+    # 티커별 시간 창 누적 → 분기말 시점의 마지막 버킷 값
+    trailing = (
+        buckets.sort_values(["Ticker", "Bucket_End"])
+        .set_index("Bucket_End")
+        .groupby("Ticker")["Mentions"]
+        .rolling(f"{trailing_days}D").sum()
+        .reset_index(name="Mentions_Trailing")
+    )
+    quarters = pd.merge_asof(
+        quarters.sort_values("Report_Date"), trailing.sort_values("Bucket_End"),
+        left_on="Report_Date", right_on="Bucket_End", by="Ticker", direction="backward",
+        tolerance=pd.Timedelta(days=trailing_days),
+    ).drop(columns="Bucket_End")
+    quarters["Mentions_Trailing"] = quarters["Mentions_Trailing"].fillna(0)
+
+    quarters = quarters.sort_values(["Ticker", "Report_Date"], ignore_index=True)
+    by_quarter = quarters.groupby("Report_Date")["Mentions"]
+    quarters["Mention_Share"] = quarters["Mentions"] / by_quarter.transform("sum").replace(0, np.nan)
+    by_ticker = quarters.groupby("Ticker")["Mentions"]
+    std = by_ticker.transform("std").replace(0, np.nan)
+    quarters["Mention_Z"] = (quarters["Mentions"] - by_ticker.transform("mean")) / std
+    # 다음 분기 (마지막 분기는 아직 모름 → NaN)
+    quarters["Next_Mentions"] = by_ticker.shift(-1)
+    return quarters[columns]
+
+
+def holdings_panel(holdings):
+    """
+    보유 스냅샷 → (Ticker, Report_Date, Manager) 행 + 매매 이벤트 + 같은 분기 보유 매니저 수
+    청산된 종목은 Shares 0, Action 'exit' 행으로 들어감
+    """
+    values = [c for c in ("Shares", "Weight_Pct", "Value") if c in holdings.columns]
+    df = holdings[["Manager", "Ticker", "Report_Date"] + values].copy()
+    df["Ticker"] = normalize_tickers(df["Ticker"].astype(object))
+    df["Manager"] = df["Manager"].astype(str)
+    df["Report_Date"] = pd.to_datetime(df["Report_Date"]).dt.strftime("%Y-%m-%d")
+    for column in values:
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+    df = df.dropna(subset=["Ticker"])
+    # 표기를 통일하면서 같은 티커가 된 행 (BRK.B / BRK-B)은 합산
+    df = df.groupby(["Manager", "Ticker", "Report_Date"], as_index=False).sum(min_count=1)
+
+    panel = df
+    if "Shares" in df.columns:
+        events = compute_position_deltas(df, include_unchanged=True)
+        events = events[["Manager", "Ticker", "Report_Date", "Action", "Share_Change", "Weight_Change"]]
+        panel = df.merge(events, on=["Manager", "Ticker", "Report_Date"], how="outer")
+        exited = panel["Action"] == EXIT
+        for column in values:
+            panel.loc[exited, column] = 0.0
+        held = panel["Shares"].fillna(0) > 0
+    else:
+        held = pd.Series(True, index=panel.index)
+    panel["Holders"] = held.groupby([panel["Ticker"], panel["Report_Date"]]).transform("sum").astype("int64")
+    panel["Report_Date"] = pd.to_datetime(panel["Report_Date"])
+    return panel
+
+
+def build_panel(holdings, mention_frames=None, freq=BUCKET_FREQ, trailing_days=TRAILING_DAYS):
+    """
+    (Ticker, Report_Date, Manager) 패널 (PANEL_COLUMNS)
+
+    Args:
+        holdings: Manager, Ticker, Report_Date, Shares (+ Weight_Pct, Value) - DataRoma_craw_hold 결과 형태
+        mention_frames: reddit_sink iter_frames(MENTION_COLUMNS) 조각 또는 DataFrame (없으면 언급 컬럼 0)
+        freq: 언급 집계 버킷 ('W', 'D' ...)
+        trailing_days: Mentions_Trailing 창 (일)
+    """
+    panel = holdings_panel(holdings)
+    aliases = class_share_aliases(panel["Ticker"])
+    buckets = bucket_mentions(mention_frames if mention_frames is not None else [], freq, aliases)
+    quarters = quarter_mentions(buckets, panel["Report_Date"], trailing_days)
+
+    quarters["Ticker"] = quarters["Ticker"].astype("string")
+    panel = panel.merge(quarters, on=["Ticker", "Report_Date"], how="left")
+    # 한 번도 언급되지 않은 티커는 0 (Next_Mentions는 다음 분기 데이터가 있을 때만)
+    panel[MENTION_STATS + ["Mention_Z"]] = panel[MENTION_STATS + ["Mention_Z"]].astype("float64")
+    if not quarters.empty:
+        has_next = panel["Report_Date"] < quarters["Report_Date"].max()
+        panel.loc[has_next, "Next_Mentions"] = panel.loc[has_next, "Next_Mentions"].fillna(0.0)
+    current = [c for c in MENTION_STATS if c != "Next_Mentions"]
+    panel[current] = panel[current].fillna(0.0)
+    panel["Report_Date"] = panel["Report_Date"].dt.strftime("%Y-%m-%d")
+
+    panel = panel.reindex(columns=PANEL_COLUMNS)
+    panel = panel.sort_values(KEYS, ignore_index=True)
+    panel["Ticker"] = panel["Ticker"].astype("category")
+    panel["Manager"] = panel["Manager"].astype("category")
+    return panel
+
+
+def summarize_panel(panel, top=10):
+    """분기별 가장 많이 언급된 보유 종목 (티커당 1행, 보유 매니저 수와 같이)"""
+    per_ticker = panel.drop_duplicates(["Ticker", "Report_Date"])
+    per_ticker = per_ticker[per_ticker["Mentions"] > 0]
+    return (per_ticker.sort_values(["Report_Date", "Mentions"], ascending=[True, False])
+            .groupby("Report_Date", observed=True).head(top)
+            [["Report_Date", "Ticker", "Holders", "Mentions", "Mentions_Trailing", "Mention_Z"]])
@@ -0,0 +1,413 @@
+"""
+로컬 SQLite 저장소 (모든 크롤러 결과를 한 파일에)
+
+CSV는 실행마다 덮어쓰거나 (holdings) 계속 이어써서 중복이 쌓이고 (history),
+WhaleWisdom은 운용사마다 파일이 따로라 "X를 누가 언제 들고 있었나"를 보려면 전부 읽어서 합쳐야 했습니다.
+여기서는 테이블마다 자연 키를 PRIMARY KEY로 두고 upsert하므로 같은 데이터를 다시 넣어도 행이 늘지 않고,
+자주 쓰는 조회 (티커별 보유자, 매니저별 포트폴리오, 티커별 언급) 는 인덱스로 필요한 행만 읽습니다.
+
+    holdings   (source, manager, ticker, report_date)  분기별 보유 스냅샷 (Dataroma / WhaleWisdom)
+    history    (source, manager, ticker, report_date)  hist.php 매매 이력
+    securities (ticker)                                Yahoo 섹터/산업/최근 가격
+    reddit_posts (post_id) / reddit_mentions (post_id, ticker)
+
+    store = get_store()                       # data/whalebuzz.sqlite (WHALEBUZZ_DB로 변경)
+    store.upsert_holdings(df, source="dataroma")
+    store.holders("AAPL", start="2024-01-01")
+    store.portfolio("Berkshire Hathaway")     # 가장 최근 분기
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from response_cache import FILING_GRACE_DAYS
+
+DEFAULT_PATH = os.environ.get("WHALEBUZZ_DB", os.path.join("data", "whalebuzz.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS holdings (
+    source TEXT NOT NULL,
+    manager TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    report_date TEXT NOT NULL,
+    style TEXT,
+    stock_name TEXT,
+    weight_pct REAL,
+    shares REAL,
+    price REAL,
+    value REAL,
+    extra TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, manager, ticker, report_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_holdings_ticker ON holdings(ticker, report_date);
+CREATE INDEX IF NOT EXISTS idx_holdings_manager ON holdings(manager, report_date);
+
+CREATE TABLE IF NOT EXISTS history (
+    source TEXT NOT NULL,
+    manager TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    report_date TEXT NOT NULL,
+    style TEXT,
+    period TEXT,
+    shares REAL,
+    weight_pct REAL,
+    activity TEXT,
+    weight_change REAL,
+    price REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, manager, ticker, report_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_history_ticker ON history(ticker, report_date);
+CREATE INDEX IF NOT EXISTS idx_history_manager ON history(manager, ticker);
+
+CREATE TABLE IF NOT EXISTS securities (
+    ticker TEXT PRIMARY KEY,
+    sector TEXT,
+    industry TEXT,
+    last_price REAL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS reddit_posts (
+    post_id INTEGER PRIMARY KEY,
+    id TEXT,
+    subreddit TEXT,
+    title TEXT,
+    selftext TEXT,
+    score INTEGER,
+    num_comments INTEGER,
+    upvote_ratio REAL,
+    created_utc INTEGER,
+    year INTEGER,
+    quarter INTEGER,
+    author TEXT,
+    url TEXT,
+    permalink TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reddit_posts_created ON reddit_posts(created_utc);
+
+CREATE TABLE IF NOT EXISTS reddit_mentions (
+    post_id INTEGER NOT NULL,
+    ticker TEXT NOT NULL,
+    PRIMARY KEY (post_id, ticker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_reddit_mentions_ticker ON reddit_mentions(ticker, post_id);
+"""
+
+# 테이블별 (키 컬럼, 값 컬럼). updated_at은 upsert할 때 자동으로 채움
+TABLES = {
+    "holdings": (["source", "manager", "ticker", "report_date"],
+                 ["style", "stock_name", "weight_pct", "shares", "price", "value", "extra"]),
+    "history": (["source", "manager", "ticker", "report_date"],
+                ["style", "period", "shares", "weight_pct", "activity", "weight_change", "price"]),
+    "securities": (["ticker"], ["sector", "industry", "last_price"]),
+    "reddit_posts": (["post_id"],
+                     ["id", "subreddit", "title", "selftext", "score", "num_comments", "upvote_ratio",
+                      "created_utc", "year", "quarter", "author", "url", "permalink"]),
+    "reddit_mentions": (["post_id", "ticker"], []),
+}
+
+# 크롤러 DataFrame 컬럼 → 테이블 컬럼 (소문자 + 영숫자 외 '_'로 바꾼 이름 기준)
+HOLDING_ALIASES = {
+    "manager": "manager", "style": "style", "report_date": "report_date",
+    "ticker": "ticker", "symbol": "ticker",
+    "stock_name": "stock_name", "stock": "stock_name", "name": "stock_name", "company": "stock_name",
+    "weight_pct": "weight_pct", "of_portfolio": "weight_pct",
+    "shares": "shares", "shares_held": "shares", "shares_held_or_principal_amt": "shares",
+    "price": "price", "avg_price": "price", "reported_price": "price",
+    "value": "value", "market_value": "value",
+}
+HISTORY_ALIASES = {
+    "manager": "manager", "style": "style", "ticker": "ticker", "period": "period",
+    "shares": "shares", "of_portfolio": "weight_pct", "activity": "activity",
+    "change_to_portfolio": "weight_change", "reported_price": "price",
+}
+
+_PERIOD_YEAR = r"(\d{4})"
+_PERIOD_QUARTER = r"Q\s*([1-4])"
+
+
+def _snake(name):
+    return re.sub(r"[^0-9a-z]+", "_", str(name).lower()).strip("_")
+
+
+def _rename(df, aliases):
+    """별칭에 있는 컬럼은 테이블 컬럼으로, 나머지는 그대로 (앞에 온 컬럼 우선)"""
+    renamed = {}
+    for column in df.columns:
+        target = aliases.get(_snake(column))
+        if target and target not in renamed.values():
+            renamed[column] = target
+    return df.rename(columns=renamed)
+
+
+def period_to_date(periods):
+    """hist.php 'Period' ('2024 Q4' / 'Q4 2024') → 분기말 날짜 문자열 (해석 못 하면 NaN)"""
+    periods = pd.Series(periods, dtype="object").astype(str)
+    year = periods.str.extract(_PERIOD_YEAR, expand=False)
+    quarter = periods.str.extract(_PERIOD_QUARTER, expand=False)
+    valid = year.notna() & quarter.notna()
+    dates = pd.Series(pd.NA, index=periods.index, dtype="object")
+    if valid.any():
+        ends = pd.PeriodIndex.from_fields(year=year[valid].astype(int), quarter=quarter[valid].astype(int),
+                                          freq="Q").end_time
+        dates[valid] = ends.strftime("%Y-%m-%d")
+    return dates
+
+
+def latest_report_date(today=None, grace_days=FILING_GRACE_DAYS):
+    """
+    오늘 기준으로 13F가 공개됐을 가장 최근 분기말 (날짜가 없는 현재 포트폴리오 페이지용)
+    분기가 끝나고 grace_days (13F 제출 기한) 안에는 사이트가 아직 직전 분기를 보여주므로 한 분기 더 앞으로
+    데이터에 분기가 있으면 그쪽을 쓰고 이 값은 마지막 수단으로만
+    """
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize() - pd.Timedelta(days=grace_days)
+    return (today.to_period("Q") - 1).end_time.strftime("%Y-%m-%d")
+
+
+class WhaleStore:
+    """
+    with WhaleStore("data/whalebuzz.sqlite") as store:
+        store.upsert_holdings(df)
+        store.holders("AAPL")
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # ------------------------------------------------------------------
+    # 쓰기 (upsert)
+    # ------------------------------------------------------------------
+    def upsert(self, table, df, keep_existing=False, replace=None):
+        """
+        DataFrame (테이블 컬럼 이름) → INSERT ... ON CONFLICT DO UPDATE
+        키가 비어 있는 행은 건너뜀. 쓴 행 수 반환
+        keep_existing: True면 새 값이 NULL인 컬럼은 기존 값을 유지
+        replace: 키 컬럼 일부 (예: source, manager, report_date) - 같은 트랜잭션에서
+                 DataFrame에 있는 조합의 기존 행을 먼저 지움 (스냅샷에서 빠진 종목 정리)
+        """
+        keys, values = TABLES[table]
+        if df is None or df.empty:
+            return 0
+        missing = [c for c in keys if c not in df.columns]
+        if missing:
+            raise ValueError(f"{table}: 키 컬럼 누락 {missing}")
+
+        columns = keys + [c for c in values if c in df.columns]
+        frame = df[columns].dropna(subset=keys)
+        for key in keys:
+            if frame[key].dtype == object:
+                frame = frame[frame[key].astype(str).str.strip() != ""]
+        if frame.empty:
+            return 0
+        frame = frame.astype(object).where(frame.notna(), None)
+
+        has_updated = table != "reddit_mentions"
+        insert_columns = columns + (["updated_at"] if has_updated else [])
+        updates = [c for c in insert_columns if c not in keys]
+        sql = (f"INSERT INTO {table} ({', '.join(insert_columns)}) "
+               f"VALUES ({', '.join('?' * len(insert_columns))}) "
+               f"ON CONFLICT ({', '.join(keys)}) ")
+        if keep_existing:
+            assignments = [f"{c} = COALESCE(excluded.{c}, {c})" for c in updates]
+        else:
+            assignments = [f"{c} = excluded.{c}" for c in updates]
+        sql += f"DO UPDATE SET {', '.join(assignments)}" if updates else "DO NOTHING"
+
+        now = time.time()
+        rows = frame.itertuples(index=False, name=None)
+        if has_updated:
+            rows = (row + (now,) for row in rows)
+        with self._lock, self._conn:
+            if replace:
+                groups = frame[replace].drop_duplicates().itertuples(index=False, name=None)
+                self._conn.executemany(
+                    f"DELETE FROM {table} WHERE {' AND '.join(f'{c} = ?' for c in replace)}", groups
+                )
+            self._conn.executemany(sql, rows)
+        return len(frame)
+
+    def upsert_holdings(self, df, source="dataroma", report_date=None):
+        """
+        보유 스냅샷 (DataRoma_craw_hold / WhaleWisdom 테이블)
+        (source, manager, report_date) 스냅샷 단위로 교체하므로 청산한 종목은 남지 않음
+        report_date: DataFrame에 Report_Date가 없을 때 쓸 기준일
+        테이블에 없는 컬럼은 extra(JSON)에 보관
+        """
+        if df is None or df.empty:
+            return 0
+        frame = _rename(df, HOLDING_ALIASES)
+        if "ticker" not in frame.columns:
+            raise ValueError(f"holdings: 티커 컬럼을 찾을 수 없음 {list(df.columns)}")
+        if "report_date" not in frame.columns:
+            frame["report_date"] = report_date or latest_report_date()
+        frame["source"] = source
+        frame["ticker"] = frame["ticker"].astype("string").str.strip().str.upper().astype(object)
+        frame["report_date"] = frame["report_date"].astype(str)
+
+        _, values = TABLES["holdings"]
+        extra = [c for c in frame.columns if c not in values and c not in TABLES["holdings"][0]]
+        if extra:
+            frame["extra"] = [
+                json.dumps({k: v for k, v in row.items() if pd.notna(v)}, ensure_ascii=False, default=str)
+                for row in frame[extra].to_dict("records")
+            ]
+        return self.upsert("holdings", frame, replace=["source", "manager", "report_date"])
+
+    def upsert_history(self, df, source="dataroma", replace=True):
+        """
+        hist.php 매매 이력 (Period → 분기말 report_date, 해석 못 한 행은 제외)
+        replace=True: (source, manager, ticker) 단위로 교체 (hist.php 한 페이지가 그 종목의 전체 이력)
+        replace=False: 있는 분기만 upsert (stock.php처럼 최신 분기 한 행만 있을 때)
+        """
+        if df is None or df.empty:
+            return 0
+        frame = _rename(df, HISTORY_ALIASES)
+        frame["source"] = source
+        frame["report_date"] = period_to_date(frame["period"])
+        return self.upsert("history", frame, replace=["source", "manager", "ticker"] if replace else None)
+
+    def upsert_securities(self, df):
+        """Yahoo 연동 결과 (Ticker, Sector, Industry, Current_Price)"""
+        if df is None or df.empty:
+            return 0
+        frame = df.rename(columns={"Ticker": "ticker", "Sector": "sector",
+                                   "Industry": "industry", "Current_Price": "last_price"})
+        frame = frame.drop_duplicates("ticker", keep="last")
+        # 조회 실패 값은 비워서 기존 값을 덮어쓰지 않음
+        for column in ("sector", "industry"):
+            if column in frame.columns:
+                frame[column] = frame[column].where(frame[column] != "Error")
+        if "last_price" in frame.columns:
+            frame["last_price"] = frame["last_price"].where(frame["last_price"] > 0)
+        return self.upsert("securities", frame, keep_existing=True)
+
+    def upsert_reddit(self, posts, mentions):
+        """reddit_tables.split_records 결과 (posts, mentions)"""
+        written = self.upsert("reddit_posts", posts)
+        self.upsert("reddit_mentions", mentions)
+        return written
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def iter_query(self, sql, params=(), chunksize=50000):
+        """큰 결과를 조각으로 읽기 (별도 읽기 연결이라 쓰기와 동시에 써도 됨)"""
+        conn = sqlite3.connect(self.path)
+        try:
+            yield from pd.read_sql_query(sql, conn, params=params, chunksize=chunksize)
+        finally:
+            conn.close()
+
+    def holders(self, ticker, start=None, end=None, source=None):
+        """티커를 보유한 (매니저, 분기) 목록 (idx_holdings_ticker)"""
+        sql, params = _where(
+            "SELECT source, manager, report_date, shares, weight_pct, value FROM holdings",
+            [("ticker = ?", ticker.upper()), ("report_date >= ?", start),
+             ("report_date <= ?", end), ("source = ?", source)],
+        )
+        return self.query(sql + " ORDER BY report_date, manager", params)
+
+    def portfolio(self, manager, report_date=None, source=None):
+        """매니저의 분기 포트폴리오 (report_date가 없으면 가장 최근 분기)"""
+        if report_date is None:
+            sql, params = _where("SELECT MAX(report_date) FROM holdings",
+                                 [("manager = ?", manager), ("source = ?", source)])
+            with self._lock:
+                report_date = self._conn.execute(sql, params).fetchone()[0]
+            if report_date is None:
+                return self.query("SELECT * FROM holdings WHERE 0")
+        sql, params = _where(
+            "SELECT source, ticker, stock_name, shares, weight_pct, price, value, report_date FROM holdings",
+            [("manager = ?", manager), ("report_date = ?", report_date), ("source = ?", source)],
+        )
+        return self.query(sql + " ORDER BY weight_pct DESC", params)
+
+    def activity(self, ticker=None, manager=None, start=None, end=None):
+        """hist.php 매매 이력 (티커 또는 매니저 기준)"""
+        sql, params = _where(
+            "SELECT manager, ticker, report_date, period, activity, shares, weight_pct, weight_change, price "
+            "FROM history",
+            [("ticker = ?", ticker.upper() if ticker else None), ("manager = ?", manager),
+             ("report_date >= ?", start), ("report_date <= ?", end)],
+        )
+        return self.query(sql + " ORDER BY manager, ticker, report_date", params)
+
+    def mentions(self, ticker, start_utc=None, end_utc=None, columns=("title", "score", "num_comments")):
+        """티커를 언급한 Reddit 게시물 (idx_reddit_mentions_ticker)"""
+        selected = ", ".join(f"p.{c}" for c in ("post_id", "subreddit", "created_utc") + tuple(columns))
+        sql, params = _where(
+            f"SELECT {selected} FROM reddit_mentions m JOIN reddit_posts p ON p.post_id = m.post_id",
+            [("m.ticker = ?", ticker.upper()), ("p.created_utc >= ?", start_utc),
+             ("p.created_utc < ?", end_utc)],
+        )
+        return self.query(sql + " ORDER BY p.created_utc", params)
+
+    def mention_counts(self, tickers=None):
+        """티커 × (연도, 분기)별 언급 수 / 점수 합계"""
+        sql = ("SELECT m.ticker, p.year, p.quarter, COUNT(*) AS mentions, SUM(p.score) AS score "
+               "FROM reddit_mentions m JOIN reddit_posts p ON p.post_id = m.post_id")
+        params = []
+        if tickers:
+            tickers = [t.upper() for t in tickers]
+            sql += f" WHERE m.ticker IN ({', '.join('?' * len(tickers))})"
+            params = tickers
+        return self.query(sql + " GROUP BY m.ticker, p.year, p.quarter ORDER BY m.ticker, p.year, p.quarter",
+                          params)
+
+    def stats(self):
+        """테이블별 행 수"""
+        with self._lock:
+            return {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in TABLES}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _where(sql, conditions):
+    """값이 None인 조건은 빼고 WHERE 절 구성"""
+    clauses = [(clause, value) for clause, value in conditions if value is not None]
+    if clauses:
+        sql += " WHERE " + " AND ".join(clause for clause, _ in clauses)
+    return sql, [value for _, value in clauses]
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_store():
+    """프로세스 전체에서 공유하는 기본 저장소 인스턴스"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = WhaleStore()
+        return _shared_store
@@ -0,0 +1,147 @@
+"""
+스크래핑한 표의 숫자 컬럼 정리 (벡터화)
+
+셀마다 apply로 변환하지 않고 컬럼 전체에 pyarrow.compute 문자열 연산 + cast를 적용합니다.
+- "$1,234.5" / "12.3%" / "+5" / "1.2M" / "(1,234)" (음수) / 빈칸·"-" (결측) 처리
+- 결과는 nullable 타입 (Float64 / Int64) → 변환 실패가 0.0으로 숨지 않고 <NA>로 남음
+- 컬럼별로 변환에 실패한 값 개수를 보고
+"""
+
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# 결측으로 볼 표기
+BLANK_VALUES = ["", "-", "--", "—", "–", "N/A", "NA", "n/a", "nan", "NaN", "None"]
+
+_SUFFIX_MULTIPLIERS = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+_NUMBER_PATTERN = r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?"
+_NUMBER_RE = re.compile(_NUMBER_PATTERN)
+_STRIP_RE = re.compile(r"[\$,%()\s]")
+
+_BLANK_SET = pa.array(BLANK_VALUES)
+_SUFFIXES = pa.array(list(_SUFFIX_MULTIPLIERS))
+_SUFFIX_VALUES = pa.array(list(_SUFFIX_MULTIPLIERS.values()))
+
+# 자동 감지 시 미리 검사할 표본 크기
+SAMPLE_SIZE = 20
+
+
+def _to_arrow_strings(series):
+    """Series → pyarrow string 배열 (숫자/None이 섞인 object 컬럼도 처리)"""
+    try:
+        return pa.array(series, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(series.astype("string[pyarrow]"))
+
+
+def parse_numeric(series):
+    """
+    문자열 컬럼 → Float64 컬럼
+    Returns: (변환된 Series, 변환 실패 개수)
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype("Float64"), 0
+
+    # pandas 문자열 연산 대신 pyarrow.compute를 직접 사용
+    # (컬럼마다 붙는 고정 오버헤드가 작아서 작은 표가 많을 때도 빠름)
+    text = pc.utf8_trim_whitespace(_to_arrow_strings(series))
+    blank = pc.or_(pc.is_null(text), pc.is_in(text, value_set=_BLANK_SET))
+
+    # (1,234) 형태의 음수
+    negative = pc.fill_null(pc.and_(pc.starts_with(text, "("), pc.ends_with(text, ")")), False)
+    text = pc.replace_substring_regex(text, r"[\$,%()\s]", "")
+
+    # K/M/B/T 단위
+    suffix_index = pc.index_in(pc.utf8_upper(pc.utf8_slice_codeunits(text, -1)), value_set=_SUFFIXES)
+    has_suffix = pc.is_valid(suffix_index)
+    multiplier = pc.fill_null(pc.take(_SUFFIX_VALUES, suffix_index), 1.0)
+    text = pc.if_else(has_suffix, pc.utf8_slice_codeunits(text, 0, -1), text)
+
+    # 숫자 형태만 골라 한 번에 캐스팅
+    valid = pc.fill_null(pc.match_substring_regex(text, f"^(?:{_NUMBER_PATTERN})$"), False)
+    values = pc.multiply(pc.cast(pc.if_else(valid, text, None), pa.float64()), multiplier)
+    values = pc.if_else(negative, pc.negate(values), values)
+    values = pc.if_else(blank, pa.scalar(None, pa.float64()), values)
+
+    failed = int(pc.sum(pc.and_(pc.invert(valid), pc.invert(blank))).as_py() or 0)
+    result = pd.Series(values.to_numpy(zero_copy_only=False), index=series.index,
+                       name=series.name, dtype="Float64")
+    return result, failed
+
+
+def _looks_numeric(series, min_ratio):
+    """앞쪽 값 일부만 파이썬으로 검사해서 숫자 컬럼 후보인지 빠르게 판단"""
+    sample = []
+    for value in series:
+        if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+            continue
+        text = str(value).strip()
+        if text in BLANK_VALUES:
+            continue
+        sample.append(text)
+        if len(sample) >= SAMPLE_SIZE:
+            break
+    if not sample:
+        return False
+    hits = 0
+    for text in sample:
+        text = _STRIP_RE.sub("", text)
+        if text[-1:].upper() in _SUFFIX_MULTIPLIERS:
+            text = text[:-1]
+        hits += bool(_NUMBER_RE.fullmatch(text))
+    return hits / len(sample) >= min_ratio
+
+
+def _to_integer_if_whole(values):
+    """소수점이 없는 값만 있으면 Int64로"""
+    non_null = values.dropna()
+    if len(non_null) and (non_null % 1 == 0).all():
+        return values.astype("Int64")
+    return values
+
+
+def normalize_table(df, numeric_columns=None, integer_columns=(), min_ratio=0.8):
+    """
+    표의 숫자 컬럼을 한 번에 정리
+
+    Args:
+        numeric_columns: 변환할 컬럼. None이면 자동 감지
+                         (빈칸을 뺀 값의 min_ratio 이상이 숫자로 읽히는 문자열 컬럼)
+        integer_columns: 정수로 떨어지면 Int64로 바꿀 컬럼 (예: Shares)
+
+    Returns:
+        (정리된 DataFrame, {컬럼: 변환 실패 개수})
+    """
+    df = df.copy()
+    report = {}
+
+    if numeric_columns is None:
+        candidates = [c for c in df.columns if df[c].dtype == object or pd.api.types.is_string_dtype(df[c])]
+        # 텍스트 컬럼(종목명, 링크 등)은 전체 변환 전에 표본으로 걸러냄
+        candidates = [c for c in candidates if _looks_numeric(df[c], min_ratio)]
+    else:
+        candidates = [c for c in numeric_columns if c in df.columns]
+
+    for column in candidates:
+        values, failed = parse_numeric(df[column])
+        if numeric_columns is None:
+            parsed = int(values.notna().sum())
+            if parsed == 0 or parsed / (parsed + failed) < min_ratio:
+                continue
+        if column in integer_columns:
+            values = _to_integer_if_whole(values)
+        df[column] = values
+        report[column] = failed
+
+    return df, report
+
+
+def format_report(report):
+    """변환 실패 요약 문자열 (실패가 없으면 빈 문자열)"""
+    failures = {column: count for column, count in report.items() if count}
+    if not failures:
+        return ""
+    return ", ".join(f"{column} {count}개" for column, count in failures.items())
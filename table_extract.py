@@ -0,0 +1,187 @@
+"""
+대상 테이블만 골라 읽는 추출기 (pd.read_html 대체)
+
+pd.read_html은 문서 전체를 파싱하고 페이지의 모든 <table>을 DataFrame으로 만듭니다.
+여기서는
+- HTML 문자열에서 id가 맞는 <table> 구간만 잘라 lxml로 파싱하고
+  (중첩 테이블 등으로 자르기가 애매하면 문서 전체를 파싱해서 id로 찾음)
+- 셀 텍스트와 함께 링크(href, 예: stock.php?sym=)를 "<컬럼>_href" 컬럼으로 남기고
+- 숫자 컬럼은 normalize_table로 바로 타입을 맞춰 돌려줍니다.
+
+    df, report = extract_table(html, "grid", links=True)
+"""
+
+import re
+
+import pandas as pd
+from lxml import etree
+from lxml import html as lxml_html
+
+from table_clean import normalize_table
+
+_WHITESPACE = re.compile(r"\s+")
+_TABLE_OPEN = re.compile(r"<table\b", re.IGNORECASE)
+_TABLE_CLOSE = re.compile(r"</table\s*>", re.IGNORECASE)
+
+# lxml.html의 요소 클래스 조회를 거치지 않는 기본 HTML 파서 (셀이 많을 때 훨씬 빠름)
+_PARSER = etree.HTMLParser()
+
+
+def find_table_html(html, table_id):
+    """
+    id가 table_id인 <table>...</table> 구간 문자열 (없으면 None)
+    table_id=None이면 문서의 첫 번째 테이블
+    """
+    if not html:
+        return None
+
+    if table_id is None:
+        match = _TABLE_OPEN.search(html)
+        if match is None:
+            return None
+        start = match.start()
+    else:
+        # data-id= / ng-id= 같은 다른 속성은 제외 (앞 글자가 영숫자/하이픈이 아닌 id=만)
+        match = re.search(r'(?<![\w-])id\s*=\s*["\']?' + re.escape(table_id) + r'["\'\s>]', html)
+        if match is None:
+            return None
+        start = html.rfind("<", 0, match.start())
+        if (not _TABLE_OPEN.match(html, start) or ">" in html[start:match.start()]
+                or _inside_raw_text(html, start)):
+            # id가 <table>이 아닌 다른 태그, 태그 밖의 텍스트, 주석/스크립트 안에 있음 → 전체 파싱으로 처리
+            return _find_table_in_tree(html, table_id)
+
+    close = _TABLE_CLOSE.search(html, start)
+    if close is None:
+        return None
+    fragment = html[start:close.end()]
+    if len(_TABLE_OPEN.findall(fragment)) > 1:
+        # 중첩 테이블이면 문자열 자르기가 틀리므로 전체 파싱
+        return _find_table_in_tree(html, table_id)
+    return fragment
+
+
+def _inside_raw_text(html, pos):
+    """pos가 주석 / <script> / <style> 안인지 (그 안의 <table id=...>는 실제 테이블이 아님)"""
+    if html.rfind("<!--", 0, pos) > html.rfind("-->", 0, pos):
+        return True
+    head = html[:pos].lower()
+    return max(head.rfind("<script"), head.rfind("<style")) > max(head.rfind("</script"), head.rfind("</style"))
+
+
+def _find_table_in_tree(html, table_id):
+    tree = lxml_html.fromstring(html)
+    if table_id is None:
+        tables = tree.xpath("//table")
+    else:
+        tables = tree.xpath(f'//*[@id="{table_id}"]/descendant-or-self::table')
+    if not tables:
+        return None
+    return lxml_html.tostring(tables[0], encoding="unicode")
+
+
+# 셀 텍스트 / 첫 링크 (미리 컴파일한 XPath가 itertext 루프보다 빠름)
+_CELL_TEXT = etree.XPath("string()")
+_CELL_HREF = etree.XPath("string(.//a/@href)")
+
+
+def _row_cells(row):
+    """colspan을 펼친 셀 요소 목록"""
+    cells = []
+    for cell in row:
+        if cell.tag not in ("td", "th"):
+            continue
+        span = cell.get("colspan")
+        cells.extend([cell] * (int(span) if span and span.isdigit() else 1))
+    return cells
+
+
+def _parse_rows(table):
+    """(헤더 셀, 본문 행별 셀 목록). 헤더는 thead 마지막 행 또는 th로만 된 첫 행"""
+    header_rows, body_rows = [], []
+    for child in table:
+        if child.tag == "thead":
+            header_rows.extend(row for row in child if row.tag == "tr")
+        elif child.tag == "tbody":
+            body_rows.extend(row for row in child if row.tag == "tr")
+        elif child.tag == "tr":
+            body_rows.append(child)
+
+    if header_rows:
+        header = header_rows[-1]
+    elif body_rows and all(cell.tag != "td" for cell in body_rows[0]):
+        header, body_rows = body_rows[0], body_rows[1:]
+    else:
+        header = None
+
+    header_cells = _row_cells(header) if header is not None else []
+    rows = [_row_cells(row) for row in body_rows]
+    return header_cells, [row for row in rows if row]
+
+
+def _text(cell):
+    # read_html처럼 공백을 한 칸으로 정리, 빈 셀은 None
+    return " ".join(_CELL_TEXT(cell).split()) or None
+
+
+def _unique_columns(columns, width):
+    """빈/중복 컬럼 이름을 read_html과 비슷하게 보정"""
+    columns = list(columns[:width]) + [str(i) for i in range(len(columns), width)]
+    seen = {}
+    result = []
+    for i, name in enumerate(columns):
+        name = name or f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        result.append(name)
+    return result
+
+
+def extract_table(html, table_id="grid", links=False, typed=True,
+                  numeric_columns=None, integer_columns=()):
+    """
+    대상 테이블 하나를 DataFrame으로
+
+    Args:
+        table_id: 테이블 id (None이면 첫 번째 테이블)
+        links: True면 링크가 있는 컬럼마다 "<컬럼>_href"를 맨 뒤에 추가
+        typed: True면 normalize_table로 숫자 컬럼 변환
+        numeric_columns, integer_columns: normalize_table에 그대로 전달
+
+    Returns:
+        (DataFrame, {컬럼: 변환 실패 개수}). 테이블이 없으면 (None, {})
+    """
+    fragment = find_table_html(html, table_id)
+    if fragment is None:
+        return None, {}
+    table = etree.fromstring(fragment, _PARSER).find(".//table")
+
+    header, rows = _parse_rows(table)
+    width = max([len(header)] + [len(row) for row in rows])
+    if width == 0:
+        return None, {}
+    columns = _unique_columns([_text(cell) or "" for cell in header], width)
+
+    rows = [row + [None] * (width - len(row)) for row in rows]
+    data = {
+        name: [_text(row[i]) if row[i] is not None else None for row in rows]
+        for i, name in enumerate(columns)
+    }
+    if links:
+        for i, name in enumerate(columns):
+            hrefs = [(_CELL_HREF(row[i]) or None) if row[i] is not None else None for row in rows]
+            if any(hrefs):
+                data[f"{name}_href"] = hrefs
+    df = pd.DataFrame(data)
+
+    if not typed:
+        return df, {}
+    return normalize_table(df, numeric_columns=numeric_columns, integer_columns=integer_columns)
+
+
+def href_param(hrefs, name):
+    """href 컬럼에서 쿼리 파라미터 값만 추출 (예: href_param(df['Stock_href'], 'sym'))"""
+    return pd.Series(hrefs, dtype="string").str.extract(rf"[?&]{re.escape(name)}=([^&#]+)", expand=False)
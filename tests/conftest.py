@@ -0,0 +1,79 @@
+"""
+테스트 공통 설정
+
+모듈이 저장소 최상위에 평평하게 있으므로 (benchmarks와 같이) 루트를 import 경로에 넣고,
+공유 캐시 / SQLite 저장소 / 서킷 브레이커는 테스트마다 임시 디렉터리의 새 인스턴스로 바꿉니다.
+    python -m pytest -q
+"""
+
+import os
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Dataroma_buysell_craw
+import fetch_policy
+import response_cache
+import run_metrics
+import sqlite_store
+from benchmarks.fixture_server import synthetic_dataroma
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """저장소의 .cache / data 대신 tmp_path를 쓰고 작업 디렉터리도 그쪽으로"""
+    monkeypatch.chdir(tmp_path)
+    cache = response_cache.ResponseCache(str(tmp_path / "responses.sqlite"))
+    store = sqlite_store.WhaleStore(str(tmp_path / "whalebuzz.sqlite"))
+    monkeypatch.setattr(response_cache, "_shared_cache", cache)
+    monkeypatch.setattr(sqlite_store, "_shared_store", store)
+    monkeypatch.setattr(fetch_policy, "_shared_breaker", fetch_policy.CircuitBreaker())
+    monkeypatch.setattr(run_metrics, "_shared_metrics", run_metrics.RunMetrics("test", str(tmp_path)))
+    yield tmp_path
+    cache.close()
+    store.close()
+
+
+class SiteFetcher:
+    """
+    DataromaFetcher 대역: benchmarks/fixture_server의 합성 페이지를 돌려줌
+    requested: 요청한 URL 목록, interrupt: 이 문자열이 들어간 URL에서 KeyboardInterrupt (중단 흉내)
+    """
+    requested = []
+    interrupt = None
+
+    class lean:
+        @staticmethod
+        def summary():
+            return ""
+
+    def __init__(self, *args, **kwargs):
+        self.last_outcome = fetch_policy.SUCCESS
+        self.last_cached = True
+        self.stats = {"cache": 0, "http": 0, "browser": 0, "miss": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def get(self, url, **kwargs):
+        if self.interrupt and self.interrupt in url:
+            raise KeyboardInterrupt
+        SiteFetcher.requested.append(url)
+        parts = urlsplit(url)
+        html = synthetic_dataroma(parts.path, parse_qs(parts.query))
+        self.last_outcome = fetch_policy.SUCCESS if html else fetch_policy.EMPTY
+        return html
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """Dataroma_buysell_craw가 합성 Dataroma 페이지를 읽도록"""
+    monkeypatch.setattr(Dataroma_buysell_craw, "DataromaFetcher", SiteFetcher)
+    monkeypatch.setattr(SiteFetcher, "requested", [])
+    return SiteFetcher
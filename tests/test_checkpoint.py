@@ -0,0 +1,156 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+import Dataroma_buysell_craw as history
+from checkpoint import CheckpointManifest
+from fetch_policy import RetryQueue
+
+GURU = {"code": "BRK", "name": "Warren Buffett", "style": "Value"}
+
+
+def hist_frame(ticker, n=2):
+    return pd.DataFrame({
+        "Manager": GURU["name"], "Style": GURU["style"], "Ticker": ticker,
+        "Period": [f"2024 Q{q}" for q in range(1, n + 1)], "Shares": range(n),
+    })
+
+
+def test_recover_truncates_uncommitted_tail(tmp_path):
+    out = tmp_path / "out.csv"
+    manifest = CheckpointManifest(str(tmp_path / "out.jsonl"), str(out))
+    out.write_text("header\nrow1\n")
+    manifest.mark_done("BRK", "AAPL", rows=1)
+    with open(out, "a") as f:
+        f.write("row2-half")  # 기록 도중 중단
+
+    reloaded = CheckpointManifest(str(tmp_path / "out.jsonl"), str(out))
+    assert reloaded.is_done("BRK", "AAPL")
+    assert reloaded.recover() == len("row2-half")
+    assert out.read_text() == "header\nrow1\n"
+
+
+def test_recover_resets_when_output_shrank(tmp_path):
+    out = tmp_path / "out.csv"
+    manifest = CheckpointManifest(str(tmp_path / "out.jsonl"), str(out))
+    out.write_text("header\nrow1\n")
+    manifest.mark_done("BRK", "AAPL")
+    out.write_text("")  # 결과 파일을 지움 → 체크포인트도 무효
+
+    reloaded = CheckpointManifest(str(tmp_path / "out.jsonl"), str(out))
+    assert reloaded.recover() == 0
+    assert not reloaded.is_done("BRK", "AAPL")
+    assert reloaded.is_new
+
+
+def test_manifest_ignores_half_written_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    CheckpointManifest(str(path)).mark_done("BRK", "AAPL", rows=3)
+    with open(path, "a") as f:
+        f.write('{"key": ["BRK", "KO"')
+    reloaded = CheckpointManifest(str(path))
+    assert reloaded.done == {("BRK", "AAPL"): 3}
+
+
+def test_commit_ticker_writes_store_csv_and_checkpoint():
+    manifest = history.open_checkpoint()
+    assert history.commit_ticker(manifest, GURU, "AAPL", hist_frame("AAPL")) == 2
+    assert history.commit_ticker(manifest, GURU, "KO", None) == 0
+
+    saved = pd.read_csv(history.FILENAME, encoding="utf-8-sig")
+    assert list(saved["Ticker"]) == ["AAPL", "AAPL"]
+    assert manifest.is_done("BRK", "AAPL") and manifest.is_done("BRK", "KO")
+    assert manifest.committed_size == len(open(history.FILENAME, "rb").read())
+
+
+def test_failed_upsert_leaves_no_orphan_rows(monkeypatch):
+    manifest = history.open_checkpoint()
+    history.commit_ticker(manifest, GURU, "AAPL", hist_frame("AAPL"))
+    before = open(history.FILENAME, "rb").read()
+
+    class LockedStore:
+        def upsert_history(self, *args, **kwargs):
+            raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(history, "get_store", lambda: LockedStore())
+    with pytest.raises(RuntimeError):
+        history.commit_ticker(manifest, GURU, "KO", hist_frame("KO"))
+
+    assert open(history.FILENAME, "rb").read() == before
+    assert not manifest.is_done("BRK", "KO")
+
+
+def test_failed_csv_append_is_truncated(monkeypatch):
+    manifest = history.open_checkpoint()
+    history.commit_ticker(manifest, GURU, "AAPL", hist_frame("AAPL"))
+    before = open(history.FILENAME, "rb").read()
+
+    def half_write(self, path, **kwargs):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("Warren Buffett,Value,KO,2024 Q")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_csv", half_write)
+    with pytest.raises(OSError):
+        history.commit_ticker(manifest, GURU, "KO", hist_frame("KO"))
+
+    assert open(history.FILENAME, "rb").read() == before
+    assert not manifest.is_done("BRK", "KO")
+    # 다음 실행의 recover도 잘라낼 것이 없음
+    assert history.open_checkpoint().recover() == 0
+
+
+def test_manifest_scope(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    CheckpointManifest(path, scope="2025 Q2").mark_done("BRK", "AAPL")
+    assert CheckpointManifest(path, scope="2025 Q2").is_done("BRK", "AAPL")
+    later = CheckpointManifest(path, scope="2025 Q3")
+    assert not later.is_done("BRK", "AAPL") and later.done_in_scope() == 0
+
+
+def test_open_checkpoint_seeds_only_rows_of_the_quarter():
+    brk = history.TARGET_GURUS[0]
+    pd.DataFrame({
+        "Manager": brk["name"], "Style": brk["style"], "Ticker": ["AAPL", "KO"],
+        "Period": ["2025 Q2", "2025 Q1"], "Shares": [1, 2],
+    }).to_csv(history.FILENAME, index=False, encoding="utf-8-sig")
+
+    manifest = history.open_checkpoint("2025 Q2")
+    assert manifest.is_done(brk["code"], "AAPL")
+    assert not manifest.is_done(brk["code"], "KO")  # 2025 Q2 행이 없으면 다시 받음
+
+
+def test_new_quarter_recrawls_finished_gurus(site, monkeypatch):
+    gurus = history.TARGET_GURUS[:2]
+    history.scrape_and_save_incremental(gurus)
+    first = len(site.requested)
+    assert all(history.open_checkpoint().is_done(g["code"]) for g in gurus)
+
+    # 같은 분기: 구루가 모두 완료라 Activity 페이지도 열지 않음
+    site.requested.clear()
+    history.scrape_and_save_incremental(gurus)
+    assert site.requested == []
+
+    # 13F 제출 기한이 지나 새 분기가 공개되면 전부 다시
+    monkeypatch.setattr(history, "stock_period", lambda html, today=None: "2099 Q1")
+    site.requested.clear()
+    history.scrape_and_save_incremental(gurus)
+    assert len(site.requested) == first
+
+
+@pytest.mark.parametrize("tickers, done", [([], True), (None, False)])
+def test_async_guru_done_matches_sync_rule(monkeypatch, tickers, done):
+    # Activity 페이지를 읽었고 실패가 없으면 (종목이 0개여도) 완료, 못 읽었으면 미완료
+    async def activity(*args):
+        return tickers
+
+    monkeypatch.setattr(history, "collect_activity_tickers_async", activity)
+    manifest = history.open_checkpoint()
+
+    async def run():
+        return await history.scrape_guru_async(None, None, None, manifest, RetryQueue(),
+                                               asyncio.Semaphore(1), GURU, 0, 1)
+
+    assert asyncio.run(run()) is None
+    assert manifest.is_done(GURU["code"]) is done
@@ -0,0 +1,49 @@
+import pytest
+
+from config import DEFAULT_CONFIG, _merge, load_config, select_gurus, to_toml, write_config
+
+
+def test_merge_recurses_dicts_and_replaces_lists():
+    base = {"a": {"b": 1, "c": 2}, "d": [1, 2]}
+    merged = _merge(base, {"a": {"b": 3}, "d": [9], "e": 1})
+    assert merged == {"a": {"b": 3, "c": 2}, "d": [9], "e": 1}
+    assert base == {"a": {"b": 1, "c": 2}, "d": [1, 2]}
+
+
+def test_load_config_defaults_are_not_shared(tmp_path):
+    config = load_config(str(tmp_path / "missing.toml"))
+    assert config == DEFAULT_CONFIG
+    config["history"]["gurus"].clear()
+    assert DEFAULT_CONFIG["history"]["gurus"]
+
+
+def test_toml_round_trip(tmp_path):
+    config = load_config(str(tmp_path / "missing.toml"))
+    config["reddit"]["start_year"] = 2020
+    config["reddit"]["subreddits"] = ["stocks"]
+    path = write_config(config, str(tmp_path / "whalebuzz.toml"))
+    assert load_config(path) == config
+
+
+def test_partial_file_overrides_only_given_keys(tmp_path):
+    path = tmp_path / "whalebuzz.toml"
+    path.write_text('[history]\nconcurrency = 2\n\n[reddit]\ntickers = ["GME"]\n', encoding="utf-8")
+    config = load_config(str(path))
+    assert config["history"]["concurrency"] == 2
+    assert config["history"]["gurus"] == DEFAULT_CONFIG["history"]["gurus"]
+    assert config["reddit"]["tickers"] == ["GME"]
+
+
+def test_to_toml_quotes_strings():
+    text = to_toml({"x": {"name": 'say "hi"', "flag": True, "items": [{"code": "BRK"}]}})
+    assert 'name = "say \\"hi\\""' in text
+    assert "flag = true" in text
+    assert '    { code = "BRK" },' in text
+
+
+def test_select_gurus():
+    gurus = [{"code": "BRK"}, {"code": "psc"}]
+    assert select_gurus(gurus) == gurus
+    assert select_gurus(gurus, ["brk", "PSC"]) == gurus
+    with pytest.raises(ValueError):
+        select_gurus(gurus, ["nope"])
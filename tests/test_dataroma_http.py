@@ -0,0 +1,26 @@
+import dataroma_http
+from dataroma_http import SITE_ORIGIN, DataromaFetcher, resolve_url
+
+URL = "https://www.dataroma.com/m/holdings.php?m=BRK"
+BENCH_ORIGIN = "http://127.0.0.1:8765"
+
+
+def test_resolve_url_follows_origin(monkeypatch):
+    assert resolve_url(URL) == URL
+    monkeypatch.setattr(dataroma_http, "ORIGIN", BENCH_ORIGIN)
+    assert resolve_url(URL) == BENCH_ORIGIN + "/m/holdings.php?m=BRK"
+    assert resolve_url("https://example.com/x") == "https://example.com/x"
+
+
+def test_bench_origin_does_not_poison_site_cache(monkeypatch):
+    # WHALEBUZZ_CACHE 없이 대역 서버로 돌려도 같은 공유 캐시의 dataroma.com 항목은 그대로
+    monkeypatch.setattr(dataroma_http, "ORIGIN", BENCH_ORIGIN)
+    with DataromaFetcher() as bench:
+        bench.remember(URL, "<html>synthetic</html>", ttl=None)
+        assert bench.lookup(URL) == "<html>synthetic</html>"
+
+    monkeypatch.setattr(dataroma_http, "ORIGIN", SITE_ORIGIN)
+    with DataromaFetcher() as site:
+        assert site.lookup(URL) is None
+        site.remember(URL, "<html>real</html>")
+        assert site.lookup(URL) == "<html>real</html>"
@@ -0,0 +1,216 @@
+import asyncio
+
+import pytest
+
+import fetch_policy
+from fetch_policy import (BLOCKED, EMPTY, SUCCESS, TRANSIENT, CircuitBreaker, FetchResult, RetryPolicy,
+                          RetryQueue, backoff_delay, classify_status, host_of)
+from run_metrics import RunMetrics
+
+HOST = "www.dataroma.com"
+
+
+class Clock:
+    """time.monotonic 대신 (sleep하면 시간이 흐름)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fetch_policy.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_classify_status():
+    assert classify_status(200) == SUCCESS
+    assert classify_status(200, has_data=False) == EMPTY
+    assert classify_status(404) == EMPTY
+    assert classify_status(429) == BLOCKED and classify_status(403) == BLOCKED
+    assert classify_status(503) == TRANSIENT and classify_status(599) == TRANSIENT
+    assert host_of("https://WWW.Dataroma.com/m/hist.php?f=BRK") == HOST
+
+
+def test_backoff_delay_bounds():
+    for attempt in range(1, 10):
+        delay = backoff_delay(attempt, base=1.0, cap=8.0)
+        full = min(8.0, 2 ** (attempt - 1))
+        assert full / 2 <= delay <= full
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.min_samples):
+        breaker.record(HOST, BLOCKED)
+
+
+def test_breaker_opens_on_blocked_ratio(clock):
+    breaker = CircuitBreaker(min_samples=4, threshold=0.5, cooldown=30)
+    breaker.record(HOST, SUCCESS)
+    breaker.record(HOST, TRANSIENT)  # 비율에 넣지 않음
+    breaker.record(HOST, BLOCKED)
+    assert breaker.wait_time(HOST) == 0
+    breaker.record(HOST, BLOCKED)
+    breaker.record(HOST, BLOCKED)  # 3/4
+    assert breaker.is_open(HOST)
+    assert breaker.wait_time(HOST) == pytest.approx(30)
+    assert breaker.opened == 1
+
+
+def test_half_open_lets_exactly_one_trial_through(clock):
+    breaker = CircuitBreaker(min_samples=2, cooldown=30, trial_wait=1.0)
+    open_breaker(breaker)
+    clock.now += 30
+
+    assert breaker.wait_time(HOST) == 0          # 시험 요청
+    for _ in range(5):
+        assert breaker.wait_time(HOST) == 1.0    # 결과가 올 때까지 나머지는 대기
+    breaker.record(HOST, SUCCESS)
+    assert breaker.wait_time(HOST) == 0
+    assert breaker.wait_time(HOST) == 0          # 닫힘
+
+
+def test_failed_trial_doubles_cooldown(clock):
+    breaker = CircuitBreaker(min_samples=2, cooldown=30)
+    open_breaker(breaker)
+    clock.now += 30
+    assert breaker.wait_time(HOST) == 0
+    breaker.record(HOST, BLOCKED)
+    assert breaker.wait_time(HOST) == pytest.approx(60)
+    clock.now += 60
+    assert breaker.wait_time(HOST) == 0
+    breaker.record(HOST, SUCCESS)
+    # 성공하면 cooldown도 원래대로
+    open_breaker(breaker)
+    assert breaker.wait_time(HOST) == pytest.approx(30)
+
+
+def test_transient_trial_keeps_circuit_half_open(clock):
+    breaker = CircuitBreaker(min_samples=2, cooldown=30, trial_wait=1.0)
+    open_breaker(breaker)
+    clock.now += 30
+
+    for _ in range(3):
+        # 타임아웃/5xx는 판단 보류 → 다시 시험 요청 하나만 통과
+        assert breaker.wait_time(HOST) == 0
+        assert breaker.wait_time(HOST) == 1.0
+        breaker.record(HOST, TRANSIENT)
+    assert breaker.wait_time(HOST) == 0
+    breaker.record(HOST, BLOCKED)
+    assert breaker.wait_time(HOST) == pytest.approx(60)
+
+    clock.now += 60
+    assert breaker.wait_time(HOST) == 0
+    breaker.record(HOST, TRANSIENT)
+    assert breaker.wait_time(HOST) == 0
+    breaker.record(HOST, EMPTY)
+    assert breaker.wait_time(HOST) == 0
+    assert breaker.wait_time(HOST) == 0          # 닫힘
+
+
+def test_lost_trial_is_replaced_after_timeout(clock):
+    breaker = CircuitBreaker(min_samples=2, cooldown=30, trial_timeout=60)
+    open_breaker(breaker)
+    clock.now += 30
+    assert breaker.wait_time(HOST) == 0   # 이 시험 요청의 결과는 기록되지 않음
+    clock.now += 59
+    assert breaker.wait_time(HOST) > 0
+    clock.now += 1
+    assert breaker.wait_time(HOST) == 0
+
+
+def test_retry_after_pauses_whole_host(clock):
+    breaker = CircuitBreaker()
+    breaker.record(HOST, BLOCKED, retry_after=12)
+    assert breaker.wait_time(HOST) == pytest.approx(12)
+    assert breaker.wait_time("other.host") == 0
+
+
+def make_policy(clock, monkeypatch, **kwargs):
+    metrics = RunMetrics("test")
+    monkeypatch.setattr(fetch_policy.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr("run_metrics.time.sleep", clock.sleep)
+    return RetryPolicy(breaker=CircuitBreaker(), metrics=metrics, **kwargs), metrics
+
+
+def test_retry_policy_retries_only_retryable(clock, monkeypatch):
+    policy, metrics = make_policy(clock, monkeypatch, max_attempts=3)
+    outcomes = iter([FetchResult(TRANSIENT), ValueError("boom"), FetchResult(SUCCESS, "ok")])
+
+    def attempt(n):
+        result = next(outcomes)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert policy.run(attempt, HOST) == FetchResult(SUCCESS, "ok")
+    assert metrics.events["retry_transient"] == 2
+
+    calls = []
+    assert policy.run(lambda n: calls.append(n) or FetchResult(EMPTY), HOST).outcome == EMPTY
+    assert calls == [1]
+
+
+def test_retry_policy_gives_up_with_last_result(clock, monkeypatch):
+    policy, metrics = make_policy(clock, monkeypatch, max_attempts=2)
+    result = policy.run(lambda n: FetchResult(BLOCKED, status=429), HOST)
+    assert result.outcome == BLOCKED
+    assert metrics.events["gave_up_blocked"] == 1
+
+
+def test_retry_policy_waits_out_open_circuit(clock, monkeypatch):
+    policy, metrics = make_policy(clock, monkeypatch)
+    open_breaker(policy.breaker)
+    start = clock.now
+    assert policy.run(lambda n: FetchResult(SUCCESS), HOST).outcome == SUCCESS
+    assert clock.now - start == pytest.approx(policy.breaker.cooldown)
+
+
+def test_async_callers_send_one_trial_when_half_open(clock, monkeypatch):
+    """서킷이 닫히기 전까지 동시에 기다리던 호출자 중 하나만 요청"""
+    breaker = CircuitBreaker(min_samples=2, cooldown=30, trial_wait=1.0)
+    policy = RetryPolicy(breaker=breaker, metrics=RunMetrics("test"), base_delay=0)
+    open_breaker(breaker)
+    clock.now += 30
+    trial_done = False
+    started_during_trial = 0
+
+    async def attempt(n):
+        nonlocal trial_done, started_during_trial
+        if not trial_done:
+            started_during_trial += 1
+        await asyncio.sleep(5)  # 시험 요청이 걸리는 동안 다른 호출자들이 wait_time을 다시 물어봄
+        trial_done = True
+        return FetchResult(SUCCESS)
+
+    async def sleep(seconds, _real=asyncio.sleep):
+        clock.now += seconds
+        await _real(0)
+
+    monkeypatch.setattr(fetch_policy.asyncio, "sleep", sleep)
+
+    async def main():
+        # 첫 호출자가 시험 요청을 보내는 동안 나머지는 대기
+        return await asyncio.gather(*(policy.run_async(attempt, HOST) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert all(r.outcome == SUCCESS for r in results)
+    assert started_during_trial == 1
+
+
+def test_retry_queue():
+    queue = RetryQueue()
+    queue.add(("BRK", "AAPL"), TRANSIENT)
+    queue.add(("BRK", "KO"), BLOCKED)
+    queue.add(("BRK", "MSFT"), BLOCKED)
+    assert len(queue) == 3
+    assert queue.summary() == "blocked 2개, transient 1개"
+    assert queue.drain() == [("BRK", "AAPL"), ("BRK", "KO"), ("BRK", "MSFT")]
+    assert len(queue) == 0 and queue.summary() == ""
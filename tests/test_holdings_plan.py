@@ -0,0 +1,104 @@
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+import DataRoma_craw_hold as holdings
+import response_cache
+from benchmarks.fixture_server import TICKERS, holdings_page
+from fetch_policy import EMPTY, SUCCESS, RetryQueue
+from position_delta import compute_position_deltas
+from run_metrics import get_metrics
+from table_clean import normalize_table
+
+GURU = {"code": "BRK", "name": "Warren Buffett", "style": "Value"}
+# fetch_snapshot은 현재 시각 기준으로 마감 여부를 판단하므로 오늘 기준 분기 사용
+CLOSED = "2024-12-31"
+OPEN = pd.Period(date.today(), freq="Q").end_time.date().isoformat()
+
+
+class EmptyFetcher:
+    """항상 '데이터 없음'을 돌려주는 fetcher (딜레이 없이 캐시 적중처럼 동작)"""
+    last_outcome = EMPTY
+    last_cached = True
+
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return None
+
+
+def existing(*periods):
+    return pd.DataFrame({"Manager": GURU["name"], "Report_Date": list(periods)})
+
+
+def test_plan_skips_stored_closed_quarters_but_rechecks_open_ones():
+    plan = holdings.plan_fetches(existing(CLOSED, OPEN), [GURU], [CLOSED, OPEN])
+    assert plan == [(GURU, OPEN)]
+
+
+def test_empty_closed_quarter_is_not_refetched():
+    fetcher = EmptyFetcher()
+    for period in (CLOSED, OPEN):
+        assert holdings.fetch_snapshot(fetcher, GURU, period, get_metrics(), RetryQueue()) is None
+    assert len(fetcher.urls) == 2
+
+    # 마감된 분기만 표시가 남음 (마감 전 분기는 늦게 제출될 수 있으므로 다시 확인)
+    assert holdings.is_marked_empty(GURU, CLOSED)
+    assert not holdings.is_marked_empty(GURU, OPEN)
+    assert holdings.plan_fetches(None, [GURU], [CLOSED, OPEN]) == [(GURU, OPEN)]
+
+
+def test_empty_marks_survive_cache_reset(tmp_path, monkeypatch):
+    holdings.mark_empty(GURU, CLOSED)
+    # 응답 캐시를 비우거나 (LRU 삭제, 캐시 파일 삭제) 바꿔도 표시는 결과 파일 옆에 남음
+    monkeypatch.setattr(response_cache, "_shared_cache",
+                        response_cache.ResponseCache(str(tmp_path / "fresh.sqlite")))
+    assert (tmp_path / holdings.EMPTY_FILE).exists()
+    assert holdings.is_marked_empty(GURU, CLOSED)
+    assert holdings.plan_fetches(None, [GURU], [CLOSED]) == []
+
+
+def test_full_rescrape_ignores_empty_marks():
+    holdings.mark_empty(GURU, CLOSED)
+    plan = holdings.plan_fetches(None, [GURU], [CLOSED], skip_empty=False)
+    assert plan == [(GURU, CLOSED)]
+
+
+class FixtureFetcher:
+    """benchmarks/fixture_server의 합성 holdings.php (실제 #grid와 같은 컬럼 순서)"""
+    last_outcome = SUCCESS
+    last_cached = True
+
+    def get(self, url, **kwargs):
+        params = parse_qs(urlsplit(url).query)
+        return holdings_page(params["m"][0], params["p"][0])
+
+
+def crawl(*periods):
+    frames = [holdings.fetch_snapshot(FixtureFetcher(), GURU, p, get_metrics(), RetryQueue()) for p in periods]
+    df, report = normalize_table(pd.concat(frames, ignore_index=True),
+                                 numeric_columns=["Weight_Pct", "Shares", "Price", "Value"],
+                                 integer_columns=["Shares"])
+    return df, report
+
+
+def test_fetch_snapshot_maps_grid_columns_by_header():
+    df, report = crawl(CLOSED)
+    assert not any(report.values())  # 숫자 변환 실패 없음
+    assert list(df.columns) == ["Manager", "Style", "Report_Date"] + holdings.HOLDINGS_COLUMNS
+    # 티커는 stock.php?sym= 링크에서, 종목명은 ' - ' 뒤
+    assert df["Ticker"].isin(TICKERS).all()
+    assert (df["Stock_Name"] == df["Ticker"] + " Corp.").all()
+    assert df["Shares"].notna().all() and (df["Shares"] >= 1_000).all()
+    # Price는 Reported Price (주식 수가 아님)
+    assert (df["Price"] <= 900).all()
+
+
+def test_crawled_snapshots_feed_position_deltas():
+    df, _ = crawl("2024-09-30", CLOSED)
+    events = compute_position_deltas(df)
+    assert not events.empty
+    assert set(events["Ticker"]) <= set(TICKERS)
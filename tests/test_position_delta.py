@@ -0,0 +1,65 @@
+import warnings
+
+import pandas as pd
+
+from position_delta import ADD, EVENT_COLUMNS, EXIT, HOLD, NEW, REDUCE, compute_position_deltas, summarize_events
+
+
+def snapshots():
+    rows = [
+        # A: 3개 분기
+        ("A", "AAPL", "2024-03-31", 10, 5.0), ("A", "KO", "2024-03-31", 5, 2.0), ("A", "MSFT", "2024-03-31", 3, 1.0),
+        ("A", "AAPL", "2024-06-30", 15, 6.0), ("A", "KO", "2024-06-30", 5, 2.0), ("A", "MSFT", "2024-06-30", 1, 0.5),
+        ("A", "NVDA", "2024-06-30", 7, 3.0),
+        ("A", "AAPL", "2024-09-30", 15, 6.0),
+        # B: 분기를 건너뛰어 보고해도 자기 직전 스냅샷과 비교
+        ("B", "AAPL", "2024-03-31", 1, 1.0), ("B", "AAPL", "2024-09-30", 2, 1.0),
+    ]
+    return pd.DataFrame(rows, columns=["Manager", "Ticker", "Report_Date", "Shares", "Weight_Pct"])
+
+
+def actions(events):
+    return {(m, t, d): a for m, t, d, a in events[["Manager", "Ticker", "Report_Date", "Action"]].itertuples(index=False)}
+
+
+def test_events_between_consecutive_snapshots():
+    events = compute_position_deltas(snapshots())
+    assert list(events.columns) == EVENT_COLUMNS
+    assert actions(events) == {
+        ("A", "AAPL", "2024-06-30"): ADD,
+        ("A", "MSFT", "2024-06-30"): REDUCE,
+        ("A", "NVDA", "2024-06-30"): NEW,
+        ("A", "KO", "2024-09-30"): EXIT,
+        ("A", "MSFT", "2024-09-30"): EXIT,
+        ("A", "NVDA", "2024-09-30"): EXIT,
+        ("B", "AAPL", "2024-09-30"): ADD,
+    }
+    ko = events[(events["Ticker"] == "KO")].iloc[0]
+    assert ko["Prev_Date"] == "2024-06-30" and ko["Shares"] == 0 and ko["Share_Change"] == -5
+    nvda = events[(events["Ticker"] == "NVDA") & (events["Action"] == NEW)].iloc[0]
+    assert pd.isna(nvda["Share_Change_Pct"]) and nvda["Weight_Change"] == 3.0
+    b = events[events["Manager"] == "B"].iloc[0]
+    assert b["Prev_Date"] == "2024-03-31" and b["Share_Change_Pct"] == 100.0
+
+
+def test_include_unchanged_and_duplicate_rows():
+    holdings = snapshots()
+    # 같은 스냅샷에 같은 티커가 두 줄이면 합산
+    holdings = pd.concat([holdings, holdings.iloc[[7]]], ignore_index=True)
+    events = compute_position_deltas(holdings, include_unchanged=True)
+    found = actions(events)
+    assert found[("A", "KO", "2024-06-30")] == HOLD
+    assert found[("A", "AAPL", "2024-09-30")] == ADD  # 15 → 30
+
+
+def test_empty_and_single_snapshot():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        assert compute_position_deltas(snapshots().iloc[:0]).empty
+        assert compute_position_deltas(snapshots().iloc[:3]).empty  # 비교할 직전 스냅샷 없음
+        compute_position_deltas(snapshots())
+
+
+def test_summarize_events():
+    summary = summarize_events(compute_position_deltas(snapshots()))
+    assert summary.loc["A", EXIT] == 3 and summary.loc["B", ADD] == 1
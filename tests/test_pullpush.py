@@ -0,0 +1,58 @@
+import pytest
+
+from raddit_craw_pullpush import MAX_SHARDS, PAGE_SIZE, SHARD_PAGES, RedditTickerCrawler
+
+
+@pytest.fixture
+def crawler():
+    return RedditTickerCrawler(use_cache=False)
+
+
+def test_quarter_timestamps_cover_quarter(crawler):
+    start, end = crawler.get_quarter_timestamps(2024, 4)
+    next_start, _ = crawler.get_quarter_timestamps(2025, 1)
+    assert end + 1 == next_start
+    q1_start, q1_end = crawler.get_quarter_timestamps(2024, 1)
+    assert q1_end + 1 == crawler.get_quarter_timestamps(2024, 2)[0]
+
+
+def test_plan_shards_cover_remaining_window(crawler):
+    start, end = 0, 90 * 86400
+    oldest = end - 86400  # 첫 페이지 (100개)가 하루치 → 고밀도
+    shards = crawler._plan_shards(start, oldest, end, PAGE_SIZE)
+
+    assert len(shards) == MAX_SHARDS
+    # 최신 구간부터, 서로 맞닿고 (after는 1초 앞, 경계 배타) 전체 [start, oldest]를 덮음
+    assert shards[0][1] == oldest + 1 and shards[-1][0] == start - 1
+    for (after, _), (_, before) in zip(shards, shards[1:]):
+        assert before == after + 1
+
+
+def test_plan_shards_low_density_single_shard(crawler):
+    end = 90 * 86400
+    oldest = 0 + 10  # 한 페이지가 분기 거의 전체 → 남은 구간이 짧음
+    shards = crawler._plan_shards(0, oldest, end, 20)
+    assert shards == [(-1, 11)]
+
+    # 남은 구간이 없으면 샤드 없음
+    assert crawler._plan_shards(100, 50, end, PAGE_SIZE) == []
+
+
+def test_plan_shards_size_follows_density(crawler):
+    day = 86400
+    end = 90 * day
+    # 하루에 PAGE_SIZE개 → 샤드 하나가 약 SHARD_PAGES일
+    shards = crawler._plan_shards(end - 20 * day, end - day, end, PAGE_SIZE)
+    spans = [before - after for after, before in shards]
+    assert len(shards) == 4
+    assert all(abs(span - SHARD_PAGES * day) < day for span in spans)
+
+
+
+def test_crawl_all_quarters_with_no_matches(crawler, monkeypatch):
+    monkeypatch.setattr(crawler, "iter_quarter_results", lambda *args, **kwargs: iter([]))
+    posts, mentions = crawler.crawl_all_quarters(2024, 2024, {"AAPL"})
+    assert posts.empty and mentions.empty
+
+    wide = crawler.crawl_all_quarters(2024, 2024, {"AAPL"}, normalized=False)
+    assert wide.empty and "ticker" in wide.columns
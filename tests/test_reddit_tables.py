@@ -0,0 +1,97 @@
+import pandas as pd
+
+from raddit_craw_pullpush import RedditTickerCrawler
+from reddit_tables import POST_COLUMNS, WIDE_COLUMNS, post_key, split_records, split_wide, to_wide
+
+
+def record(reddit_id, tickers, **extra):
+    row = {
+        'post_id': post_key(reddit_id), 'id': reddit_id, 'source': 'reddit',
+        'subreddit': 'stocks', 'tickers': tickers, 'title': f"post {reddit_id}",
+        'score': 10, 'num_comments': 2, 'created_utc': 1710892800,
+        'year': 2024, 'quarter': 1, 'permalink': f"https://reddit.com/r/stocks/{reddit_id}",
+    }
+    row.update(extra)
+    return row
+
+
+def test_post_key_uses_base36_id_or_permalink_hash():
+    assert post_key('abc') == int('abc', 36)
+    assert post_key(None, '/r/x/1') == post_key('', '/r/x/1')
+    assert post_key(None, '/r/x/1') != post_key(None, '/r/x/2')
+    # 해시 키는 64비트 (int64 안)이고 실제 id 키와 겹치지 않는 음수
+    keys = [post_key(None, f'/r/x/{i}') for i in range(1000)]
+    assert all(-2 ** 63 <= key < 0 for key in keys)
+    assert any(key < -2 ** 32 for key in keys)
+
+
+def test_split_records_one_row_per_post_and_mention():
+    posts, mentions = split_records([record('a1', ['AAPL', 'TSLA']), record('a2', ['AAPL'])])
+
+    assert len(posts) == 2 and 'tickers' not in posts.columns
+    assert len(mentions) == 3
+    assert mentions['ticker'].dtype == 'category'
+    assert sorted(mentions.loc[mentions['post_id'] == post_key('a1'), 'ticker']) == ['AAPL', 'TSLA']
+
+
+def test_to_wide_restores_one_row_per_ticker():
+    posts, mentions = split_records([record('a1', ['AAPL', 'TSLA'], score=5)])
+    wide = to_wide(posts, mentions)
+
+    assert list(wide.columns) == [c for c in WIDE_COLUMNS if c in wide.columns]
+    assert (wide['id'] == 'a1').all() and (wide['post_id'] == post_key('a1')).all()
+    assert sorted(wide['ticker']) == ['AAPL', 'TSLA']
+    assert (wide['score'] == 5).all()
+
+    summary = to_wide(posts, mentions, ['ticker', 'score'])
+    assert list(summary.columns) == ['ticker', 'score']
+
+
+def test_split_wide_round_trip():
+    posts, mentions = split_records([record('a1', ['AAPL', 'TSLA']), record('a2', ['NVDA'])])
+    wide = to_wide(posts, mentions)
+    posts2, mentions2 = split_wide(wide)
+
+    assert len(posts2) == 2
+    assert len(mentions2) == 3
+    # wide에 남은 Reddit id를 그대로 씀 (permalink 해시로 바꾸지 않음)
+    assert sorted(posts2['id']) == ['a1', 'a2']
+    assert set(posts2['post_id']) == {post_key('a1'), post_key('a2')}
+
+
+def test_empty_crawl_returns_typed_empty_frames():
+    posts, mentions = split_records([])
+
+    assert list(posts.columns) == POST_COLUMNS
+    assert mentions.empty and 'ticker' in mentions.columns
+    wide = to_wide(posts, mentions)
+    assert wide.empty
+    assert list(wide.columns) == WIDE_COLUMNS
+    assert list(to_wide(posts, mentions, ['ticker', 'score']).columns) == ['ticker', 'score']
+
+
+def test_to_wide_with_no_mentions_but_posts():
+    posts, _ = split_records([record('a1', ['AAPL'])])
+    empty = pd.DataFrame(columns=['post_id', 'ticker', 'subreddit', 'year', 'quarter'])
+    assert to_wide(posts, empty).empty
+
+
+def test_save_data_keeps_reddit_ids(tmp_path, capsys):
+    crawler = RedditTickerCrawler(use_cache=False)
+    full = {c: None for c in POST_COLUMNS if c not in record('a0', [])}
+    data = split_records([record('a1', ['AAPL', 'TSLA'], **full), record('a2', ['NVDA'], **full)])
+    base = str(tmp_path / 'reddit')
+
+    crawler.save_data(data, base, formats=('csv', 'parquet'), parquet_root=str(tmp_path))
+    posts = pd.read_csv(f"{base}_posts.csv")
+    assert sorted(posts['id']) == ['a1', 'a2']
+    assert set(posts['post_id']) == {post_key('a1'), post_key('a2')}
+
+    crawler.save_data(data, base, formats=('csv', 'parquet'), parquet_root=str(tmp_path), normalized=False)
+    wide = pd.read_csv(f"{base}.csv")
+    assert list(wide.columns[:2]) == ['post_id', 'id']
+    assert wide.groupby('id')['ticker'].apply(sorted).to_dict() == {'a1': ['AAPL', 'TSLA'], 'a2': ['NVDA']}
+    assert (tmp_path / 'reddit').is_dir()
+
+    crawler.save_data(split_records([]), base)
+    assert '저장할 데이터가 없습니다' in capsys.readouterr().out
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from Dataroma_buysell_craw import stock_period
+from sqlite_store import latest_report_date, period_to_date
+from whalewisedom_craw import rows_report_date, shift_report_date
+
+
+def test_latest_report_date_waits_for_filing_deadline():
+    # Q3 2026이 끝났어도 제출 기한 (45일) 전에는 Q2가 최신
+    assert latest_report_date("2026-10-17") == "2026-06-30"
+    assert latest_report_date("2026-11-14") == "2026-06-30"
+    assert latest_report_date("2026-11-15") == "2026-09-30"
+    assert latest_report_date("2026-10-17", grace_days=0) == "2026-09-30"
+
+
+def test_period_to_date_both_orders():
+    dates = period_to_date(["2024 Q4", "Q1 2025", "n/a"])
+    assert dates.tolist()[:2] == ["2024-12-31", "2025-03-31"]
+    assert pd.isna(dates.iloc[2])
+
+
+def test_stock_period_prefers_page_then_filing_aware_fallback():
+    assert stock_period("<h1>Holders as of Q3 2025</h1>") == "2025 Q3"
+    assert stock_period(None, today="2026-10-17") == "2026 Q2"
+
+
+def test_rows_report_date_from_data():
+    assert rows_report_date([{"symbol": "A", "quarter": "Q2 2026"}]) == "2026-06-30"
+    assert rows_report_date([{"symbol": "A", "period_of_report": "2026-06-30T00:00:00"}]) == "2026-06-30"
+    # 분기 id 숫자나 분기 정보가 없으면 추정하지 않음
+    assert rows_report_date([{"symbol": "A", "quarter": 94}]) is None
+    assert rows_report_date([]) is None
+
+
+def test_shift_report_date():
+    assert shift_report_date("2026-06-30", 0) == "2026-06-30"
+    assert shift_report_date("2026-06-30", 3) == "2025-09-30"
@@ -0,0 +1,141 @@
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import DataRoma_craw_hold as hold
+import signal_panel as sp
+from benchmarks.fixture_server import holdings_page
+from config import DEFAULT_CONFIG
+from fetch_policy import SUCCESS, RetryQueue
+from run_metrics import get_metrics
+from table_clean import normalize_table
+
+
+def ts(day):
+    return int(pd.Timestamp(day).timestamp())
+
+
+@pytest.fixture
+def holdings():
+    return pd.DataFrame({
+        "Manager": ["A", "A", "A", "B", "B"],
+        "Ticker": ["BRK.B", "AAPL", "BRK.B", "AAPL", "AAPL"],
+        "Report_Date": ["2024-03-31", "2024-03-31", "2024-06-30", "2024-03-31", "2024-06-30"],
+        "Shares": [10, 5, 12, 3, 3],
+        "Weight_Pct": [1, 2, 3, 4, 5],
+        "Value": [1, 1, 1, 1, 1],
+    })
+
+
+@pytest.fixture
+def mentions():
+    return pd.DataFrame({
+        "ticker": ["$BRK", "BRK.B", "AAPL", "AAPL", "AAPL"],
+        "created_utc": [ts("2024-03-20"), ts("2024-05-01"), ts("2024-02-01"), ts("2024-06-25"), ts("2024-08-01")],
+        "score": [10, 20, 1, 2, 3],
+        "num_comments": [1, 1, 1, 1, 1],
+    })
+
+
+def test_normalize_tickers():
+    raw = pd.Series(["brk.b", "BRK-B", "$brk.b", " BRK/B ", None, "$", "GOOGL"])
+    assert sp.normalize_tickers(raw).tolist() == ["BRK-B", "BRK-B", "BRK-B", "BRK-B", pd.NA, pd.NA, "GOOGL"]
+    assert sp.normalize_tickers(pd.Series(["$BRK"]), {"BRK": "BRK-B"}).tolist() == ["BRK-B"]
+
+
+def test_class_share_aliases_only_for_single_class():
+    aliases = sp.class_share_aliases(["BRK-B", "GOOG", "GOOGL", "BF-A", "BF-B", "AAPL"])
+    assert aliases == {"BRK": "BRK-B"}
+    assert sp.class_share_aliases(["BRK", "BRK-B"]) == {}
+
+
+def test_bucket_mentions_sums_across_chunks(mentions):
+    one = sp.bucket_mentions(mentions)
+    chunked = sp.bucket_mentions([mentions.iloc[:3], mentions.iloc[3:], mentions.iloc[:0]])
+    pd.testing.assert_frame_equal(one, chunked)
+    assert one["Mentions"].sum() == len(mentions)
+    assert sp.bucket_mentions([]).empty
+
+
+def test_build_panel_values(holdings, mentions):
+    panel = sp.build_panel(holdings, [mentions.iloc[:2], mentions.iloc[2:]])
+    assert list(panel.columns) == sp.PANEL_COLUMNS
+    assert len(panel) == 6  # A가 2분기에 AAPL 청산 → exit 행
+    row = panel.set_index(["Ticker", "Report_Date", "Manager"])
+
+    exit_row = row.loc[("AAPL", "2024-06-30", "A")]
+    assert exit_row["Action"] == "exit" and exit_row["Shares"] == 0
+    assert row.loc[("AAPL", "2024-03-31", "A"), "Holders"] == 2
+    assert row.loc[("AAPL", "2024-06-30", "B"), "Holders"] == 1
+
+    # $BRK는 추적 중인 유일한 클래스 BRK-B로
+    brk = row.loc[("BRK-B", "2024-03-31", "A")]
+    assert brk["Mentions"] == 1 and brk["Score"] == 10
+    assert brk["Mentions_Trailing"] == 1      # 3/20 언급은 분기말 28일 안
+    assert brk["Next_Mentions"] == 1
+    # BRK-B는 1, 1, 0 (8월 언급 분기까지 격자에 포함) → z = (1 - 2/3) / std
+    assert brk["Mention_Z"] == pytest.approx((1 - 2 / 3) / np.std([1, 1, 0], ddof=1))
+    assert row.loc[("BRK-B", "2024-06-30", "A"), "Next_Mentions"] == 0
+
+    aapl = row.loc[("AAPL", "2024-03-31", "B")]
+    assert aapl["Mentions_Trailing"] == 0     # 2/1 언급은 창 밖
+    assert aapl["Mention_Share"] == 0.5
+    assert np.isnan(aapl["Mention_Z"])        # 분기마다 1번 → 표준편차 0
+
+
+def test_build_panel_without_mentions(holdings):
+    panel = sp.build_panel(holdings)
+    assert (panel["Mentions"] == 0).all()
+    assert panel["Next_Mentions"].isna().all()  # 언급 데이터가 없으면 다음 분기도 모름
+    assert sp.summarize_panel(panel).empty
+
+
+def test_build_panel_empty_inputs(mentions):
+    empty = pd.DataFrame(columns=["Manager", "Ticker", "Report_Date", "Shares", "Weight_Pct", "Value"])
+    for frames in (None, mentions):
+        panel = sp.build_panel(empty, frames)
+        assert panel.empty and list(panel.columns) == sp.PANEL_COLUMNS
+
+
+def test_summarize_panel(holdings, mentions):
+    summary = sp.summarize_panel(sp.build_panel(holdings, mentions), top=1)
+    assert summary.groupby("Report_Date").size().max() == 1
+
+
+class FixtureFetcher:
+    """benchmarks/fixture_server의 합성 holdings.php"""
+    last_outcome = SUCCESS
+    last_cached = True
+
+    def get(self, url, **kwargs):
+        params = parse_qs(urlsplit(url).query)
+        return holdings_page(params["m"][0], params["p"][0])
+
+
+def test_build_panel_from_crawled_holdings(tmp_path):
+    # DataRoma_craw_hold 결과 CSV와 같은 모양 (whalebuzz panel 기본 입력)
+    gurus = DEFAULT_CONFIG["holdings"]["gurus"][:3]
+    frames = [hold.fetch_snapshot(FixtureFetcher(), g, p, get_metrics(), RetryQueue())
+              for g in gurus for p in ("2024-09-30", "2024-12-31")]
+    crawled, _ = normalize_table(pd.concat(frames, ignore_index=True),
+                                 numeric_columns=["Weight_Pct", "Shares", "Price", "Value"],
+                                 integer_columns=["Shares"])
+    crawled.to_csv(tmp_path / "holdings.csv", index=False, encoding="utf-8-sig")
+    holdings = pd.read_csv(tmp_path / "holdings.csv", encoding="utf-8-sig")
+
+    latest = holdings[holdings["Report_Date"] == "2024-12-31"]
+    tickers = latest["Ticker"].value_counts().index[:2].tolist()
+    mentions = pd.DataFrame({
+        "ticker": [f"${t}" for t in tickers] * 2,
+        "created_utc": [ts("2024-12-20")] * len(tickers) * 2,
+        "score": 1, "num_comments": 0,
+    })
+
+    panel = sp.build_panel(holdings, mentions)
+    joined = panel[(panel["Report_Date"] == "2024-12-31") & (panel["Mentions"] > 0)]
+    assert set(joined["Ticker"]) == set(tickers)
+    # 보유한 매니저마다 같은 언급 수가 붙음
+    assert len(joined) == latest["Ticker"].isin(tickers).sum()
+    assert (joined["Mentions"] == 2).all()
@@ -0,0 +1,107 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+import DataRoma_craw_hold as hold
+from benchmarks.fixture_server import holdings_page
+from fetch_policy import SUCCESS, RetryQueue
+from run_metrics import get_metrics
+from sqlite_store import WhaleStore
+from table_clean import normalize_table
+
+GURU = {"code": "BRK", "name": "Warren Buffett", "style": "Value"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with WhaleStore(str(tmp_path / "store.sqlite")) as store:
+        yield store
+
+
+def snapshot(manager, report_date, shares):
+    return pd.DataFrame({
+        "Manager": manager, "Style": "Value", "Report_Date": report_date,
+        "Stock_Name": [f"{t} Inc." for t in shares], "Ticker": list(shares),
+        "Weight_Pct": 1.0, "Shares": list(shares.values()), "Price": 10.0, "Value": 100.0,
+    })
+
+
+class FixtureFetcher:
+    """benchmarks/fixture_server의 합성 holdings.php"""
+    last_outcome = SUCCESS
+    last_cached = True
+
+    def get(self, url, **kwargs):
+        params = parse_qs(urlsplit(url).query)
+        return holdings_page(params["m"][0], params["p"][0])
+
+
+def test_crawled_holdings_answer_holders(store):
+    raw = hold.fetch_snapshot(FixtureFetcher(), GURU, "2024-12-31", get_metrics(), RetryQueue())
+    df, _ = normalize_table(raw, numeric_columns=["Weight_Pct", "Shares", "Price", "Value"],
+                            integer_columns=["Shares"])
+    assert store.upsert_holdings(df) == len(df)
+
+    ticker = df["Ticker"].iloc[0]
+    holders = store.holders(ticker)
+    assert holders[["manager", "report_date"]].values.tolist() == [["Warren Buffett", "2024-12-31"]]
+    assert holders["shares"].iloc[0] == df["Shares"].iloc[0]
+    row = store.portfolio("Warren Buffett").set_index("ticker").loc[ticker]
+    assert row["price"] == df["Price"].iloc[0] and row["stock_name"] == df["Stock_Name"].iloc[0]
+
+
+def test_upsert_holdings_is_idempotent(store):
+    df = snapshot("A", "2024-12-31", {"AAPL": 10, "KO": 5})
+    store.upsert_holdings(df)
+    store.upsert_holdings(df)
+    assert store.stats()["holdings"] == 2
+
+    # 같은 키는 값만 갱신
+    store.upsert_holdings(snapshot("A", "2024-12-31", {"AAPL": 12, "KO": 5}))
+    assert store.stats()["holdings"] == 2
+    assert store.holders("aapl")["shares"].tolist() == [12]
+
+
+def test_upsert_holdings_replaces_snapshot(store):
+    store.upsert_holdings(snapshot("A", "2024-09-30", {"AAPL": 10, "KO": 5}))
+    store.upsert_holdings(snapshot("A", "2024-12-31", {"AAPL": 10, "KO": 5}))
+    store.upsert_holdings(snapshot("B", "2024-12-31", {"KO": 7}))
+    store.upsert_holdings(snapshot("A", "2024-12-31", {"KO": 7}), source="whalewisdom")
+
+    # A의 2024-12-31 Dataroma 스냅샷에서 KO 청산 → 그 스냅샷에서만 빠짐
+    store.upsert_holdings(snapshot("A", "2024-12-31", {"AAPL": 11}))
+    ko = store.holders("KO")
+    assert ko[["source", "manager", "report_date"]].values.tolist() == [
+        ["dataroma", "A", "2024-09-30"],
+        ["whalewisdom", "A", "2024-12-31"],
+        ["dataroma", "B", "2024-12-31"],
+    ]
+    assert store.portfolio("A", source="dataroma")["ticker"].tolist() == ["AAPL"]
+
+
+def test_upsert_history_replace_modes(store):
+    def hist(periods, ticker="AAPL"):
+        return pd.DataFrame({"Manager": "A", "Style": "Value", "Ticker": ticker,
+                             "Period": periods, "Shares": range(len(periods))})
+
+    store.upsert_history(hist(["2024 Q3", "2024 Q4"]))
+    store.upsert_history(hist(["2024 Q3", "2024 Q4"]))
+    assert store.stats()["history"] == 2
+
+    # replace=False: 최신 분기 한 행만 upsert (나머지 이력 유지)
+    store.upsert_history(hist(["Q1 2025"]), replace=False)
+    assert store.activity("AAPL")["report_date"].tolist() == ["2024-09-30", "2024-12-31", "2025-03-31"]
+
+    # replace=True: 종목의 전체 이력으로 교체
+    store.upsert_history(hist(["2024 Q4"]))
+    assert store.activity("AAPL")["report_date"].tolist() == ["2024-12-31"]
+
+
+def test_upsert_securities_keeps_values_on_failed_lookup(store):
+    store.upsert_securities(pd.DataFrame({"Ticker": ["AAPL"], "Sector": ["Technology"],
+                                          "Industry": ["Hardware"], "Current_Price": [190.0]}))
+    store.upsert_securities(pd.DataFrame({"Ticker": ["AAPL", "AAPL"], "Sector": ["Error", "Error"],
+                                          "Industry": ["Error", "Error"], "Current_Price": [0.0, 0.0]}))
+    row = store.query("SELECT * FROM securities").iloc[0]
+    assert (row["sector"], row["industry"], row["last_price"]) == ("Technology", "Hardware", 190.0)
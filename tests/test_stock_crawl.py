@@ -0,0 +1,68 @@
+import pytest
+
+import Dataroma_buysell_craw as history
+from config import DEFAULT_CONFIG
+from dataroma_http import extract_stock_symbols
+
+GURUS = DEFAULT_CONFIG["history"]["gurus"][:4]
+GURU = {"code": "BRK", "name": "Warren Buffett", "style": "Value"}
+
+
+def grid(header, rows):
+    head = "".join(f"<th>{h}</th>" for h in header)
+    body = "".join("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in rows)
+    return f'<table id="grid"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def test_parse_stock_html_picks_tracked_gurus():
+    other = {"code": "psc", "name": "Bill Ackman", "style": "Activist"}
+    rows = [
+        ['<a href="/m/holdings.php?m=BRK">Berkshire Hathaway</a>', "5.5", "Add 2%", "1,000", "$150"],
+        ['<a href="/m/holdings.php?m=XYZ">Someone Else</a>', "1.0", "", "10", "$150"],
+        ['<a href="/m/holdings.php?m=PSC">Pershing Square</a>', "10.0", "Buy", "500", "$150"],
+    ]
+    html = ("<html><body><h2>Q3 2025</h2>"
+            + grid(["Portfolio Manager", "% of portfolio", "Recent activity", "Shares", "Value"], rows)
+            + "</body></html>")
+    df = history.parse_stock_html(html, {"BRK": GURU, "psc": other}, "AAPL")
+
+    assert df["Manager"].tolist() == ["Warren Buffett", "Bill Ackman"]
+    assert df["Code"].tolist() == ["BRK", "psc"]
+    assert (df["Period"] == "2025 Q3").all() and (df["Ticker"] == "AAPL").all()
+    assert {"% of portfolio", "Activity", "Shares", "Value"} <= set(df.columns)
+    assert history.parse_stock_html("<html></html>", {"BRK": GURU}, "AAPL").empty
+
+
+def test_extract_stock_symbols_and_plan():
+    html = ('<html><body><a href="/m/stock.php?sym=AAPL">a</a><a href="/m/stock.php?sym=KO&x=1">k</a>'
+            '<a href="/m/stock.php?sym=AAPL">again</a></body></html>')
+    assert extract_stock_symbols(html) == ["AAPL", "KO"]
+    assert extract_stock_symbols(None) == []
+
+    by_ticker, pair_pages = history.plan_stock_crawl({"BRK": ["AAPL", "KO"], "psc": ["AAPL"]})
+    assert by_ticker == {"AAPL": ["BRK", "psc"], "KO": ["BRK"]}
+    assert pair_pages == 3
+
+
+def hist_pages(site):
+    return [url for url in site.requested if "hist.php" in url]
+
+
+def test_fallback_pairs_survive_interrupted_run(site, monkeypatch):
+    # 1차: stock.php는 모두 끝내고 hist.php 보충 중에 중단
+    monkeypatch.setattr(site, "interrupt", "hist.php")
+    with pytest.raises(KeyboardInterrupt):
+        history.scrape_by_stock(GURUS)
+    assert not hist_pages(site)
+
+    # 2차: stock.php는 다시 열지 않고 남은 쌍만 hist.php로
+    monkeypatch.setattr(site, "interrupt", None)
+    site.requested.clear()
+    history.scrape_by_stock(GURUS)
+    assert not [url for url in site.requested if "stock.php" in url]
+    assert hist_pages(site)
+
+    # 3차: 보충까지 끝났으면 hist.php도 다시 열지 않음
+    site.requested.clear()
+    history.scrape_by_stock(GURUS)
+    assert not hist_pages(site)
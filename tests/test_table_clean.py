@@ -0,0 +1,29 @@
+import pandas as pd
+
+from table_clean import format_report, normalize_table, parse_numeric
+
+
+def test_parse_numeric_formats():
+    values, failed = parse_numeric(pd.Series(["$1,234.5", "12.3%", "+5", "1.2M", "(1,234)", "", "-", "abc", None]))
+    assert values.tolist()[:5] == [1234.5, 12.3, 5.0, 1_200_000.0, -1234.0]
+    assert values.iloc[5:].isna().all()
+    assert failed == 1  # 'abc'만 실패 (빈칸/'-'/None은 결측)
+    assert str(values.dtype) == "Float64"
+
+
+def test_normalize_table_detects_numeric_columns():
+    df = pd.DataFrame({"Stock": ["AAPL", "KO"], "Shares": ["1,000", "2,000"],
+                       "Weight": ["5.1%", "x"], "Value": ["$1.2M", "$3K"]})
+    out, report = normalize_table(df, integer_columns=["Shares"])
+    assert out["Shares"].tolist() == [1000, 2000] and str(out["Shares"].dtype) == "Int64"
+    assert out["Value"].tolist() == [1_200_000.0, 3000.0]
+    assert out["Weight"].tolist() == ["5.1%", "x"]  # 숫자 비율이 낮으면 그대로
+
+    out, report = normalize_table(df, numeric_columns=["Weight"])
+    assert report == {"Weight": 1} and "Weight" in format_report(report)
+    assert out["Stock"].tolist() == ["AAPL", "KO"]
+
+
+def test_normalize_table_empty():
+    out, report = normalize_table(pd.DataFrame())
+    assert out.empty and report == {}
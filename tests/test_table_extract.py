@@ -0,0 +1,62 @@
+from Dataroma_buysell_craw import parse_history_html
+from dataroma_http import has_table
+from table_extract import extract_table, find_table_html, href_param
+
+GURU = {"code": "BRK", "name": "Warren Buffett", "style": "Value"}
+
+FILLER = '<table id="menu"><tr><td>Home</td><td>1,000</td></tr></table>'
+
+
+def grid(header, rows, table_id="grid"):
+    head = "".join(f"<th>{h}</th>" for h in header)
+    body = "".join("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in rows)
+    return f'<table id="{table_id}"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def page(*tables):
+    return "<html><body>" + "".join(tables) + "</body></html>"
+
+
+def test_extract_table_only_target_grid():
+    html = page(FILLER, grid(["Stock", "Shares"], [['<a href="/m/stock.php?sym=AAPL">AAPL</a>', "1,000"]]))
+    assert find_table_html(html, "menu") is not None
+    assert find_table_html(html, "missing") is None
+    assert has_table(html) and not has_table("<html></html>")
+
+    df, report = extract_table(html, "grid", links=True)
+    assert df.columns.tolist() == ["Stock", "Shares", "Stock_href"]
+    assert df["Shares"].tolist() == [1000]
+    assert href_param(df["Stock_href"], "sym").tolist() == ["AAPL"]
+    assert extract_table("<html></html>", "grid") == (None, {})
+
+
+def test_find_table_html_matches_only_real_id_attribute():
+    target = grid(["Stock", "Shares"], [["KO", "400"]])
+    decoy = '<table data-id="grid"><tr><th>Stock</th></tr><tr><td>decoy</td></tr></table>'
+
+    # data-id="grid"는 id가 아님
+    assert find_table_html(page(decoy), "grid") is None
+    assert not has_table(page(decoy))
+    assert "KO" in find_table_html(page(decoy, target), "grid")
+
+    # 주석 / 스크립트 안의 id=grid는 건너뛰고 실제 테이블을 찾음
+    commented = '<!-- <table id="grid"><tr><td>old</td></tr></table> -->'
+    script = "<script>var t = '<table id=\"grid\"><tr><td>js</td></tr></table>';</script>"
+    for prefix in (commented, script, "<p>see id=grid below</p>"):
+        fragment = find_table_html(page(prefix, target), "grid")
+        assert "KO" in fragment and "old" not in fragment and "js" not in fragment
+    assert find_table_html(page(commented), "grid") is None
+
+    df, _ = extract_table(page(decoy, commented, target), "grid")
+    assert df["Stock"].tolist() == ["KO"] and df["Shares"].tolist() == [400]
+
+
+def test_parse_history_html():
+    html = page(grid(["Period", "Shares", "% of Portfolio", "Activity"],
+                     [["2024 Q4", "1,000", "5.5", "Add 10%"], ["2024 Q3", "900", "5.0", "Buy"]]))
+    df = parse_history_html(html, GURU, "AAPL")
+    assert df.columns.tolist()[:3] == ["Manager", "Style", "Ticker"]
+    assert df["Shares"].tolist() == [1000, 900]
+    # 헤더만 있거나 테이블이 없으면 None
+    assert parse_history_html(page(grid(["Period"], [["2024 Q4"]])), GURU, "AAPL") is None
+    assert parse_history_html("<html></html>", GURU, "AAPL") is None
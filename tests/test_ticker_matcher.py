@@ -0,0 +1,40 @@
+import re
+
+from ticker_matcher import TickerMatcher
+
+
+def test_word_boundaries_and_case():
+    matcher = TickerMatcher({"AAPL", "TSLA", "AMD"})
+    assert matcher.extract("aapl and TSLA calls, AMDX is not AMD") == ["AAPL", "TSLA", "AMD"]
+    assert matcher.extract("TSLAQ SAAPL") == []
+    assert TickerMatcher({"AAPL"}, case_sensitive=True).extract("aapl AAPL") == ["AAPL"]
+
+
+def test_ambiguous_tickers_need_cashtag():
+    matcher = TickerMatcher({"BB", "ON", "GME"})
+    assert matcher.extract("I'm ON it, BB gun") == []
+    assert matcher.extract("$BB and $on, GME") == ["BB", "ON", "GME"]
+    assert TickerMatcher({"BB"}, ambiguous=None).extract("BB") == ["BB"]
+
+
+def test_class_shares_and_joined_tokens():
+    matcher = TickerMatcher({"BRK.B", "AAPL", "MSFT"})
+    assert matcher.extract("BRK.B vs BRK-B") == ["BRK.B"]
+    assert matcher.extract("AAPL-MSFT pair") == ["AAPL", "MSFT"]
+
+
+def test_order_dedup_and_empty():
+    matcher = TickerMatcher({"AAPL", "GME"})
+    assert matcher.extract("GME GME $GME AAPL gme") == ["GME", "AAPL"]
+    assert matcher.extract("") == [] and matcher.extract(None) == []
+    assert len(matcher) == 2
+
+
+def test_matches_per_ticker_regex_baseline():
+    """모호하지 않은 티커는 기존 티커별 r'\\b' 매칭과 같은 결과"""
+    tickers = {"AAPL", "NVDA", "SPY", "QQQ"}
+    matcher = TickerMatcher(tickers, ambiguous=None)
+    texts = ["NVDA/AAPL both", "buy SPY, QQQ.", "(NVDA) up", "xSPY SPYx", "qqq lower"]
+    for text in texts:
+        expected = {t for t in tickers if re.search(r"\b" + t + r"\b", text.upper())}
+        assert set(matcher.extract(text)) == expected, text
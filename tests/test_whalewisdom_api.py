@@ -0,0 +1,137 @@
+import asyncio
+import json
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+import pytest
+
+from fetch_policy import RetryPolicy
+from response_cache import get_cache
+from whalewisedom_craw import API_PAGE_SIZE, fetch_quarter_api, parse_api_page, quarter_id, save_api_holdings
+
+TARGET = {"name": "Test Filer", "slug": "test-filer"}
+
+
+class FakeResponse:
+    def __init__(self, body, status=200):
+        self.status = status
+        self.headers = {"content-type": "application/json"}
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+
+class FakeRequest:
+    """context.request 대신: 주소의 쿼리로 holdings 행을 잘라서 JSON으로"""
+
+    def __init__(self, n_rows, page_size=None, ignore_paging=False, with_total=True):
+        self.rows = [{"symbol": f"T{i}", "current_shares": str(i * 10), "quarter": "Q2 2026"}
+                     for i in range(n_rows)]
+        self.page_size = page_size
+        self.ignore_paging = ignore_paging
+        self.with_total = with_total
+        self.urls = []
+
+    async def get(self, url, timeout=None):
+        self.urls.append(url)
+        query = dict(parse_qsl(urlsplit(url).query))
+        limit = int(query.get("limit", query.get("length", len(self.rows))))
+        if self.page_size:
+            limit = min(limit, self.page_size)  # 서버가 페이지 크기를 줄임
+        if "page" in query:
+            start = (int(query["page"]) - 1) * limit
+        else:
+            start = int(query.get("offset", query.get("start", 0)))
+        if self.ignore_paging:
+            start = 0
+        rows = self.rows[start:start + limit]
+        body = {"rows": rows, "total": len(self.rows)} if self.with_total else rows
+        return FakeResponse(json.dumps(body))
+
+
+def fetch(request, template):
+    retry = RetryPolicy(base_delay=0)
+    return asyncio.run(fetch_quarter_api(request, template, TARGET, "2026-06-30", quarter_id(template), retry))
+
+
+def test_offset_paging_collects_every_row_once():
+    request = FakeRequest(1234)
+    df = fetch(request, "https://whalewisdom.com/filer/holdings?id=1&q1=94&offset=0&limit=25")
+
+    assert len(df) == 1234 and df["Ticker"].is_unique
+    assert len(request.urls) == 3
+    assert all(dict(parse_qsl(urlsplit(u).query))["limit"] == str(API_PAGE_SIZE) for u in request.urls)
+
+
+def test_parameter_names_come_from_template():
+    request = FakeRequest(700)
+    df = fetch(request, "https://whalewisdom.com/filer/holdings?id=1&start=0&length=25")
+    assert len(df) == 700
+    assert all("offset" not in u for u in request.urls)
+
+    request = FakeRequest(700)
+    df = fetch(request, "https://whalewisdom.com/filer/holdings?id=1&page=1&limit=25")
+    assert len(df) == 700
+
+
+def test_server_capped_page_size_follows_total():
+    request = FakeRequest(450, page_size=100)
+    assert len(fetch(request, "https://whalewisdom.com/filer/holdings?offset=0&limit=25")) == 450
+
+
+def test_without_paging_params_single_request():
+    request = FakeRequest(1234)
+    assert len(fetch(request, "https://whalewisdom.com/filer/holdings?id=1")) == 1234
+    assert len(request.urls) == 1
+
+
+def test_ignored_offset_does_not_loop_or_duplicate():
+    request = FakeRequest(1234, ignore_paging=True)
+    with pytest.raises(RuntimeError):
+        fetch(request, "https://whalewisdom.com/filer/holdings?offset=0&limit=25")
+    assert len(request.urls) == 2
+
+    # total이 없으면 받은 만큼만 (중복 없이)
+    request = FakeRequest(1234, ignore_paging=True, with_total=False)
+    df = fetch(request, "https://whalewisdom.com/filer/holdings?id=2&offset=0&limit=25")
+    assert len(df) == API_PAGE_SIZE and df["Ticker"].is_unique
+
+
+def test_list_response_stops_on_short_page():
+    request = FakeRequest(600, with_total=False)
+    assert len(fetch(request, "https://whalewisdom.com/filer/holdings?offset=0&limit=25")) == 600
+    assert len(request.urls) == 2
+
+
+def test_report_date_from_rows_and_parse_api_page():
+    df = fetch(FakeRequest(3), "https://whalewisdom.com/filer/holdings?id=1")
+    assert (df["Report_Date"] == "2026-06-30").all()
+    assert parse_api_page('[{"a": 1}]') == ([{"a": 1}], None)
+    assert parse_api_page('{"data": [], "recordsTotal": "5"}') == ([], 5)
+
+
+def cache_expiry(url):
+    return get_cache()._conn.execute("SELECT expires_at FROM responses WHERE url = ?", (url,)).fetchone()[0]
+
+
+def test_latest_quarter_url_is_not_cached_forever():
+    # 분기 id가 있는 주소만 마감된 분기로 무기한 캐시
+    fetch(FakeRequest(3), "https://whalewisdom.com/filer/holdings?id=1&q1=94")
+    assert cache_expiry("https://whalewisdom.com/filer/holdings?id=1&q1=94") is None
+
+    # 분기 id가 없는 주소는 다음 실행에 새 분기가 올 수 있으므로 기본 TTL
+    fetch(FakeRequest(3), "https://whalewisdom.com/filer/holdings?id=2")
+    assert cache_expiry("https://whalewisdom.com/filer/holdings?id=2") is not None
+
+
+def test_save_api_holdings_merges_by_report_date():
+    def holdings(report_date, tickers):
+        return pd.DataFrame({"Manager": TARGET["name"], "Report_Date": report_date, "Ticker": tickers})
+
+    save_api_holdings(pd.concat([holdings("2026-06-30", ["A", "B"]), holdings("2026-03-31", ["A"])]), TARGET)
+    # 이번 실행은 최신 분기만 (다시 받은 분기는 교체, 나머지 분기는 유지)
+    save_api_holdings(holdings("2026-06-30", ["C"]), TARGET)
+
+    saved = pd.read_csv(f"Whale_{TARGET['slug']}.csv", encoding="utf-8-sig")
+    assert saved[["Report_Date", "Ticker"]].values.tolist() == [["2026-06-30", "C"], ["2026-03-31", "A"]]
@@ -0,0 +1,80 @@
+"""
+한 번의 스캔으로 여러 티커를 찾는 매처
+
+티커마다 re.search를 돌리면 게시물 하나에 O(티커 수)만큼 스캔하게 됩니다.
+여기서는 미리 컴파일한 토큰 정규식으로 본문을 한 번만 훑고,
+나온 토큰을 해시 셋에서 찾습니다 (티커가 1만 개여도 비용은 본문 길이에만 비례).
+
+- 단어 경계: 기존 r'\b' + ticker + r'\b' 매칭과 같은 기준
+- $CASHTAG: "$GME" 형태 인식
+- 모호한 티커 (BB, ON, IT 등 일반 단어와 겹치는 것)는 $캐시태그로 쓸 때만 인정
+"""
+
+import re
+from typing import Iterable, List, Optional, Set
+
+# 일반 영어 단어/약어와 겹쳐서 오탐이 많은 티커 ($캐시태그일 때만 인정)
+AMBIGUOUS_TICKERS = frozenset({
+    'A', 'AI', 'ALL', 'AM', 'AN', 'ANY', 'ARE', 'AT', 'BB', 'BE', 'BIG', 'CAN',
+    'CEO', 'DD', 'EDIT', 'EV', 'FOR', 'FUN', 'GO', 'GOOD', 'HAS', 'HE', 'HOLD',
+    'IT', 'KEY', 'LOVE', 'MAN', 'NEW', 'NOW', 'ON', 'ONE', 'OPEN', 'OR', 'OUT',
+    'PLAY', 'REAL', 'RUN', 'SEE', 'SO', 'TV', 'TWO', 'UP', 'USA', 'WELL', 'YOU',
+})
+
+# $ 또는 단어 문자 뒤가 아닌 곳에서 시작하는 대문자 토큰
+# BRK.B / BF-B 같은 클래스 주식 표기도 하나의 토큰으로 잡음
+_TOKEN_RE = re.compile(r'(?<![\w$])(\$?)([A-Z][A-Z0-9]*(?:[.\-][A-Z0-9]+)*)(?!\w)')
+_SEPARATOR_RE = re.compile(r'[.\-]')
+
+
+class TickerMatcher:
+    """
+    matcher = TickerMatcher({'AAPL', 'GME', 'BB'})
+    matcher.extract("Buying $BB and aapl calls")  # ['BB', 'AAPL']
+    """
+
+    def __init__(self, tickers: Iterable[str],
+                 ambiguous: Optional[Iterable[str]] = AMBIGUOUS_TICKERS,
+                 case_sensitive: bool = False):
+        self.tickers = frozenset(t.upper() for t in tickers)
+        self.ambiguous = frozenset(t.upper() for t in (ambiguous or ())) & self.tickers
+        self.case_sensitive = case_sensitive
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def _accept(self, symbol: str, cashtag: bool) -> bool:
+        if symbol not in self.tickers:
+            return False
+        return cashtag or symbol not in self.ambiguous
+
+    def extract(self, text: str) -> List[str]:
+        """텍스트에 등장한 타겟 티커 (처음 등장한 순서, 중복 제거)"""
+        if not text:
+            return []
+        if not self.case_sensitive:
+            text = text.upper()
+
+        found = []
+        seen: Set[str] = set()
+        for match in _TOKEN_RE.finditer(text):
+            cashtag = bool(match.group(1))
+            token = match.group(2)
+
+            if self._accept(token, cashtag):
+                candidates = (token,)
+            elif _SEPARATOR_RE.search(token):
+                # "AAPL-MSFT"처럼 붙어 있는 경우: \b 매칭처럼 조각별로 확인
+                # (캐시태그는 첫 조각에만 붙은 것으로 봄)
+                parts = _SEPARATOR_RE.split(token)
+                candidates = tuple(
+                    p for i, p in enumerate(parts) if self._accept(p, cashtag and i == 0)
+                )
+            else:
+                continue
+
+            for symbol in candidates:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    found.append(symbol)
+        return found
@@ -0,0 +1,318 @@
+"""
+whalebuzz 통합 실행기
+
+    python whalebuzz.py holdings                 # 새로 제출된 분기만 (전체 재수집: --full)
+    python whalebuzz.py history --async          # 종목별 매매 히스토리 (비동기 모드)
+    python whalebuzz.py history --by-stock       # 최신 분기만 종목 단위로 (구루 간 중복 페이지 제거)
+    python whalebuzz.py deltas                   # 보유 스냅샷 → 매매 이벤트 로컬 계산
+    python whalebuzz.py panel --parquet          # Reddit 언급 × 보유 스냅샷 (티커, 분기, 매니저) 패널
+    python whalebuzz.py yahoo --code BRK
+    python whalebuzz.py yahoo --gurus            # history 구루 전체 (고유 티커만 Yahoo 조회)
+    python whalebuzz.py whalewisdom --headless --quarters-back 4   # 최근 5개 분기 전체 보유 종목 (JSON)
+    python whalebuzz.py reddit --start-year 2024 --end-year 2024 --parquet
+    python whalebuzz.py store holders AAPL       # SQLite 저장소 조회 (stats / portfolio / activity / mentions / import)
+    python whalebuzz.py config show | init
+
+대상 목록과 옵션은 config.py 기본값 + whalebuzz.toml (--config / WHALEBUZZ_CONFIG)에서 읽습니다.
+pandas / Playwright / pyarrow 같은 무거운 모듈은 해당 서브커맨드를 실행할 때만 import하므로
+--help나 config 명령은 바로 끝나고, 크롤러도 입력을 기다리지 않아 cron으로 그대로 돌릴 수 있습니다.
+"""
+
+import argparse
+import os
+import sys
+
+from config import CONFIG_FILE, load_config, select_gurus, to_toml, write_config
+
+
+def cmd_holdings(config, args):
+    import DataRoma_craw_hold as holdings
+
+    settings = config["holdings"]
+    holdings.scrape_history_portfolios(
+        update=not args.full,
+        gurus=select_gurus(settings["gurus"], args.gurus),
+        start=args.start or settings["start_quarter"],
+    )
+
+
+def cmd_history(config, args):
+    import asyncio
+    import Dataroma_buysell_craw as history
+
+    settings = config["history"]
+    gurus = select_gurus(settings["gurus"], args.gurus)
+    mode = args.mode or settings["mode"]
+    if mode == "async":
+        asyncio.run(history.scrape_and_save_async(
+            concurrency=args.concurrency or settings["concurrency"],
+            guru_concurrency=settings["guru_concurrency"],
+            rate_per_sec=args.rate or settings["rate_per_sec"],
+            gurus=gurus,
+        ))
+    elif mode == "stock":
+        history.scrape_by_stock(gurus)
+    else:
+        history.scrape_and_save_incremental(gurus)
+
+
+def cmd_deltas(config, args):
+    import pandas as pd
+    from position_delta import compute_position_deltas, summarize_events
+
+    holdings = pd.read_csv(args.input, encoding="utf-8-sig")
+    events = compute_position_deltas(holdings, include_unchanged=args.include_unchanged)
+    events.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"🧮 스냅샷 {holdings[['Manager', 'Report_Date']].drop_duplicates().shape[0]}개 → "
+          f"매매 이벤트 {len(events)}건 계산 완료 ('{args.output}')")
+    print(summarize_events(events))
+
+
+def cmd_panel(config, args):
+    import pandas as pd
+    from reddit_sink import NDJSONSink, ParquetSink, SQLiteSink
+    from signal_panel import MENTION_COLUMNS, build_panel, summarize_panel
+
+    reddit = config["reddit"]
+    source = args.source or reddit["output"]
+    if source == "sqlite" or args.from_store:
+        from sqlite_store import get_store
+        store = get_store()
+    if args.from_store:
+        holdings = store.query(
+            "SELECT manager AS Manager, ticker AS Ticker, report_date AS Report_Date, "
+            "shares AS Shares, weight_pct AS Weight_Pct, value AS Value FROM holdings WHERE source = ?",
+            ("dataroma",))
+    else:
+        holdings = pd.read_csv(args.input, encoding="utf-8-sig")
+    if source == "parquet":
+        sink = ParquetSink('data/reddit_posts', 'data/reddit_mentions')
+    elif source == "sqlite":
+        sink = SQLiteSink(store)
+    else:
+        sink = NDJSONSink(args.mentions or f"reddit_ticker_data_{reddit['start_year']}_{reddit['end_year']}.ndjson")
+
+    print(f"🔗 보유 스냅샷 {len(holdings)}행 × Reddit 언급 ({sink}) 조인 중...")
+    panel = build_panel(holdings, sink.iter_frames(MENTION_COLUMNS),
+                        freq=args.freq, trailing_days=args.trailing_days)
+    panel.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"✅ 패널 {len(panel)}행 (티커 {panel['Ticker'].nunique()}개, "
+          f"분기 {panel['Report_Date'].nunique()}개) 저장 완료 ('{args.output}')")
+    pd.set_option("display.width", 160)
+    print(summarize_panel(panel).to_string(index=False))
+
+
+def cmd_yahoo(config, args):
+    import yahoo_craw
+
+    settings = config["yahoo"]
+    if args.gurus is not None:
+        # 여러 구루를 한 번에 (구루 간 중복 티커는 한 번만 조회), 코드를 안 주면 history 구루 전체
+        yahoo_craw.run_many(
+            select_gurus(config["history"]["gurus"], args.gurus),
+            max_workers=settings["max_workers"],
+            portfolios_file=settings["portfolios_file"],
+        )
+        return
+    yahoo_craw.run(
+        code=args.code or settings["guru_code"],
+        name=args.name or settings["guru_name"],
+        max_workers=settings["max_workers"],
+        portfolio_file=settings["portfolio_file"],
+        performance_file=settings["performance_file"],
+    )
+
+
+def cmd_whalewisdom(config, args):
+    import whalewisedom_craw
+
+    settings = config["whalewisdom"]
+    headless = settings["headless"] if args.headless is None else args.headless
+    results = whalewisedom_craw.scrape_whalewisdom_fast(
+        parallel=args.parallel or settings["parallel"],
+        headless=headless,
+        targets=settings["targets"],
+        mode=args.mode or settings["mode"],
+        quarters_back=settings["quarters_back"] if args.quarters_back is None else args.quarters_back,
+    )
+    print(f"\n📊 총 {len(results)}개 운용사 데이터 수집 완료")
+
+
+def cmd_reddit(config, args):
+    from raddit_craw_pullpush import run_crawl
+
+    settings = dict(config["reddit"])
+    overrides = {
+        "start_year": args.start_year,
+        "end_year": args.end_year,
+        "posts_per_quarter": args.posts,
+        "workers": args.workers,
+        "tickers": args.tickers,
+        "subreddits": args.subreddits,
+        "output": args.output,
+    }
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    run_crawl(settings)
+
+
+def cmd_store(config, args):
+    import glob
+    import pandas as pd
+    from sqlite_store import WhaleStore, DEFAULT_PATH
+
+    pd.set_option("display.width", 160)
+    store = WhaleStore(args.db or DEFAULT_PATH)
+    if args.action == "stats":
+        for table, rows in store.stats().items():
+            print(f"   {table:<16} {rows:>10,}행")
+    elif args.action == "import":
+        # 기존 CSV 결과를 저장소로 옮김 (upsert라 여러 번 돌려도 같은 결과)
+        from DataRoma_craw_hold import FILENAME as HOLDINGS_FILE
+        from Dataroma_buysell_craw import FILENAME as HISTORY_FILE, STOCK_FILENAME
+
+        def read(path):
+            print(f"📥 {path}")
+            return pd.read_csv(path, encoding="utf-8-sig")
+
+        if os.path.exists(HOLDINGS_FILE):
+            print(f"   → holdings {store.upsert_holdings(read(HOLDINGS_FILE))}행")
+        if os.path.exists(HISTORY_FILE):
+            # 이어쓰기로 쌓인 중복은 upsert에서 키 기준으로 합쳐짐
+            print(f"   → history {store.upsert_history(read(HISTORY_FILE))}행")
+        if os.path.exists(STOCK_FILENAME):
+            print(f"   → history {store.upsert_history(read(STOCK_FILENAME), replace=False)}행 (최신 분기)")
+        for path in sorted(glob.glob("Whale_*.csv")):
+            print(f"   → holdings {store.upsert_holdings(read(path), source='whalewisdom')}행")
+        if os.path.exists(config["yahoo"]["portfolio_file"]):
+            print(f"   → securities {store.upsert_securities(read(config['yahoo']['portfolio_file']))}개")
+    elif not args.key:
+        raise ValueError(f"store {args.action}: 티커 또는 매니저 이름이 필요합니다")
+    elif args.action == "holders":
+        print(store.holders(args.key, start=args.start, end=args.end).to_string(index=False))
+    elif args.action == "portfolio":
+        print(store.portfolio(args.key, report_date=args.end).to_string(index=False))
+    elif args.action == "activity":
+        print(store.activity(ticker=args.key, start=args.start, end=args.end).to_string(index=False))
+    elif args.action == "mentions":
+        print(store.mention_counts([args.key]).to_string(index=False))
+    store.close()
+
+
+def cmd_config(config, args):
+    if args.action == "show":
+        print(to_toml(config), end="")
+        return
+    path = args.path or CONFIG_FILE
+    if os.path.exists(path) and not args.force:
+        raise SystemExit(f"❌ '{path}'이(가) 이미 있습니다. 덮어쓰려면 --force")
+    print(f"📝 설정 파일 저장: {write_config(config, path)}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="whalebuzz", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", help=f"설정 파일 경로 (기본: {CONFIG_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("holdings", help="Dataroma 분기별 포트폴리오 스냅샷")
+    p.add_argument("--full", action="store_true", help="모든 분기를 다시 수집")
+    p.add_argument("--start", help="시작 분기말 (예: 2024-03-31)")
+    p.add_argument("--gurus", nargs="+", metavar="CODE", help="일부 구루만 (Dataroma 코드)")
+    p.set_defaults(func=cmd_holdings)
+
+    p = sub.add_parser("history", help="Dataroma 종목별 매매 히스토리")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--async", dest="mode", action="store_const", const="async", help="비동기 병렬 모드")
+    mode.add_argument("--sequential", dest="mode", action="store_const", const="sequential", help="순차 모드")
+    mode.add_argument("--by-stock", dest="mode", action="store_const", const="stock",
+                      help="종목마다 stock.php 한 번 (최신 분기, 구루 간 중복 제거)")
+    p.add_argument("--concurrency", type=int, help="비동기 모드 동시 요청 수")
+    p.add_argument("--rate", type=float, help="비동기 모드 초당 요청 예산")
+    p.add_argument("--gurus", nargs="+", metavar="CODE", help="일부 구루만 (Dataroma 코드)")
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("deltas", help="보유 스냅샷 → 매매 이벤트 (요청 없음)")
+    p.add_argument("--input", default="Guru_Portfolios_TimeSeries_2024-2025.csv")
+    p.add_argument("--output", default="Guru_Position_Deltas.csv")
+    p.add_argument("--include-unchanged", action="store_true", help="주식 수가 그대로인 종목도 포함")
+    p.set_defaults(func=cmd_deltas)
+
+    p = sub.add_parser("panel", help="Reddit 언급 × 보유 스냅샷 (티커, 분기, 매니저) 패널 (요청 없음)")
+    p.add_argument("--input", default="Guru_Portfolios_TimeSeries_2024-2025.csv", help="보유 스냅샷 CSV")
+    p.add_argument("--from-store", action="store_true", help="보유 스냅샷을 SQLite 저장소에서 읽음")
+    source = p.add_mutually_exclusive_group()
+    source.add_argument("--mentions", metavar="NDJSON", help="언급 NDJSON 경로 (기본: reddit 설정 기간)")
+    source.add_argument("--parquet", dest="source", action="store_const", const="parquet",
+                        help="언급을 Parquet 데이터셋에서 읽음")
+    source.add_argument("--sqlite", dest="source", action="store_const", const="sqlite",
+                        help="언급을 SQLite 저장소에서 읽음")
+    p.add_argument("--freq", default="W", help="언급 집계 버킷 (pandas period: W / D / M)")
+    p.add_argument("--trailing-days", type=int, default=28, help="분기말 직전 언급 창 (일)")
+    p.add_argument("--output", default="Guru_Signal_Panel.csv")
+    p.set_defaults(func=cmd_panel)
+
+    p = sub.add_parser("yahoo", help="구루 포트폴리오 + Yahoo Finance 섹터/가격")
+    p.add_argument("--code", help="Dataroma 구루 코드")
+    p.add_argument("--name", help="표시 이름")
+    p.add_argument("--gurus", nargs="*", metavar="CODE",
+                   help="여러 구루를 한 번에 (history 구루 목록, 코드 없이 쓰면 전체)")
+    p.set_defaults(func=cmd_yahoo)
+
+    p = sub.add_parser("whalewisdom", help="WhaleWisdom 13F 보유 종목")
+    p.add_argument("--parallel", action="store_true")
+    p.add_argument("--headless", dest="headless", action="store_true", default=None)
+    p.add_argument("--headed", dest="headless", action="store_false", help="브라우저 창 표시 (Cloudflare 통과용)")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--api", dest="mode", action="store_const", const="api",
+                      help="그리드 JSON으로 전체 보유 종목 (기본)")
+    mode.add_argument("--dom", dest="mode", action="store_const", const="dom",
+                      help="테이블 렌더링 후 파싱 (상위 20개)")
+    p.add_argument("--quarters-back", type=int, help="api 모드: 최신 분기 외에 더 받을 과거 분기 수")
+    p.set_defaults(func=cmd_whalewisdom)
+
+    p = sub.add_parser("reddit", help="PullPush Reddit 티커 언급")
+    p.add_argument("--start-year", type=int)
+    p.add_argument("--end-year", type=int)
+    p.add_argument("--posts", type=int, help="분기당 목표 매칭 수")
+    p.add_argument("--workers", type=int)
+    p.add_argument("--tickers", nargs="+")
+    p.add_argument("--subreddits", nargs="+")
+    output = p.add_mutually_exclusive_group()
+    output.add_argument("--parquet", dest="output", action="store_const", const="parquet",
+                        help="NDJSON 대신 Parquet 데이터셋으로 저장")
+    output.add_argument("--sqlite", dest="output", action="store_const", const="sqlite",
+                        help="SQLite 저장소에 upsert")
+    p.set_defaults(func=cmd_reddit)
+
+    p = sub.add_parser("store", help="SQLite 저장소 조회 / 기존 CSV 가져오기")
+    p.add_argument("action", choices=["stats", "holders", "portfolio", "activity", "mentions", "import"])
+    p.add_argument("key", nargs="?", help="holders/activity/mentions: 티커, portfolio: 매니저 이름")
+    p.add_argument("--start", help="시작 분기말 (예: 2024-03-31)")
+    p.add_argument("--end", help="마지막 분기말 (portfolio: 조회할 분기, 기본 최신)")
+    p.add_argument("--db", help="저장소 경로 (기본: data/whalebuzz.sqlite, WHALEBUZZ_DB)")
+    p.set_defaults(func=cmd_store)
+
+    p = sub.add_parser("config", help="설정 보기 / 파일로 저장")
+    p.add_argument("action", choices=["show", "init"])
+    p.add_argument("path", nargs="?", help="init: 저장할 경로")
+    p.add_argument("--force", action="store_true", help="init: 기존 파일 덮어쓰기")
+    p.set_defaults(func=cmd_config)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        config = load_config(args.config)
+        args.func(config, args)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("\n⚠️ 사용자에 의해 중단됨", file=sys.stderr)
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,99 +1,455 @@
-import pandas as pd
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
-from io import StringIO
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import os
 import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-TARGETS = [
-    {"name": "Berkshire Hathaway", "slug": "berkshire-hathaway-inc"},
-    {"name": "Bridgewater", "slug": "bridgewater-associates-lp"},
-    {"name": "Scion Asset", "slug": "scion-asset-management-llc"},
-]
-
-def scrape_single_filer(target, headless=True):
-    """단일 운용사 크롤링 (병렬 처리용)"""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=headless,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        
-        # 리소스 차단으로 속도 향상
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        )
-        
-        page = context.new_page()
+import pandas as pd
+
+from browser_pool import BrowserPool, STATE_DIR
+from fetch_policy import FetchResult, RetryPolicy, SUCCESS, BLOCKED, classify_status
+from lean_page import LeanProfile, WHALEWISDOM_DOMAINS
+from response_cache import get_cache, ttl_for_period
+from sqlite_store import get_store, latest_report_date, period_to_date
+from run_metrics import get_metrics, start_run, failure_status
+from config import DEFAULT_CONFIG
+from table_clean import format_report, normalize_table
+from table_extract import extract_table, find_table_html
+
+TARGETS = DEFAULT_CONFIG["whalewisdom"]["targets"]
+MODE = DEFAULT_CONFIG["whalewisdom"]["mode"]                    # api / dom
+QUARTERS_BACK = DEFAULT_CONFIG["whalewisdom"]["quarters_back"]  # api 모드: 최신 분기 외에 더 받을 과거 분기 수
+
+# 보유 종목 그리드가 부르는 JSON 엔드포인트 (페이지의 XHR을 가로채서 실제 주소/파라미터를 알아냄)
+HOLDINGS_API_PATH = "/filer/holdings"
+API_PAGE_SIZE = 500       # JSON 요청 한 번에 받을 행 수
+# 파라미터 이름은 가로챈 요청에 실제로 있는 것만 씀 (후보 중 처음 찾은 이름)
+QUARTER_PARAMS = ["q1", "quarter_id", "quarter"]                    # 분기 id (분기마다 1씩 증가)
+OFFSET_PARAMS = ["offset", "start", "skip", "iDisplayStart"]        # 시작 행
+LIMIT_PARAMS = ["limit", "length", "per_page", "page_size", "rows", "iDisplayLength"]  # 페이지 크기
+PAGE_PARAMS = ["page", "page_number"]                               # 페이지 번호 (1부터)
+
+# JSON 필드 → CSV 컬럼 (sqlite_store HOLDING_ALIASES와 같은 이름, 나머지 필드는 그대로 둠)
+API_COLUMNS = {
+    "stock_name": "Stock_Name",
+    "symbol": "Ticker",
+    "current_percent_of_portfolio": "Weight_Pct",
+    "current_shares": "Shares",
+    "current_mv": "Value",
+    "avg_price": "Price",
+}
+# 행에 분기 정보가 있으면 그 값으로 Report_Date (오늘 날짜로 추정하지 않음)
+API_PERIOD_FIELDS = ["quarter", "period", "period_of_report", "quarter_date", "report_date"]
+
+# 쿠키/로컬 스토리지 저장 위치 (실행 간 재사용)
+STATE_FILE = os.path.join(STATE_DIR, "whalewisdom.json")
+PARALLEL_CONTEXTS = 3
+LEAN = LeanProfile(WHALEWISDOM_DOMAINS)
+
+def parse_holdings_table(table_html, target):
+    """#holdings_table HTML → 상위 20개 저장 후 반환"""
+    # 숫자 컬럼 정리 (자동 감지)
+    with get_metrics().stage("parse"):
+        df, report = extract_table(table_html, "holdings_table")
+    
+    if df is not None:
+        df = df.dropna(axis=1, how='all')
         
-        # 이미지, 폰트, CSS 차단 (선택적)
-        page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2}", lambda route: route.abort())
+        if format_report(report):
+            print(f"⚠️ [{target['name']}] 숫자 변환 실패: {format_report(report)}")
         
-        url = f"https://whalewisdom.com/filer/{target['slug']}"
-        print(f"[{target['name']}] 크롤링 시작...")
+        df.insert(0, "Manager", target['name'])
+        # SQLite 저장소에는 전체 보유 종목 (CSV는 기존처럼 상위 20개)
+        with get_metrics().stage("save"):
+            get_store().upsert_holdings(df, source="whalewisdom")
+        top20 = df.head(20)
         
+        filename = f"Whale_{target['slug']}.csv"
+        top20.to_csv(filename, index=False, encoding='utf-8-sig')
+        print(f"✅ [{target['name']}] 완료 ({len(df)}개 중 20개 저장)")
+        return top20
+    return None
+
+async def scrape_single_filer(pool, target):
+    """단일 운용사 크롤링 (풀에서 격리된 context를 빌려 사용)"""
+    url = f"https://whalewisdom.com/filer/{target['slug']}"
+    
+    # 캐시에 테이블이 있으면 브라우저를 쓰지 않음
+    cache = get_cache()
+    cached_table = cache.get(url)
+    if cached_table is not None:
+        print(f"[{target['name']}] 캐시 사용")
+        get_metrics().count("cache_hit")
         try:
-            # 페이지 로딩 (타임아웃 단축)
-            page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            return parse_holdings_table(cached_table, target)
+        except Exception as e:
+            print(f"❌ [{target['name']}] 에러: {e}")
+            return None
+    
+    print(f"[{target['name']}] 크롤링 시작...")
+    metrics = get_metrics()
+    timing = {}
+    loaded = False
+    try:
+        async with pool.context() as context:
+            # 이미지/폰트/CSS + 허용 목록 밖 도메인(광고, 분석) 차단
+            await LEAN.apply_async(context)
+            page = await context.new_page()
             
-            # 테이블 대기 (동적)
-            page.wait_for_selector("#holdings_table", timeout=10000)
+            # domcontentloaded + 테이블까지만 대기 (동적)
+            html = await LEAN.load_async(page, url, "#holdings_table", timeout=30000, wait_ms=10000,
+                                         timing=timing)
+            metrics.page_load("whalewisdom", url, timing, nbytes=LEAN.last_bytes)
+            loaded = True
             
             # 필요시에만 스크롤
-            if page.locator(".lazy-load").count() > 0:
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(1000)
-            
-            # HTML 파싱
-            html = page.content()
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # 테이블 추출
-            table = soup.select_one("#holdings_table")
-            if not table:
-                print(f"[{target['name']}] 테이블 없음")
-                return None
-            
-            dfs = pd.read_html(StringIO(str(table)))
-            
-            if dfs:
-                df = dfs[0].dropna(axis=1, how='all')
-                df.insert(0, "Manager", target['name'])
-                top20 = df.head(20)
-                
-                filename = f"Whale_{target['slug']}.csv"
-                top20.to_csv(filename, index=False, encoding='utf-8-sig')
-                print(f"✅ [{target['name']}] 완료 ({len(df)}개 중 20개 저장)")
-                return top20
-            
+            if await page.locator(".lazy-load").count() > 0:
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                metrics.add_wait(1.0, "lazy_load")
+                await page.wait_for_timeout(1000)
+                html = await page.content()
+    except Exception as e:
+        if not loaded:
+            metrics.page_load("whalewisdom", url, timing, failure_status(e))
+        print(f"❌ [{target['name']}] 에러: {e}")
+        return None
+    
+    # 테이블 구간만 추출
+    table_html = find_table_html(html, "holdings_table")
+    if table_html is None:
+        print(f"[{target['name']}] 테이블 없음")
+        metrics.count("skip")
+        return None
+    
+    # 테이블 HTML만 캐시 (페이지 전체보다 훨씬 작음)
+    cache.set(url, table_html, source="whalewisdom")
+    
+    try:
+        return parse_holdings_table(table_html, target)
+    except Exception as e:
+        print(f"❌ [{target['name']}] 에러: {e}")
+        return None
+
+# ============================================================================
+# JSON 모드: 그리드가 쓰는 JSON을 세션 쿠키로 직접 요청 (렌더링/스크롤 없이 전체 보유 종목)
+# ============================================================================
+def api_url(template, **params):
+    """가로챈 JSON 요청 주소의 쿼리 파라미터만 바꿈 (분기, 페이징)"""
+    parts = urlsplit(template)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update({k: str(v) for k, v in params.items() if v is not None})
+    return urlunsplit(parts._replace(query=urlencode(query, safe=",")))
+
+
+def template_param(template, names):
+    """가로챈 요청 주소에 있는 파라미터 이름 (후보 중 처음 찾은 것, 없으면 None)"""
+    query = dict(parse_qsl(urlsplit(template).query, keep_blank_values=True))
+    return next((name for name in names if name in query), None)
+
+
+def quarter_id(template):
+    """주소에 들어 있는 분기 id (없으면 None → 최신 분기만 받을 수 있음)"""
+    name = template_param(template, QUARTER_PARAMS)
+    value = dict(parse_qsl(urlsplit(template).query)).get(name) if name else None
+    return int(value) if value and value.isdigit() else None
+
+
+def shift_report_date(report_date, back):
+    """분기말 날짜에서 back분기 이전 분기말"""
+    return (pd.Period(report_date, freq="Q") - back).end_time.strftime("%Y-%m-%d")
+
+
+def rows_report_date(rows):
+    """JSON 행의 분기 필드 ('Q2 2026' / '2026-06-30') → 분기말 날짜 (가장 많은 값, 없으면 None)"""
+    if not rows:
+        return None
+    df = pd.DataFrame.from_records(rows)
+    for field in [f for f in API_PERIOD_FIELDS if f in df.columns]:
+        values = df[field].dropna().astype(str)
+        dates = period_to_date(values)
+        # 분기 id 같은 숫자는 날짜로 보지 않음 (YYYY-MM-DD 형태만)
+        iso = values[dates.isna()].str.extract(r"(\d{4}-\d{2}-\d{2})", expand=False).dropna()
+        parsed = pd.to_datetime(iso, errors="coerce").dropna()
+        dates = pd.concat([dates.dropna(), parsed.dt.to_period("Q").dt.end_time.dt.strftime("%Y-%m-%d")])
+        if not dates.empty:
+            return dates.mode().iloc[0]
+    return None
+
+
+async def page_report_date(page):
+    """필러 페이지 분기 선택 상자에서 선택된 분기 ('Q2 2026') → 분기말 날짜 (없으면 None)"""
+    try:
+        texts = await page.locator("select option:checked").all_inner_texts()
+    except Exception:
+        return None
+    dates = period_to_date(texts).dropna()
+    return dates.iloc[0] if not dates.empty else None
+
+
+def parse_api_page(body):
+    """JSON 본문 → (행 목록, 전체 행 수). {"rows": [...], "total": N} / [...] 둘 다 처리 (total이 없으면 None)"""
+    data = json.loads(body)
+    if isinstance(data, list):
+        return data, None
+    rows = data.get("rows") or data.get("data") or []
+    total = data.get("total", data.get("recordsTotal"))
+    return rows, int(total) if total is not None else None
+
+
+def api_rows_to_frame(rows, target, report_date):
+    """JSON 행 → parse_holdings_table과 같은 형태 (Manager, Report_Date + CSV 컬럼)"""
+    if not rows:
+        return None
+    with get_metrics().stage("parse"):
+        df = pd.DataFrame.from_records(rows)
+        df = df.rename(columns={k: v for k, v in API_COLUMNS.items() if k in df.columns})
+        df, report = normalize_table(
+            df,
+            numeric_columns=["Weight_Pct", "Shares", "Value", "Price"],
+            integer_columns=["Shares"],
+        )
+    if format_report(report):
+        print(f"⚠️ [{target['name']}] 숫자 변환 실패: {format_report(report)}")
+    df.insert(0, "Manager", target["name"])
+    df.insert(1, "Report_Date", report_date)
+    return df
+
+
+async def fetch_api_page(request, url, ttl, retry):
+    """JSON 한 페이지 (캐시 → 세션 쿠키를 가진 context.request). 본문 또는 None"""
+    cache = get_cache()
+    body = cache.get(url)
+    if body is not None:
+        get_metrics().count("cache_hit")
+        return body
+
+    async def attempt(n):
+        start = time.perf_counter()
+        try:
+            response = await request.get(url, timeout=30000)
         except Exception as e:
-            print(f"❌ [{target['name']}] 에러: {e}")
-            return None
-        finally:
-            browser.close()
+            get_metrics().request("whalewisdom", url, failure_status(e), time.perf_counter() - start,
+                                  backend="api", retries=n - 1)
+            raise
+        text = await response.text()
+        get_metrics().request("whalewisdom", url, response.status, time.perf_counter() - start,
+                              len(text.encode()), backend="api", retries=n - 1)
+        # Cloudflare 확인 페이지 같은 HTML이 오면 JSON이 아님 → 차단으로 처리
+        is_json = "json" in (response.headers.get("content-type") or "")
+        outcome = classify_status(response.status, is_json)
+        if response.status == 200 and not is_json:
+            outcome = BLOCKED
+        return FetchResult(outcome, text if outcome == SUCCESS else None, response.status)
+
+    result = await retry.run_async(attempt, urlsplit(url).netloc)
+    if result.outcome != SUCCESS:
+        get_metrics().count(f"fetch_{result.outcome}")
+        return None
+    cache.set(url, result.body, source="whalewisdom", ttl=ttl)
+    return result.body
+
+
+async def fetch_quarter_api(request, template, target, report_date, quarter=None, retry=None):
+    """
+    분기 하나의 전체 보유 종목 (API_PAGE_SIZE 단위 페이징). DataFrame (보유 종목이 없으면 None)
+    report_date는 행에 분기 정보가 없을 때만 씀
+    재시도를 다 쓴 페이지가 있으면 RuntimeError (일부만 받은 분기는 저장하지 않음, 스냅샷 단위로 교체되므로)
+    """
+    retry = retry or RetryPolicy()
+    quarter_param = template_param(template, QUARTER_PARAMS)
+    if quarter_param and quarter is not None:
+        ttl = ttl_for_period("whalewisdom", report_date)
+    else:
+        # 주소에 분기 id가 없으면 같은 주소가 실행마다 그때의 최신 분기를 돌려줌 → 기본 TTL
+        ttl = "default"
+    offset_param = template_param(template, OFFSET_PARAMS)
+    limit_param = template_param(template, LIMIT_PARAMS)
+    page_param = template_param(template, PAGE_PARAMS) if offset_param is None else None
+
+    rows, seen, page = [], set(), 1
+    while True:
+        params = {quarter_param: quarter} if quarter_param else {}
+        if limit_param:
+            params[limit_param] = API_PAGE_SIZE
+        if offset_param:
+            params[offset_param] = len(rows)
+        elif page_param:
+            params[page_param] = page
+        url = api_url(template, **params)
+        body = await fetch_api_page(request, url, ttl, retry)
+        if body is None:
+            raise RuntimeError(f"{report_date} JSON 수집 실패 ({len(rows)}행 이후)")
+        page_rows, total = parse_api_page(body)
+        keys = [json.dumps(row, sort_keys=True, default=str) for row in page_rows]
+        new = [row for row, key in zip(page_rows, keys) if key not in seen]
+        if page_rows and not new:
+            # 엔드포인트가 페이징 파라미터를 무시하고 같은 페이지를 돌려줌
+            if total is not None and len(rows) < total:
+                raise RuntimeError(f"{report_date} 페이징이 동작하지 않음 ({len(rows)}/{total}행)")
+            break
+        seen.update(keys)
+        rows += new
+
+        if not (offset_param or page_param) or not page_rows:
+            break  # 페이징 파라미터가 없으면 한 번에 전체가 옴
+        if total is not None:
+            # 서버가 페이지 크기를 줄였을 수 있으므로 total 기준으로 판단
+            if len(rows) >= total:
+                break
+        elif limit_param and len(page_rows) < API_PAGE_SIZE:
+            break  # 요청보다 적게 오면 마지막 페이지
+        page += 1
+    return api_rows_to_frame(rows, target, rows_report_date(rows) or report_date)
+
+
+async def capture_api_template(page, url, timing):
+    """
+    필러 페이지를 열면서 그리드의 JSON 요청을 가로챔 (테이블 렌더링/스크롤은 기다리지 않음)
+    가로챈 요청 주소 반환, 페이지가 JSON을 부르지 않으면 예외
+    """
+    def is_holdings_json(response):
+        return HOLDINGS_API_PATH in urlsplit(response.url).path and response.status == 200
+
+    async with page.expect_response(is_holdings_json, timeout=30000) as captured:
+        await LEAN.load_async(page, url, timeout=30000, timing=timing)
+    response = await captured.value
+    return response.url
+
 
-def scrape_whalewisdom_fast(parallel=False, headless=True):
+def merge_report_dates(df, filename):
+    """
+    기존 CSV에 이번 실행 분기를 합침: 같은 Report_Date는 이번 결과로 교체, 나머지 분기는 유지
+    (quarters_back을 줄이거나 과거 분기 요청이 실패해도 이미 받은 분기가 지워지지 않음)
+    """
+    if not os.path.exists(filename):
+        return df
+    previous = pd.read_csv(filename, encoding="utf-8-sig")
+    if "Report_Date" not in previous.columns:
+        return df  # DOM 모드 (상위 20개) CSV는 분기 정보가 없어 합칠 수 없음
+    previous = previous[~previous["Report_Date"].astype(str).isin(df["Report_Date"].astype(str))]
+    merged = pd.concat([df, previous], ignore_index=True)
+    return merged.sort_values("Report_Date", ascending=False, kind="stable", ignore_index=True)
+
+
+def save_api_holdings(df, target):
+    """JSON 모드 결과 저장: CSV는 Report_Date 단위로 합친 전체 분기/전체 종목, SQLite는 (매니저, 분기) 스냅샷 단위 교체"""
+    filename = f"Whale_{target['slug']}.csv"
+    with get_metrics().stage("save"):
+        merged = merge_report_dates(df, filename)
+        merged.to_csv(filename, index=False, encoding="utf-8-sig")
+        get_store().upsert_holdings(df, source="whalewisdom")
+    quarters = df["Report_Date"].nunique()
+    print(f"✅ [{target['name']}] 완료 ({quarters}개 분기 {len(df)}행 갱신, "
+          f"{merged['Report_Date'].nunique()}개 분기 저장 → {filename})")
+
+
+async def scrape_filer_api(pool, target, quarters_back=QUARTERS_BACK):
+    """
+    JSON 모드: 페이지는 세션/엔드포인트 확인용으로 한 번만 열고,
+    분기별 전체 보유 종목은 같은 context의 쿠키로 JSON만 요청
+    엔드포인트를 못 찾으면 DOM 모드(scrape_single_filer)로 폴백
+    """
+    url = f"https://whalewisdom.com/filer/{target['slug']}"
+    metrics = get_metrics()
+    retry = RetryPolicy()
+
+    print(f"[{target['name']}] JSON 수집 시작...")
+    frames = []
+    try:
+        async with pool.context() as context:
+            await LEAN.apply_async(context)
+            page = await context.new_page()
+            timing = {}
+            try:
+                template = await capture_api_template(page, url, timing)
+            except Exception as e:
+                metrics.page_load("whalewisdom", url, timing, failure_status(e))
+                raise
+            metrics.page_load("whalewisdom", url, timing, nbytes=LEAN.last_bytes)
+            # 분기: JSON 행 → 페이지의 분기 선택 상자 → 13F 제출 기한을 뺀 직전 분기 순서로
+            report_date = await page_report_date(page) or latest_report_date()
+            # 이후는 JSON 요청뿐이라 페이지는 닫음 (세션 쿠키는 context.request가 그대로 씀)
+            await page.close()
+
+            latest = quarter_id(template)
+            for back in range(quarters_back + 1):
+                if back and latest is None:
+                    print(f"⚠️ [{target['name']}] 분기 id를 알 수 없어 최신 분기만 수집")
+                    break
+                quarter = latest - back if latest is not None else None
+                try:
+                    df = await fetch_quarter_api(context.request, template, target,
+                                                 shift_report_date(report_date, back), quarter, retry)
+                except RuntimeError as e:
+                    if not back:
+                        raise  # 최신 분기부터 실패하면 DOM 모드로
+                    print(f"⚠️ [{target['name']}] {e} → 건너뜀")
+                    continue
+                if df is not None:
+                    if not back:
+                        report_date = df["Report_Date"].iloc[0]  # 과거 분기는 실제 최신 분기 기준으로
+                    frames.append(df)
+    except Exception as e:
+        print(f"⚠️ [{target['name']}] JSON 엔드포인트 실패 ({e}) → DOM 모드로 수집")
+        metrics.count("api_fallback")
+        return await scrape_single_filer(pool, target)
+
+    if not frames:
+        print(f"[{target['name']}] 보유 종목 없음")
+        metrics.count("skip")
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    save_api_holdings(df, target)
+    return df
+
+
+async def scrape_filers(targets, concurrency=1, headless=True, delay=1.0, mode=MODE,
+                        quarters_back=QUARTERS_BACK):
+    """
+    브라우저는 한 번만 띄우고 운용사마다 새 context 사용
+    쿠키/세션은 STATE_FILE에 저장했다가 다음 실행에서 재사용
+    mode='api': 그리드 JSON으로 전체 보유 종목 (quarters_back만큼 과거 분기 포함)
+    mode='dom': #holdings_table 렌더링 후 파싱 (상위 20개 CSV)
+    """
+    metrics = start_run("whalewisdom")
+
+    def scrape(pool, target):
+        if mode == "api":
+            return scrape_filer_api(pool, target, quarters_back)
+        return scrape_single_filer(pool, target)
+
+    async with BrowserPool(headless=headless, max_contexts=concurrency, state_file=STATE_FILE) as pool:
+        if concurrency > 1:
+            results = await asyncio.gather(*(scrape(pool, t) for t in targets))
+        else:
+            results = []
+            for target in targets:
+                results.append(await scrape(pool, target))
+                metrics.add_wait(delay, "page_delay")
+                await asyncio.sleep(delay)  # 서버 부담 완화
+        print(f"🌐 브라우저 실행 {pool.launches}회 / context {pool.contexts_opened}개")
+        if LEAN.summary():
+            print(f"🪶 브라우저 전송량: {LEAN.summary()}")
+    metrics.finish()
+    return [r for r in results if r is not None]
+
+def scrape_whalewisdom_fast(parallel=False, headless=True, targets=TARGETS, mode=MODE,
+                            quarters_back=QUARTERS_BACK):
     """
     parallel=True: 병렬 처리 (빠름, but 서버 부하 주의)
     headless=True: GUI 없이 실행 (Cloudflare 없을 때만)
+    mode='api': JSON 엔드포인트로 전체 보유 종목 / 'dom': 테이블 렌더링 (상위 20개)
+    quarters_back: api 모드에서 최신 분기 외에 더 받을 과거 분기 수
+    
+    저장된 세션(STATE_FILE)이 있으면 Cloudflare 통과 쿠키를 재사용하므로
+    처음 한 번만 GUI로 돌리고 이후에는 headless로 돌려도 됨
     """
     if parallel:
-        print("⚡ 병렬 모드 (최대 3개 동시 실행)")
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            results = list(executor.map(
-                lambda t: scrape_single_filer(t, headless), 
-                TARGETS
-            ))
-        return [r for r in results if r is not None]
-    else:
-        print("🐌 순차 모드")
-        results = []
-        for target in TARGETS:
-            result = scrape_single_filer(target, headless)
-            if result is not None:
-                results.append(result)
-            time.sleep(1)  # 서버 부담 완화
-        return results
+        print(f"⚡ 병렬 모드 (최대 {PARALLEL_CONTEXTS}개 동시 실행)")
+        return asyncio.run(scrape_filers(targets, PARALLEL_CONTEXTS, headless,
+                                         mode=mode, quarters_back=quarters_back))
+    print("🐌 순차 모드")
+    return asyncio.run(scrape_filers(targets, 1, headless, mode=mode, quarters_back=quarters_back))
 
 if __name__ == "__main__":
     # 옵션 1: 병렬 + headless (가장 빠름, Cloudflare 없을 때)
@@ -1,109 +1,188 @@
 import pandas as pd
-from playwright.sync_api import sync_playwright
 import yfinance as yf
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataroma_http import DataromaFetcher
+from DataRoma_craw_hold import holdings_table
+from table_extract import extract_table
+from response_cache import get_cache, DAY
+from sqlite_store import get_store
+from run_metrics import get_metrics, start_run
+from config import DEFAULT_CONFIG
+import json
 import time
 
 # 분석 대상: 워런 버핏 (Berkshire Hathaway)
-GURU_CODE = "BRK"
-GURU_NAME = "Warren Buffett"
+GURU_CODE = DEFAULT_CONFIG["yahoo"]["guru_code"]
+GURU_NAME = DEFAULT_CONFIG["yahoo"]["guru_name"]
 
-def get_guru_data():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+# Yahoo Finance 연동 설정
+PROFILE_TTL = 30 * DAY   # 섹터/산업 정보는 거의 안 바뀌므로 길게 캐시
+MAX_WORKERS = DEFAULT_CONFIG["yahoo"]["max_workers"]  # 프로필(info) 동시 요청 수
+PRICE_BATCH_SIZE = 200   # yf.download 한 번에 묶을 티커 수
+
+# 결과 파일
+PORTFOLIO_FILE = DEFAULT_CONFIG["yahoo"]["portfolio_file"]
+PERFORMANCE_FILE = DEFAULT_CONFIG["yahoo"]["performance_file"]
+PORTFOLIOS_FILE = DEFAULT_CONFIG["yahoo"]["portfolios_file"]  # 여러 구루 (run_many)
+
+def get_guru_data(code=GURU_CODE, name=GURU_NAME, with_perf=True):
+    # HTTP 우선 수집 (#grid가 없을 때만 Playwright 폴백)
+    with DataromaFetcher() as fetcher:
         
         # --- 1. 포트폴리오 (Holdings) 가져오기 ---
-        print(f"[{GURU_NAME}] 포트폴리오 수집 중...")
-        url_holdings = f"https://www.dataroma.com/m/holdings.php?m={GURU_CODE}"
-        page.goto(url_holdings)
-        page.wait_for_selector("#grid", timeout=10000)
-        
-        html_holdings = page.content()
-        df_holdings = pd.read_html(StringIO(html_holdings))[0]
+        print(f"[{name}] 포트폴리오 수집 중...")
+        url_holdings = f"https://www.dataroma.com/m/holdings.php?m={code}"
+        html_holdings = fetcher.get(url_holdings, wait_ms=10000)
+        if html_holdings is None:
+            raise RuntimeError(f"포트폴리오 테이블(#grid)을 찾지 못했습니다: {url_holdings}")
         
-        # [디버깅] 실제 컬럼명이 무엇인지 확인 (나중에 문제 생기면 이 로그를 보세요)
-        print("   👉 수집된 컬럼 목록:", df_holdings.columns.tolist())
-
-        # [수정] 컬럼 이름 대신 '순서(Index)'로 선택하여 오류 방지
-        # 보통 Dataroma 순서: [0:Stock, 1:Symbol, 2:% Portfolio, 3:Shares, 4:Price, 5:Value, 6:% Change...]
-        # 안전하게 컬럼 이름을 강제로 변경합니다.
-        
-        # 필요한 컬럼 개수만큼만 슬라이싱해서 이름을 덮어씌웁니다.
-        # (테이블 구조가 조금 달라도 앞쪽 6개 데이터는 보통 고정입니다)
-        target_cols = ['Name', 'Ticker', 'Weight(%)', 'Shares', 'Price', 'Value($)']
+        # #grid 테이블만 파싱 (숫자 컬럼은 바로 타입 변환), 티커는 stock.php?sym= 링크에서
+        with fetcher.metrics.stage("parse"):
+            df_holdings, _ = extract_table(html_holdings, "grid", links=True)
         
-        # 데이터프레임의 앞쪽 컬럼들을 우리가 원하는 이름으로 매핑
-        df_subset = df_holdings.iloc[:, :6].copy() 
-        df_subset.columns = target_cols
+        # 컬럼은 순서가 아니라 헤더 이름으로 찾음 (History | Stock | % of portfolio | Recent activity | Shares | ...)
+        df_subset = holdings_table(df_holdings) if df_holdings is not None else None
+        if df_subset is None:
+            raise RuntimeError(f"포트폴리오 테이블 구조 이상: {url_holdings}")
 
         # 필요한 것만 남김
-        portfolio = df_subset[['Ticker', 'Name', 'Weight(%)', 'Value($)']].copy()
+        portfolio = df_subset[['Ticker', 'Stock_Name', 'Weight_Pct', 'Value']].rename(
+            columns={'Stock_Name': 'Name', 'Weight_Pct': 'Weight(%)', 'Value': 'Value($)'})
         
         print(f"   ✅ 보유 종목 {len(portfolio)}개 확보")
 
         # --- 2. 성과 (Performance) 가져오기 ---
-        print(f"[{GURU_NAME}] 연도별 수익률 수집 중...")
-        url_perf = f"https://www.dataroma.com/m/perf.php?m={GURU_CODE}"
-        page.goto(url_perf)
+        if not with_perf:
+            return portfolio, pd.DataFrame()
+        
+        print(f"[{name}] 연도별 수익률 수집 중...")
+        url_perf = f"https://www.dataroma.com/m/perf.php?m={code}"
         
         try:
-            html_perf = page.content()
-            df_perf = pd.read_html(StringIO(html_perf))[0]
+            # perf.php는 #grid가 아닐 수 있으므로 아무 테이블이나 허용
+            html_perf = fetcher.get(url_perf, table_id=None)
+            with fetcher.metrics.stage("parse"):
+                df_perf, _ = extract_table(html_perf, table_id=None)
+            if df_perf is None:
+                raise ValueError("성과 테이블 없음")
             print(f"   ✅ 성과 데이터 확보 ({len(df_perf)}년치)")
         except:
             print("   ⚠️ 성과 데이터를 찾지 못했습니다.")
             df_perf = pd.DataFrame()
 
-        browser.close()
         return portfolio, df_perf
 
-def enrich_with_yfinance(portfolio_df):
-    print("\n[Yahoo Finance] 섹터 및 세부 정보 연동 중 (시간이 좀 걸립니다)...")
+def to_yahoo_symbol(ticker):
+    """'.'이 들어간 티커 수정 (예: BRK.B -> BRK-B)"""
+    return str(ticker).strip().replace(".", "-")
+
+def fetch_profile(symbol):
+    """yf.Ticker().info에서 섹터/산업만 추림 (무거운 요청이라 캐시와 함께 사용)"""
+    start = time.perf_counter()
+    try:
+        info = yf.Ticker(symbol).info
+    except Exception:
+        get_metrics().request("yahoo", f"yfinance://profile/{symbol}", "error", time.perf_counter() - start)
+        raise
+    get_metrics().request("yahoo", f"yfinance://profile/{symbol}", "ok", time.perf_counter() - start)
+    return {
+        "Sector": info.get("sector", "Unknown"),
+        "Industry": info.get("industry", "Unknown"),
+    }
+
+def load_profiles(symbols, max_workers=MAX_WORKERS):
+    """섹터/산업 정보: 캐시 우선, 없는 것만 병렬 조회"""
+    cache = get_cache()
+    profiles = {}
+    missing = []
+    
+    for symbol in symbols:
+        cached = cache.get(f"yfinance://profile/{symbol}")
+        if cached is not None:
+            profiles[symbol] = json.loads(cached)
+            get_metrics().count("cache_hit")
+        else:
+            missing.append(symbol)
     
-    sectors = []
-    current_prices = []
+    print(f"   캐시 {len(profiles)}개 / 새로 조회 {len(missing)}개 (동시 {max_workers}개)")
     
-    tickers = portfolio_df['Ticker'].tolist()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_profile, symbol): symbol for symbol in missing}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                profile = future.result()
+                cache.set(f"yfinance://profile/{symbol}", json.dumps(profile),
+                          source="yahoo", ttl=PROFILE_TTL)
+                print(f"   Finished: {symbol} -> {profile['Sector']}")
+            except Exception:
+                # 실패는 캐시하지 않음 (다음 실행에서 재시도)
+                print(f"   Error: {symbol}")
+                profile = {"Sector": "Error", "Industry": "Error"}
+            profiles[symbol] = profile
     
-    # 팁: yfinance는 Tickers를 한 번에 요청하면 더 빠릅니다.
-    # 하지만 종목이 너무 많으면 나눌 필요가 있습니다. 여기선 단순하게 loop 돕니다.
-    for ticker in tickers[:10]: # 테스트를 위해 상위 10개만 먼저 해봅니다. (전체 하려면 [:10] 제거)
+    return pd.DataFrame.from_dict(profiles, orient="index", columns=["Sector", "Industry"])
+
+def load_prices(symbols, batch_size=PRICE_BATCH_SIZE):
+    """현재가: 티커를 묶어서 yf.download 한 번에 조회 (종목별 info 요청 대신)"""
+    prices = {}
+    for start in range(0, len(symbols), batch_size):
+        batch = symbols[start:start + batch_size]
+        begin = time.perf_counter()
         try:
-            # '.'이 들어간 티커 수정 (예: BRK.B -> BRK-B)
-            safe_ticker = ticker.replace(".", "-")
-            stock = yf.Ticker(safe_ticker)
-            
-            # 정보 가져오기 (fast_info가 더 빠름)
-            info = stock.info 
-            
-            sec = info.get('sector', 'Unknown')
-            price = info.get('currentPrice', 0)
-            
-            sectors.append(sec)
-            current_prices.append(price)
-            print(f"   Finished: {ticker} -> {sec}")
-            
+            data = yf.download(batch, period="5d", progress=False, auto_adjust=False, threads=True)
         except Exception as e:
-            print(f"   Error: {ticker}")
-            sectors.append("Error")
-            current_prices.append(0)
+            get_metrics().request("yahoo", "yfinance://download", "error", time.perf_counter() - begin)
+            print(f"   Error: 가격 조회 실패 ({e})")
+            continue
+        get_metrics().request("yahoo", "yfinance://download", "ok", time.perf_counter() - begin)
+        if data.empty:
+            continue
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(batch[0])
+        # 휴장일 등으로 마지막 행이 비어 있을 수 있어 직전 값으로 채움
+        prices.update(close.ffill().iloc[-1].dropna().to_dict())
+    return pd.Series(prices, name="Current_Price", dtype="float64")
+
+def enrich_portfolios(portfolios, max_workers=MAX_WORKERS):
+    """
+    여러 구루의 포트폴리오를 한 번에 연동
+    portfolios: {구루 이름: 포트폴리오 DataFrame (Ticker 컬럼 필요)}
+    전체 구루에서 중복을 뺀 티커만 한 번씩 조회한 뒤 각 포트폴리오에 붙임
+    """
+    symbols = sorted({
+        to_yahoo_symbol(t) for df in portfolios.values() for t in df["Ticker"].dropna()
+    })
+    total_rows = sum(len(df) for df in portfolios.values())
+    print(f"\n[Yahoo Finance] {len(portfolios)}개 포트폴리오, 종목 {total_rows}개 → 고유 티커 {len(symbols)}개 연동 중...")
     
-    # 데이터프레임에 붙이기 (상위 10개만 했으므로 길이 맞춤 주의)
-    # 실제 사용 시에는 전체 리스트를 돌리세요.
-    portfolio_df = portfolio_df.iloc[:len(sectors)].copy()
-    portfolio_df['Sector'] = sectors
-    portfolio_df['Current_Price'] = current_prices
+    lookup = load_profiles(symbols, max_workers).join(load_prices(symbols), how="left")
     
-    return portfolio_df
+    enriched = {}
+    for name, df in portfolios.items():
+        df = df.copy()
+        keys = df["Ticker"].map(to_yahoo_symbol)
+        df["Sector"] = keys.map(lookup["Sector"]).fillna("Error")
+        df["Industry"] = keys.map(lookup["Industry"]).fillna("Error")
+        df["Current_Price"] = keys.map(lookup["Current_Price"]).fillna(0)
+        enriched[name] = df
+    return enriched
+
+def enrich_with_yfinance(portfolio_df, max_workers=MAX_WORKERS):
+    """포트폴리오 하나 연동 (전체 종목)"""
+    return enrich_portfolios({"portfolio": portfolio_df}, max_workers)["portfolio"]
+
+def run(code=GURU_CODE, name=GURU_NAME, max_workers=MAX_WORKERS,
+        portfolio_file=PORTFOLIO_FILE, performance_file=PERFORMANCE_FILE):
+    """포트폴리오 + 성과 수집 → Yahoo Finance 연동 → CSV 저장 (python whalebuzz.py yahoo)"""
+    metrics = start_run("yahoo")
 
-# --- 실행 ---
-if __name__ == "__main__":
     # 1. Dataroma 크롤링
-    pf_df, perf_df = get_guru_data()
+    pf_df, perf_df = get_guru_data(code, name)
     
-    # 2. Yahoo Finance 데이터 결합
-    final_df = enrich_with_yfinance(pf_df)
+    # 2. Yahoo Finance 데이터 결합 (전체 종목)
+    final_df = enrich_with_yfinance(pf_df, max_workers)
     
     # 3. 결과 출력 및 저장
     print("\n--- [Final Result: Top 5 Holdings] ---")
@@ -114,6 +193,45 @@ if __name__ == "__main__":
 
 
     # CSV 저장
-    final_df.to_csv("Buffett_Enriched_Portfolio.csv", index=False, encoding='utf-8-sig')
-    perf_df.to_csv("Buffett_Performance_History.csv", index=False, encoding='utf-8-sig')
-    print("\n🎉 모든 데이터 저장 완료!")
\ No newline at end of file
+    final_df.to_csv(portfolio_file, index=False, encoding='utf-8-sig')
+    perf_df.to_csv(performance_file, index=False, encoding='utf-8-sig')
+    # 섹터/산업/가격은 티커 기준으로 SQLite 저장소에 upsert (다른 크롤러 결과와 조인용)
+    get_store().upsert_securities(final_df)
+    print("\n🎉 모든 데이터 저장 완료!")
+    metrics.finish()
+    return final_df, perf_df
+
+def run_many(gurus, max_workers=MAX_WORKERS, portfolios_file=PORTFOLIOS_FILE):
+    """
+    여러 구루의 포트폴리오 수집 → 구루 간 중복을 뺀 티커만 Yahoo Finance 조회 → CSV 하나 (Manager 컬럼)
+    (python whalebuzz.py yahoo --gurus ...)
+    """
+    metrics = start_run("yahoo")
+
+    # 1. Dataroma 크롤링 (성과 페이지는 생략)
+    portfolios = {}
+    for guru in gurus:
+        try:
+            portfolios[guru["name"]] = get_guru_data(guru["code"], guru["name"], with_perf=False)[0]
+        except RuntimeError as e:
+            print(f"   ⚠️ {e}")
+            metrics.count("error")
+    if not portfolios:
+        metrics.finish()
+        raise RuntimeError("포트폴리오를 하나도 수집하지 못했습니다")
+
+    # 2. Yahoo Finance 데이터 결합 (고유 티커만 한 번씩)
+    enriched = enrich_portfolios(portfolios, max_workers)
+    final_df = pd.concat([df.assign(Manager=name) for name, df in enriched.items()], ignore_index=True)
+    final_df = final_df[["Manager"] + [c for c in final_df.columns if c != "Manager"]]
+
+    # 3. 저장
+    final_df.to_csv(portfolios_file, index=False, encoding='utf-8-sig')
+    get_store().upsert_securities(final_df.drop_duplicates("Ticker"))
+    print(f"\n🎉 {len(enriched)}개 포트폴리오 {len(final_df)}행 저장 완료 ('{portfolios_file}')")
+    metrics.finish()
+    return final_df
+
+# --- 실행 ---
+if __name__ == "__main__":
+    run()